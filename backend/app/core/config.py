@@ -3,7 +3,7 @@ USDT TRC20 월렛 서비스의 핵심 설정 모듈입니다.
 환경 변수와 애플리케이션 설정을 관리합니다.
 """
 
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import validator
 
@@ -26,10 +26,106 @@ class Settings(BaseSettings):
     
     # 트론 네트워크 설정
     tron_api_key: Optional[str] = None
-    tron_network: str = "mainnet"  # 메인넷 또는 테스트넷
+    tron_network: str = "mainnet"  # 메인넷, 테스트넷 또는 fake (프로세스 내 가상 체인)
     company_wallet_address: str = ""
     company_wallet_private_key: str = ""  # 보안 유지 필수!
-    
+
+    # 트론 노드 풀 설정
+    tron_node_urls: str = ""  # 쉼표로 구분된 풀 노드 URL (비어 있으면 네트워크 기본 노드)
+    tron_node_timeout: float = 10.0  # 노드 HTTP 요청 타임아웃 (초)
+    tron_hedge_percentile: float = 0.95  # 이 지연 백분위를 넘기면 두 번째 노드로 헤지 요청
+    tron_node_max_failures: int = 3  # 연속 실패 시 노드 제외 기준
+    tron_node_eject_seconds: int = 30  # 노드 제외 유지 시간 (초)
+    tron_node_max_block_lag: int = 20  # 최고 블록 대비 허용되는 지연 블록 수
+    tron_health_check_interval: int = 15  # 노드 헬스 체크 주기 (초, 0이면 비활성화)
+
+    # 트론 호출 보호 설정 (데드라인, 서킷 브레이커, 벌크헤드)
+    tron_read_timeout: float = 5.0  # 조회 작업 데드라인 (초)
+    tron_broadcast_timeout: float = 15.0  # 서명/브로드캐스트 작업 데드라인 (초)
+    tron_circuit_failure_threshold: int = 5  # 서킷 브레이커가 열리는 연속 실패 수
+    tron_circuit_reset_seconds: int = 30  # 서킷 브레이커 재시도 대기 시간 (초)
+    tron_max_concurrent_calls: int = 16  # 동시에 실행 가능한 체인 호출 수
+    tron_bulkhead_wait_seconds: float = 0.1  # 호출 슬롯 대기 시간 (초)
+
+    # 트론 서비스 초기화 설정
+    contract_abi_cache_dir: str = ".cache/contracts"  # 컨트랙트 ABI 디스크 캐시 (비어 있으면 비활성화)
+    tron_warmup_timeout: float = 30.0  # 초기화 중 도착한 요청의 최대 대기 시간 (초)
+
+    # 블록 높이 캐시 설정
+    block_height_refresh_interval: float = 3.0  # 백그라운드 갱신 주기 (초, 0이면 비활성화)
+    block_height_max_staleness: float = 9.0  # 캐시된 블록 높이의 최대 허용 경과 시간 (초)
+    tx_status_cache_size: int = 10000  # 확정된 트랜잭션 상태 인메모리 LRU 크기
+
+    # 회사 지갑 잔액 스냅샷 설정
+    company_balance_refresh_interval: int = 60  # 백그라운드 갱신 주기 (초, 0이면 비활성화)
+    company_balance_max_age: int = 300  # 이보다 오래된 스냅샷은 즉시 다시 조회 (초)
+    company_balance_settle_seconds: int = 6  # 브로드캐스트 후 체인 잔액에 반영되기까지의 여유 시간 (초)
+
+    # 입금 인덱서 설정
+    tron_grid_url: str = ""  # TronGrid API URL (비어 있으면 네트워크 기본 URL)
+    deposit_indexer_interval: int = 0  # 주소별 입금 인덱싱 주기 (초, 0이면 비활성화 - 블록 스캐너 권장)
+    deposit_indexer_page_size: int = 200  # TronGrid 페이지당 전송 내역 수 (최대 200)
+    deposit_scanner_interval: float = 0.0  # 블록 스캔 주기 (초, 0이면 비활성화 - 반드시 한 프로세스에서만 활성화)
+    deposit_scanner_max_blocks: int = 100  # 한 번에 스캔하는 최대 블록 수
+    deposit_scanner_use_bloom: bool = False  # 입금 주소 매칭 전 블룸 필터 사용 여부
+    deposit_address_reload_interval: int = 60  # 입금 주소 전체 재로딩 주기 (초)
+    backfill_workers: int = 8  # 과거 입금 백필 동시 작업 수 (트론 동시 호출 수 이하)
+    backfill_chunk_size: int = 100  # 백필 작업 단위 블록 수
+
+    # 출금 작업 설정
+    withdrawal_worker_interval: float = 2.0  # 출금 작업 대기열 확인 주기 (초, 0이면 비활성화)
+    withdrawal_worker_concurrency: int = 4  # 동시에 브로드캐스트하는 출금 수
+    withdrawal_batch_size: int = 100  # 한 번에 생성/서명하는 출금 수 (같은 참조 블록 사용)
+    withdrawal_reconcile_interval: float = 30.0  # 브로드캐스트한 출금의 온체인 실패 확인 주기 (초)
+    withdrawal_job_stale_seconds: int = 600  # 이 시간보다 오래 실행 중인 작업은 수동 확인 대상으로 표시
+    tron_sign_processes: int = 0  # 대량 서명 프로세스 수 (0이면 CPU 수)
+
+    # 출금 승인 대기열 설정
+    withdrawal_queue_policy: str = "sla,user_tier,amount_tier"  # 우선순위 기준 (sla, user_tier, amount_tier, amount_desc), 같으면 오래된 순
+    withdrawal_queue_sla_minutes: int = 60  # 이 시간보다 오래 기다린 요청을 먼저 처리
+    withdrawal_amount_tiers: List[float] = [100.0, 1000.0]  # 금액 구간 경계 (작은 구간 먼저)
+    withdrawal_claim_lease_seconds: int = 300  # 관리자가 가져간 요청을 다른 관리자에게 숨기는 시간
+
+    # 출금 요청 만료 설정
+    withdrawal_expiry_hours: float = 72.0  # 이 시간 동안 처리되지 않은 대기 요청을 취소하고 동결 해제
+    withdrawal_expiry_interval: int = 600  # 만료 작업 실행 주기 (초, 0이면 비활성화)
+    withdrawal_expiry_batch_size: int = 500  # 트랜잭션 하나에서 만료하는 요청 수
+
+    # 출금 수수료 추정 설정
+    fee_limit_margin: float = 1.2  # 관측 에너지 사용량(p95)에 곱하는 fee_limit 여유 배수
+    max_fee_limit_trx: float = 100.0  # 전송 하나의 최대 fee_limit (TRX)
+    fee_parameters_refresh_interval: int = 600  # 에너지/대역폭 가격 갱신 주기 (초)
+    fee_sample_size: int = 200  # 수신자 유형별로 보관하는 최근 영수증 수
+    fee_recipient_cache_ttl: float = 600.0  # 수신자 유형(USDT 보유 여부) 캐시 유지 시간 (초)
+
+    # HD 입금 주소 설정
+    deposit_xpub: str = ""  # m/44'/195'/0' 계정 확장 공개키 (비어 있으면 회사 주소 + 메모 방식)
+    hd_derivation_processes: int = 0  # 주소 일괄 파생 프로세스 수 (0이면 CPU 수)
+
+    # 입금 주소 스윕 설정
+    sweep_threshold: float = 50.0  # 미스윕 입금 합계가 이 금액(USDT) 이상인 주소만 스윕
+    sweep_window_size: int = 50  # 한 윈도우에서 함께 충전하고 스윕하는 주소 수
+    sweep_concurrency: int = 4  # 윈도우 안에서 동시에 브로드캐스트하는 트랜잭션 수
+    sweep_funding_wait: float = 6.0  # TRX 충전 후 스윕 전송까지 대기 시간 (초)
+    sweep_destination: str = ""  # 스윕 받을 주소 (비어 있으면 회사 지갑 주소)
+
+    # 로컬 블록 이벤트 캐시 설정
+    block_store_dir: str = ""  # 디코딩된 블록 이벤트 저장 디렉터리 (비어 있으면 비활성화, 한 번에 한 프로세스만 사용)
+    block_store_max_mb: int = 1024  # 세그먼트 전체 최대 크기 (MB, 초과 시 오래된 세그먼트 삭제)
+    block_store_segment_mb: int = 64  # 세그먼트 파일 하나의 크기 (MB)
+    block_store_index_blocks: int = 1000000  # 인덱스가 가리키는 최근 블록 수 (고정 크기, 블록당 24바이트)
+
+    # 가상 트론 체인 설정 (TRON_NETWORK=fake, 부하 테스트/벤치마크용)
+    fake_tron_block_ms: int = 3000  # 블록 생성 주기 (밀리초)
+    fake_tron_seed: int = 1  # 체인과 장애 주입의 난수 시드
+    fake_tron_transfers_per_block: int = 0  # 블록마다 생성하는 외부 USDT 전송 수
+    fake_tron_nodes: int = 2  # 노드 풀에 넣을 가상 노드 수
+    fake_tron_latency_ms: float = 0.0  # 요청마다 추가하는 지연 (밀리초)
+    fake_tron_latency_jitter_ms: float = 0.0  # 지연에 더하는 무작위 변동 폭 (밀리초)
+    fake_tron_error_rate: float = 0.0  # 요청이 연결 오류로 실패할 확률 (0~1)
+    fake_tron_company_trx: float = 10000.0  # 회사 지갑 초기 TRX
+    fake_tron_company_usdt: float = 1000000.0  # 회사 지갑 초기 USDT
+
     # 관리자 설정
     admin_email: str = "admin@example.com"
     admin_password: str = "admin123"  # 운영환경에서 변경 필요
@@ -38,6 +134,15 @@ class Settings(BaseSettings):
     min_withdrawal_amount: float = 10.0
     max_withdrawal_amount: float = 10000.0
     withdrawal_fee_percentage: float = 0.005  # 0.5%
+
+    # 출금/송금 한도 설정 (사용자/자산별 최근 1시간·24시간 합계, 0이면 제한 없음)
+    withdrawal_hourly_limit: float = 0.0
+    withdrawal_daily_limit: float = 0.0
+    transfer_hourly_limit: float = 0.0
+    transfer_daily_limit: float = 0.0
+    velocity_bucket_minutes: int = 5  # 한도 카운터 버킷 크기 (분)
+    velocity_cache_ttl: float = 30.0  # 프로세스 내 카운터 캐시 유지 시간 (초)
+    velocity_prune_interval: int = 3600  # 지난 버킷 삭제 주기 (초, 0이면 비활성화)
     
     # 디버그 설정
     debug: bool = False
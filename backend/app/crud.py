@@ -3,14 +3,16 @@ CRUD operations for database entities.
 Handles Create, Read, Update, Delete operations with business logic.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, desc, func
+from sqlalchemy.exc import IntegrityError
 from decimal import Decimal
 from datetime import datetime
 
 from . import models, schemas
 from .utils.security import get_password_hash, verify_password
+from .utils.velocity import OP_TRANSFER, OP_WITHDRAWAL, velocity_limiter
 
 
 class CRUDUser:
@@ -93,7 +95,8 @@ class CRUDBalance:
         user_id: int, 
         asset: str, 
         amount_change: Decimal,
-        freeze_change: Decimal = Decimal('0')
+        freeze_change: Decimal = Decimal('0'),
+        commit: bool = True
     ) -> Optional[models.Balance]:
         """
         Update user balance atomically.
@@ -104,6 +107,8 @@ class CRUDBalance:
             asset: Asset symbol
             amount_change: Amount to add/subtract (can be negative)
             freeze_change: Amount to freeze/unfreeze (can be negative)
+            commit: Commit at the end (False lets the caller commit together
+                with related changes)
             
         Returns:
             Updated balance object or None if insufficient funds
@@ -142,12 +147,43 @@ class CRUDBalance:
             'updated_at': datetime.utcnow()
         })
         
-        db.commit()
+        if commit:
+            db.commit()
+        else:
+            db.flush()
         db.refresh(balance)
         return balance
     
-    def freeze_amount(self, db: Session, user_id: int, asset: str, amount: Decimal) -> bool:
-        """Freeze specific amount for withdrawal processing."""
+    def apply_credits(self, db: Session, credits: Dict[Tuple[int, str], Decimal]) -> None:
+        """
+        Add amounts to many balances without committing.
+        
+        Issues one UPDATE per (user_id, asset) group and creates missing
+        balance rows, so a whole batch is credited in the caller's transaction.
+        
+        Args:
+            db: Database session
+            credits: Mapping of (user_id, asset) to the amount to add
+        """
+        for (user_id, asset), amount in credits.items():
+            updated = db.query(models.Balance).filter(
+                and_(models.Balance.user_id == user_id, models.Balance.asset == asset)
+            ).update({
+                'amount': models.Balance.amount + amount,
+                'updated_at': datetime.utcnow()
+            }, synchronize_session=False)
+            
+            if not updated:
+                db.add(models.Balance(
+                    user_id=user_id,
+                    asset=asset,
+                    amount=amount,
+                    frozen_amount=Decimal('0.00000000')
+                ))
+        db.flush()
+    
+    def freeze_amount(self, db: Session, user_id: int, asset: str, amount: Decimal, commit: bool = True) -> bool:
+        """Freeze specific amount for withdrawal processing (``commit=False`` leaves committing to the caller)."""
         balance = self.get_user_balance(db, user_id, asset)
         if not balance:
             return False
@@ -162,7 +198,8 @@ class CRUDBalance:
         db.query(models.Balance).filter(models.Balance.id == balance.id).update({
             'frozen_amount': current_frozen + amount
         })
-        db.commit()
+        if commit:
+            db.commit()
         return True
     
     def unfreeze_amount(self, db: Session, user_id: int, asset: str, amount: Decimal) -> bool:
@@ -185,11 +222,14 @@ class CRUDBalance:
 class CRUDTransaction:
     """CRUD operations for Transaction model."""
     
-    def create(self, db: Session, transaction_data: dict) -> models.Transaction:
-        """Create new transaction record."""
+    def create(self, db: Session, transaction_data: dict, commit: bool = True) -> models.Transaction:
+        """Create new transaction record (``commit=False`` leaves committing to the caller)."""
         db_transaction = models.Transaction(**transaction_data)
         db.add(db_transaction)
-        db.commit()
+        if commit:
+            db.commit()
+        else:
+            db.flush()
         db.refresh(db_transaction)
         return db_transaction
     
@@ -237,6 +277,163 @@ class CRUDTransaction:
         db.refresh(transaction)
         return transaction
     
+    def credit_deposits(
+        self,
+        db: Session,
+        deposits: List[Dict[str, Any]],
+        commit: bool = True
+    ) -> List[models.Transaction]:
+        """
+        Record on-chain deposits and credit balances in one transaction.
+        
+        A deposit is identified by (ref_tx_id, log_index, user_id), where
+        ``log_index`` is the position of the transfer among the
+        transaction's transfers to the same user (counted in list order when
+        not given). A unique index enforces this, so concurrent scanners,
+        indexers and backfills racing on the same deposit credit it once;
+        re-processing a page or block range is harmless.
+        Deposits cancelled by a chain reorganization do not count, so a
+        transfer re-included in another block is recorded again.
+        Only COMPLETED deposits are credited; PENDING ones are credited
+        later by ``promote_pending_deposits``.
+        
+        Args:
+            db: Database session
+            deposits: Dicts with user_id, amount, asset, ref_tx_id and
+                optionally log_index, status, block_number, to_address and memo
+            commit: Commit at the end (False lets the caller commit together
+                with e.g. its indexing cursor)
+            
+        Returns:
+            Newly created deposit transactions
+        """
+        if not deposits:
+            return []
+        
+        ref_tx_ids = {deposit["ref_tx_id"] for deposit in deposits}
+        seen = set(
+            db.query(models.Transaction.ref_tx_id, models.Transaction.log_index, models.Transaction.user_id).filter(
+                models.Transaction.type == models.TransactionType.DEPOSIT,
+                models.Transaction.status != models.TransactionStatus.CANCELLED,
+                models.Transaction.ref_tx_id.in_(ref_tx_ids)
+            ).all()
+        )
+        
+        candidates = []
+        ordinals: Dict[Tuple[str, int], int] = {}
+        for deposit in deposits:
+            ordinal_key = (deposit["ref_tx_id"], deposit["user_id"])
+            log_index = deposit.get("log_index", ordinals.get(ordinal_key, 0))
+            ordinals[ordinal_key] = log_index + 1
+            key = (deposit["ref_tx_id"], log_index, deposit["user_id"])
+            if key in seen:
+                continue
+            seen.add(key)
+            
+            candidates.append(models.Transaction(
+                user_id=deposit["user_id"],
+                type=models.TransactionType.DEPOSIT,
+                amount=deposit["amount"],
+                asset=deposit.get("asset", "USDT"),
+                status=deposit.get("status", models.TransactionStatus.COMPLETED),
+                ref_tx_id=deposit["ref_tx_id"],
+                log_index=log_index,
+                block_number=deposit.get("block_number"),
+                to_address=deposit.get("to_address"),
+                memo=deposit.get("memo"),
+                fee_amount=Decimal('0.00000000')
+            ))
+        
+        try:
+            with db.begin_nested():
+                db.add_all(candidates)
+            created = candidates
+        except IntegrityError:
+            # Another writer credited some of these since the check above;
+            # insert one at a time and keep only the rows that are new
+            created = []
+            for transaction in candidates:
+                try:
+                    with db.begin_nested():
+                        db.add(transaction)
+                except IntegrityError:
+                    # Already credited
+                    continue
+                created.append(transaction)
+        
+        credits: Dict[Tuple[int, str], Decimal] = {}
+        for transaction in created:
+            if transaction.status == models.TransactionStatus.COMPLETED:
+                credit_key = (transaction.user_id, transaction.asset)
+                credits[credit_key] = credits.get(credit_key, Decimal('0')) + transaction.amount
+        
+        crud_balance.apply_credits(db, credits)
+        
+        if commit:
+            db.commit()
+        return created
+    
+    def promote_pending_deposits(self, db: Session, up_to_block: int) -> int:
+        """
+        Complete every pending on-chain deposit at or below a block and credit it.
+        
+        One grouped read and one bulk UPDATE cover all deposits that became
+        confirmed, instead of one status lookup per transaction. Does not commit.
+        
+        Args:
+            db: Database session
+            up_to_block: Highest block with enough confirmations
+            
+        Returns:
+            Number of promoted deposits
+        """
+        confirmed = and_(
+            models.Transaction.type == models.TransactionType.DEPOSIT,
+            models.Transaction.status == models.TransactionStatus.PENDING,
+            models.Transaction.block_number.isnot(None),
+            models.Transaction.block_number <= up_to_block
+        )
+        totals = db.query(
+            models.Transaction.user_id,
+            models.Transaction.asset,
+            func.sum(models.Transaction.amount),
+            func.count(models.Transaction.id)
+        ).filter(confirmed).group_by(models.Transaction.user_id, models.Transaction.asset).all()
+        if not totals:
+            return 0
+        
+        db.query(models.Transaction).filter(confirmed).update({
+            'status': models.TransactionStatus.COMPLETED,
+            'updated_at': datetime.utcnow()
+        }, synchronize_session=False)
+        crud_balance.apply_credits(db, {
+            (user_id, asset): Decimal(str(amount)) for user_id, asset, amount, _ in totals
+        })
+        return sum(count for _, _, _, count in totals)
+    
+    def cancel_pending_deposits(self, db: Session, from_block: int) -> int:
+        """
+        Cancel pending on-chain deposits at or above a block orphaned by a reorg.
+        
+        Pending deposits were never credited, so no balance changes. Does not commit.
+        
+        Args:
+            db: Database session
+            from_block: First block that is no longer on the canonical chain
+            
+        Returns:
+            Number of cancelled deposits
+        """
+        return db.query(models.Transaction).filter(
+            models.Transaction.type == models.TransactionType.DEPOSIT,
+            models.Transaction.status == models.TransactionStatus.PENDING,
+            models.Transaction.block_number >= from_block
+        ).update({
+            'status': models.TransactionStatus.CANCELLED,
+            'memo': 'Orphaned by chain reorganization',
+            'updated_at': datetime.utcnow()
+        }, synchronize_session=False)
+    
     def create_internal_transfer(
         self,
         db: Session,
@@ -267,14 +464,16 @@ class CRUDTransaction:
             if available < amount:
                 return None
             
-            # 잔액 업데이트
-            sender_updated = crud_balance.update_balance(db, sender_id, asset, -amount)
-            recipient_updated = crud_balance.update_balance(db, recipient_id, asset, amount)
+            # 잔액, 한도 카운터, 트랜잭션 기록을 한 번에 커밋
+            sender_updated = crud_balance.update_balance(db, sender_id, asset, -amount, commit=False)
+            recipient_updated = crud_balance.update_balance(db, recipient_id, asset, amount, commit=False)
             
             if not sender_updated or not recipient_updated:
                 db.rollback()
                 return None
             
+            velocity_limiter.record(db, sender_id, asset, OP_TRANSFER, amount)
+            
             # 트랜잭션 기록 생성
             transaction_data = {
                 "user_id": sender_id,
@@ -287,7 +486,9 @@ class CRUDTransaction:
                 "fee_amount": Decimal('0.00000000')
             }
             
-            transaction = self.create(db, transaction_data)
+            transaction = self.create(db, transaction_data, commit=False)
+            db.commit()
+            db.refresh(transaction)
             return transaction
             
         except Exception as e:
@@ -309,9 +510,10 @@ class CRUDWithdrawalRequest:
     ) -> Optional[models.WithdrawalRequest]:
         """Create withdrawal request and freeze funds."""
         try:
-            # 출금 금액 동결
-            success = crud_balance.freeze_amount(db, user_id, asset, amount)
+            # 출금 금액 동결 (출금 요청, 한도 카운터와 함께 커밋)
+            success = crud_balance.freeze_amount(db, user_id, asset, amount, commit=False)
             if not success:
+                db.rollback()
                 return None
             
             # 출금 요청 생성
@@ -325,6 +527,7 @@ class CRUDWithdrawalRequest:
             )
             
             db.add(withdrawal_request)
+            velocity_limiter.record(db, user_id, asset, OP_WITHDRAWAL, amount)
             db.commit()
             db.refresh(withdrawal_request)
             
@@ -334,11 +537,95 @@ class CRUDWithdrawalRequest:
             db.rollback()
             raise e
     
-    def get_pending_requests(self, db: Session, skip: int = 0, limit: int = 50) -> List[models.WithdrawalRequest]:
-        """Get pending withdrawal requests for admin review."""
-        return db.query(models.WithdrawalRequest).filter(
-            models.WithdrawalRequest.status == models.TransactionStatus.PENDING
-        ).order_by(desc(models.WithdrawalRequest.created_at)).offset(skip).limit(limit).all()
+    def get_user_requests(
+        self,
+        db: Session,
+        user_id: int,
+        limit: int = 20,
+        cursor: Optional[int] = None,
+        status: Optional[models.TransactionStatus] = None,
+        changed_since: Optional[datetime] = None
+    ) -> schemas.WithdrawalRequestPage:
+        """
+        Get a page of a user's withdrawal requests, newest first.
+
+        Pages are keyed on (created_at, id) rather than offsets, so deep pages
+        cost the same as the first and new requests do not shift later pages.
+
+        Args:
+            db: Database session
+            user_id: Owner of the requests
+            limit: Maximum number of requests to return
+            cursor: ``next_cursor`` of the previous page (ID of its last request)
+            status: Only return requests with this status
+            changed_since: Only return requests created or updated at or after this time
+
+        Returns:
+            The page and the cursor of the next page (None on the last page)
+        """
+        query = db.query(models.WithdrawalRequest).filter(models.WithdrawalRequest.user_id == user_id)
+
+        if cursor is not None:
+            # 커서 행의 created_at은 DB에서 읽어 비교 (저장 형식과 무관)
+            cursor_created_at = db.query(models.WithdrawalRequest.created_at).filter(
+                models.WithdrawalRequest.id == cursor,
+                models.WithdrawalRequest.user_id == user_id
+            ).scalar_subquery()
+            query = query.filter(or_(
+                models.WithdrawalRequest.created_at < cursor_created_at,
+                and_(
+                    models.WithdrawalRequest.created_at == cursor_created_at,
+                    models.WithdrawalRequest.id < cursor
+                )
+            ))
+
+        if status:
+            query = query.filter(models.WithdrawalRequest.status == status)
+
+        if changed_since:
+            query = query.filter(
+                func.coalesce(models.WithdrawalRequest.updated_at, models.WithdrawalRequest.created_at) >= changed_since
+            )
+
+        rows = query.order_by(
+            desc(models.WithdrawalRequest.created_at), desc(models.WithdrawalRequest.id)
+        ).limit(limit + 1).all()
+
+        items = [schemas.WithdrawalRequestItem.model_validate(row) for row in rows[:limit]]
+        return schemas.WithdrawalRequestPage(
+            items=items,
+            next_cursor=items[-1].id if len(rows) > limit else None
+        )
+
+    def _claimed_by_other(self, withdrawal_request: models.WithdrawalRequest, admin_user_id: int) -> bool:
+        """Whether another admin holds an unexpired review claim on the request."""
+        if withdrawal_request.claimed_by is None or withdrawal_request.claimed_by == admin_user_id:
+            return False
+        claimed_until = withdrawal_request.claimed_until
+        if claimed_until is None:
+            return False
+        if claimed_until.tzinfo is not None:  # type: ignore
+            claimed_until = claimed_until.replace(tzinfo=None) - claimed_until.utcoffset()  # type: ignore
+        return claimed_until > datetime.utcnow()  # type: ignore
+    
+    def get_status(self, db: Session, request_id: int) -> Optional[schemas.WithdrawalStatus]:
+        """Get the execution status of a withdrawal request and its job."""
+        withdrawal_request = db.query(models.WithdrawalRequest).filter(
+            models.WithdrawalRequest.id == request_id
+        ).first()
+        if not withdrawal_request:
+            return None
+        
+        job = crud_withdrawal_job.get_by_request(db, request_id)
+        return schemas.WithdrawalStatus(
+            request_id=request_id,
+            status=withdrawal_request.status.value,  # type: ignore
+            job_status=job.status.value if job else None,  # type: ignore
+            attempts=int(job.attempts) if job else 0,  # type: ignore
+            ref_tx_id=withdrawal_request.ref_tx_id,  # type: ignore
+            last_error=job.last_error if job else None,  # type: ignore
+            updated_at=withdrawal_request.updated_at or withdrawal_request.processed_at  # type: ignore
+        )
     
     def approve_request(
         self,
@@ -348,42 +635,723 @@ class CRUDWithdrawalRequest:
         approved: bool,
         admin_memo: Optional[str] = None
     ) -> Optional[models.WithdrawalRequest]:
-        """Approve or reject withdrawal request."""
+        """
+        Approve or reject a pending withdrawal request.
+        
+        Approval does not broadcast anything: the request moves to PROCESSING
+        and a withdrawal job is written in the same database transaction for
+        the withdrawal worker to execute.
+        
+        Raises:
+            ValueError: If the request is no longer pending
+        """
+        # 만료 작업/일괄 처리와 같은 행을 동시에 처리하지 않도록 잠금
         withdrawal_request = db.query(models.WithdrawalRequest).filter(
             models.WithdrawalRequest.id == request_id
-        ).first()
+        ).with_for_update().first()
         
         if not withdrawal_request:
+            db.commit()
             return None
         
+        if withdrawal_request.status != models.TransactionStatus.PENDING:
+            db.rollback()
+            raise ValueError(f"Withdrawal request {request_id} is already {withdrawal_request.status.value}")
+        
+        if self._claimed_by_other(withdrawal_request, admin_user_id):
+            db.rollback()
+            raise ValueError(f"Withdrawal request {request_id} is being reviewed by another admin")
+        
         update_data = {
+            'status': models.TransactionStatus.PROCESSING if approved else models.TransactionStatus.CANCELLED,
             'admin_user_id': admin_user_id,
             'processed_at': datetime.utcnow()
         }
+        if admin_memo:
+            update_data['memo'] = admin_memo
         
-        if approved:
-            update_data['status'] = models.TransactionStatus.COMPLETED
-        else:
-            update_data['status'] = models.TransactionStatus.CANCELLED
-            # Unfreeze the amount if rejected
-            crud_balance.unfreeze_amount(
-                db, 
-                int(withdrawal_request.user_id),  # type: ignore
-                str(withdrawal_request.asset),  # type: ignore
-                Decimal(str(withdrawal_request.amount))  # type: ignore
+        try:
+            # Only a still-pending request may move on (the row lock is a no-op on SQLite)
+            updated = db.query(models.WithdrawalRequest).filter(
+                and_(
+                    models.WithdrawalRequest.id == request_id,
+                    models.WithdrawalRequest.status == models.TransactionStatus.PENDING
+                )
+            ).update(update_data, synchronize_session=False)
+            if not updated:
+                raise ValueError(f"Withdrawal request {request_id} was processed concurrently")
+            
+            if approved:
+                transaction = models.Transaction(
+                    user_id=withdrawal_request.user_id,
+                    type=models.TransactionType.WITHDRAWAL,
+                    amount=withdrawal_request.amount,
+                    asset=withdrawal_request.asset,
+                    status=models.TransactionStatus.PROCESSING,
+                    memo=admin_memo,
+                    fee_amount=Decimal('0.00000000')  # Fee already deducted
+                )
+                db.add(transaction)
+                db.flush()
+                
+                db.query(models.WithdrawalRequest).filter(
+                    models.WithdrawalRequest.id == request_id
+                ).update({'transaction_id': transaction.id}, synchronize_session=False)
+                db.add(models.WithdrawalJob(
+                    withdrawal_request_id=request_id,
+                    status=models.WithdrawalJobStatus.QUEUED,
+                    attempts=0
+                ))
+                db.flush()
+            else:
+                # Unfreeze the amount if rejected (committed with the status change)
+                self._unfreeze_requests(db, [request_id], {int(withdrawal_request.user_id)})  # type: ignore
+            
+            db.commit()
+        except IntegrityError:
+            # The unique job per request: another approval won the race
+            db.rollback()
+            raise ValueError(f"Withdrawal request {request_id} was processed concurrently")
+        except Exception:
+            db.rollback()
+            raise
+        
+        db.refresh(withdrawal_request)
+        return withdrawal_request
+
+
+    def bulk_process(
+        self,
+        db: Session,
+        request_ids: List[int],
+        admin_user_id: int,
+        approved: bool,
+        admin_memo: Optional[str] = None
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Approve or reject many pending withdrawal requests in one transaction.
+        
+        The pending rows are locked and moved to their new status with a
+        single UPDATE. Rejections unfreeze every affected balance with one
+        grouped UPDATE; approvals create their transactions and withdrawal
+        jobs together so the worker sends them as one batch.
+        
+        Args:
+            db: Database session
+            request_ids: Withdrawal request IDs
+            admin_user_id: Admin processing the requests
+            approved: True to approve, False to reject
+            admin_memo: Optional memo stored on every request
+            
+        Returns:
+            (processed request IDs, skipped IDs that are missing, not pending or claimed by another admin)
+            
+        Raises:
+            ValueError: If a request changed state while being processed
+        """
+        request_ids = list(dict.fromkeys(request_ids))
+        rows = db.query(
+            models.WithdrawalRequest.id,
+            models.WithdrawalRequest.user_id,
+            models.WithdrawalRequest.amount,
+            models.WithdrawalRequest.asset
+        ).filter(
+            and_(
+                models.WithdrawalRequest.id.in_(request_ids),
+                models.WithdrawalRequest.status == models.TransactionStatus.PENDING,
+                or_(
+                    models.WithdrawalRequest.claimed_by.is_(None),
+                    models.WithdrawalRequest.claimed_by == admin_user_id,
+                    models.WithdrawalRequest.claimed_until <= datetime.utcnow()
+                )
             )
+        ).order_by(models.WithdrawalRequest.id).with_for_update().all()
         
-        if admin_memo:
-            update_data['memo'] = admin_memo
+        processed = [row.id for row in rows]
+        pending_ids = set(processed)
+        skipped = [request_id for request_id in request_ids if request_id not in pending_ids]
+        if not processed:
+            return processed, skipped
         
-        db.query(models.WithdrawalRequest).filter(
-            models.WithdrawalRequest.id == request_id
-        ).update(update_data)
+        try:
+            update_data = {
+                'status': models.TransactionStatus.PROCESSING if approved else models.TransactionStatus.CANCELLED,
+                'admin_user_id': admin_user_id,
+                'processed_at': datetime.utcnow()
+            }
+            if admin_memo:
+                update_data['memo'] = admin_memo
+            updated = db.query(models.WithdrawalRequest).filter(
+                and_(
+                    models.WithdrawalRequest.id.in_(processed),
+                    models.WithdrawalRequest.status == models.TransactionStatus.PENDING
+                )
+            ).update(update_data, synchronize_session=False)
+            if updated != len(processed):
+                raise ValueError("Withdrawal requests were modified concurrently")
+            
+            if approved:
+                transactions = [
+                    models.Transaction(
+                        user_id=row.user_id,
+                        type=models.TransactionType.WITHDRAWAL,
+                        amount=row.amount,
+                        asset=row.asset,
+                        status=models.TransactionStatus.PROCESSING,
+                        memo=admin_memo,
+                        fee_amount=Decimal('0.00000000')  # Fee already deducted
+                    )
+                    for row in rows
+                ]
+                db.add_all(transactions)
+                db.flush()
+                db.bulk_update_mappings(models.WithdrawalRequest, [  # type: ignore
+                    {'id': row.id, 'transaction_id': transaction.id}
+                    for row, transaction in zip(rows, transactions)
+                ])
+                db.add_all([
+                    models.WithdrawalJob(withdrawal_request_id=row.id, status=models.WithdrawalJobStatus.QUEUED, attempts=0)
+                    for row in rows
+                ])
+            else:
+                self._unfreeze_requests(db, processed, {row.user_id for row in rows})
+            
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return processed, skipped
+    
+    def expire_stale(
+        self,
+        db: Session,
+        created_before: datetime,
+        limit: int = 500
+    ) -> List[Tuple[int, int, str, Decimal]]:
+        """
+        Cancel pending requests created before a cutoff and unfreeze their funds.
+        
+        One call handles one batch in one transaction: the oldest stale
+        requests are locked (skipping rows locked elsewhere), cancelled with a
+        single UPDATE and their funds released with one grouped UPDATE.
+        Requests under an unexpired admin review claim are left alone.
+        Approval paths lock the same rows and only move requests that are
+        still PENDING, so a request is never both expired and approved.
         
+        Args:
+            db: Database session
+            created_before: Cancel requests created before this time (UTC)
+            limit: Maximum number of requests to expire
+            
+        Returns:
+            (request ID, user ID, asset, amount) of each expired request
+            
+        Raises:
+            ValueError: If a request changed state while being expired
+        """
+        now = datetime.utcnow()
+        rows = db.query(
+            models.WithdrawalRequest.id,
+            models.WithdrawalRequest.user_id,
+            models.WithdrawalRequest.asset,
+            models.WithdrawalRequest.amount
+        ).filter(
+            and_(
+                models.WithdrawalRequest.status == models.TransactionStatus.PENDING,
+                models.WithdrawalRequest.created_at < created_before,
+                or_(
+                    models.WithdrawalRequest.claimed_until.is_(None),
+                    models.WithdrawalRequest.claimed_until <= now
+                )
+            )
+        ).order_by(models.WithdrawalRequest.id).limit(limit).with_for_update(skip_locked=True).all()
+        if not rows:
+            db.commit()
+            return []
+        
+        expired = [row.id for row in rows]
+        try:
+            updated = db.query(models.WithdrawalRequest).filter(
+                and_(
+                    models.WithdrawalRequest.id.in_(expired),
+                    models.WithdrawalRequest.status == models.TransactionStatus.PENDING
+                )
+            ).update({
+                'status': models.TransactionStatus.CANCELLED,
+                'processed_at': now
+            }, synchronize_session=False)
+            if updated != len(expired):
+                raise ValueError("Withdrawal requests were modified concurrently")
+            
+            self._unfreeze_requests(db, expired, {row.user_id for row in rows})
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return [
+            (int(row.id), int(row.user_id), str(row.asset), Decimal(str(row.amount)))
+            for row in rows
+        ]
+    
+    def _unfreeze_requests(self, db: Session, request_ids: List[int], user_ids: Set[int]) -> None:
+        """Release the frozen funds of cancelled requests without committing."""
+        # 사용자/자산별 합계를 UPDATE 한 번으로 동결 해제
+        released = db.query(func.coalesce(func.sum(models.WithdrawalRequest.amount), 0)).filter(
+            and_(
+                models.WithdrawalRequest.id.in_(request_ids),
+                models.WithdrawalRequest.user_id == models.Balance.user_id,
+                models.WithdrawalRequest.asset == models.Balance.asset
+            )
+        ).scalar_subquery()
+        db.query(models.Balance).filter(
+            models.Balance.user_id.in_(user_ids)
+        ).update({
+            'frozen_amount': models.Balance.frozen_amount - released,
+            'updated_at': datetime.utcnow()
+        }, synchronize_session=False)
+
+
+class CRUDWithdrawalJob:
+    """CRUD operations for WithdrawalJob model (withdrawal outbox)."""
+    
+    def get_by_request(self, db: Session, request_id: int) -> Optional[models.WithdrawalJob]:
+        """Get the job of a withdrawal request."""
+        return db.query(models.WithdrawalJob).filter(
+            models.WithdrawalJob.withdrawal_request_id == request_id
+        ).first()
+    
+    def claim(self, db: Session, limit: int) -> List[int]:
+        """
+        Claim up to ``limit`` queued jobs, oldest first.
+        
+        Each job is moved to RUNNING with a conditional UPDATE, so concurrent
+        workers (threads or processes) never claim the same job twice.
+        
+        Returns:
+            IDs of the claimed jobs
+        """
+        candidates = db.query(models.WithdrawalJob.id).filter(
+            models.WithdrawalJob.status == models.WithdrawalJobStatus.QUEUED
+        ).order_by(models.WithdrawalJob.id).limit(limit).all()
+        
+        claimed = []
+        for (job_id,) in candidates:
+            updated = db.query(models.WithdrawalJob).filter(
+                and_(
+                    models.WithdrawalJob.id == job_id,
+                    models.WithdrawalJob.status == models.WithdrawalJobStatus.QUEUED
+                )
+            ).update({
+                'status': models.WithdrawalJobStatus.RUNNING,
+                'attempts': models.WithdrawalJob.attempts + 1,
+                'started_at': datetime.utcnow()
+            }, synchronize_session=False)
+            if updated:
+                claimed.append(job_id)
         db.commit()
-        db.refresh(withdrawal_request)
+        return claimed
+    
+    def record_results(
+        self,
+        db: Session,
+        txids: Dict[int, str],
+        errors: Dict[int, str],
+        fee_details: Optional[Dict[int, Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Record the outcome of a batch of claimed jobs in one transaction.
         
-        return withdrawal_request
+        Broadcast jobs complete their request and transaction with the txid
+        and settle the frozen funds. Failed jobs are marked FAILED and keep
+        their funds frozen: a failed send may still have reached the
+        network, so they are left for manual review instead of retried.
+        
+        Args:
+            db: Database session
+            txids: Job ID -> broadcast transaction hash
+            errors: Job ID -> failure message
+            fee_details: Job ID -> recipient_type/fee_limit the transfer used
+        """
+        job_ids = list(txids) + list(errors)
+        if not job_ids:
+            return
+        rows = db.query(models.WithdrawalJob.id, models.WithdrawalRequest).join(
+            models.WithdrawalRequest, models.WithdrawalJob.withdrawal_request_id == models.WithdrawalRequest.id
+        ).filter(models.WithdrawalJob.id.in_(job_ids)).all()
+        now = datetime.utcnow()
+        
+        fee_details = fee_details or {}
+        jobs, requests, transactions = [], [], []
+        settled: Dict[Tuple[int, str], Decimal] = {}
+        for job_id, request in rows:
+            if job_id in txids:
+                tx_hash = txids[job_id]
+                jobs.append(dict(
+                    fee_details.get(job_id, {}),
+                    id=job_id, status=models.WithdrawalJobStatus.SUCCEEDED, last_error=None, updated_at=now
+                ))
+                requests.append({'id': request.id, 'status': models.TransactionStatus.COMPLETED, 'ref_tx_id': tx_hash, 'updated_at': now})
+                if request.transaction_id:
+                    transactions.append({'id': request.transaction_id, 'status': models.TransactionStatus.COMPLETED, 'ref_tx_id': tx_hash, 'updated_at': now})
+                key = (int(request.user_id), str(request.asset))  # type: ignore
+                settled[key] = settled.get(key, Decimal('0')) + Decimal(str(request.amount))  # type: ignore
+            else:
+                jobs.append({'id': job_id, 'status': models.WithdrawalJobStatus.FAILED, 'last_error': errors[job_id], 'updated_at': now})
+                requests.append({'id': request.id, 'status': models.TransactionStatus.FAILED, 'updated_at': now})
+                if request.transaction_id:
+                    transactions.append({'id': request.transaction_id, 'status': models.TransactionStatus.FAILED, 'updated_at': now})
+        
+        db.bulk_update_mappings(models.WithdrawalJob, jobs)  # type: ignore
+        db.bulk_update_mappings(models.WithdrawalRequest, requests)  # type: ignore
+        db.bulk_update_mappings(models.Transaction, transactions)  # type: ignore
+        
+        # 동결했던 출금액을 사용자/자산별 UPDATE 한 번으로 차감
+        for (user_id, asset), amount in settled.items():
+            db.query(models.Balance).filter(
+                and_(models.Balance.user_id == user_id, models.Balance.asset == asset)
+            ).update({
+                'amount': models.Balance.amount - amount,
+                'frozen_amount': models.Balance.frozen_amount - amount,
+                'updated_at': now
+            }, synchronize_session=False)
+        db.commit()
+    
+    def get_unfinalized(self, db: Session, since: datetime, limit: int = 100) -> List[str]:
+        """
+        Get the txids of broadcast withdrawals whose receipt is not finalized yet.
+        
+        Args:
+            db: Database session
+            since: Only jobs completed at or after this time (UTC)
+            limit: Maximum number of txids
+            
+        Returns:
+            Transaction hashes, oldest job first
+        """
+        rows = db.query(models.WithdrawalRequest.ref_tx_id).join(
+            models.WithdrawalJob, models.WithdrawalJob.withdrawal_request_id == models.WithdrawalRequest.id
+        ).outerjoin(
+            models.FinalizedTransaction, models.FinalizedTransaction.tx_hash == models.WithdrawalRequest.ref_tx_id
+        ).filter(
+            and_(
+                models.WithdrawalJob.status == models.WithdrawalJobStatus.SUCCEEDED,
+                models.WithdrawalJob.updated_at >= since,
+                models.WithdrawalRequest.ref_tx_id.isnot(None),
+                models.FinalizedTransaction.id.is_(None)
+            )
+        ).order_by(models.WithdrawalJob.id).limit(limit).all()
+        return [row[0] for row in rows]
+    
+    def record_reverted(self, db: Session, tx_hash: str) -> bool:
+        """
+        Reopen a settled withdrawal whose transfer failed on-chain.
+        
+        The job, request and transaction are marked FAILED and the settled
+        amount is restored to the balance frozen, so it is left for manual
+        review like any other failed withdrawal.
+        
+        Args:
+            db: Database session
+            tx_hash: Finalized transaction hash with a failed receipt
+            
+        Returns:
+            True if a withdrawal was reopened
+        """
+        row = db.query(models.WithdrawalJob.id, models.WithdrawalRequest).join(
+            models.WithdrawalRequest, models.WithdrawalJob.withdrawal_request_id == models.WithdrawalRequest.id
+        ).filter(
+            and_(
+                models.WithdrawalRequest.ref_tx_id == tx_hash,
+                models.WithdrawalJob.status == models.WithdrawalJobStatus.SUCCEEDED
+            )
+        ).first()
+        if not row:
+            return False
+        job_id, request = row
+        now = datetime.utcnow()
+        amount = Decimal(str(request.amount))  # type: ignore
+        try:
+            updated = db.query(models.WithdrawalJob).filter(
+                and_(
+                    models.WithdrawalJob.id == job_id,
+                    models.WithdrawalJob.status == models.WithdrawalJobStatus.SUCCEEDED
+                )
+            ).update({
+                'status': models.WithdrawalJobStatus.FAILED,
+                'last_error': f"Transaction {tx_hash} failed on-chain",
+                'updated_at': now
+            }, synchronize_session=False)
+            if not updated:
+                db.rollback()
+                return False
+            db.query(models.WithdrawalRequest).filter(models.WithdrawalRequest.id == request.id).update(
+                {'status': models.TransactionStatus.FAILED, 'updated_at': now}, synchronize_session=False
+            )
+            if request.transaction_id:
+                db.query(models.Transaction).filter(models.Transaction.id == request.transaction_id).update(
+                    {'status': models.TransactionStatus.FAILED, 'updated_at': now}, synchronize_session=False
+                )
+            # 정산 때 차감한 금액을 되돌리고 검토가 끝날 때까지 동결
+            db.query(models.Balance).filter(
+                and_(models.Balance.user_id == request.user_id, models.Balance.asset == request.asset)
+            ).update({
+                'amount': models.Balance.amount + amount,
+                'frozen_amount': models.Balance.frozen_amount + amount,
+                'updated_at': now
+            }, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return True
+    
+    def get_stale_running(self, db: Session, started_before: datetime) -> List[int]:
+        """
+        Get IDs of jobs claimed before a cutoff that never recorded a result.
+        
+        A worker that died between claiming and recording leaves its jobs
+        RUNNING. They may already have been broadcast, so they are reported
+        for manual review and never requeued.
+        """
+        rows = db.query(models.WithdrawalJob.id).filter(
+            and_(
+                models.WithdrawalJob.status == models.WithdrawalJobStatus.RUNNING,
+                models.WithdrawalJob.started_at < started_before
+            )
+        ).order_by(models.WithdrawalJob.id).all()
+        return [row[0] for row in rows]
+    
+    def count_reverted(self, db: Session) -> int:
+        """Number of failed jobs whose broadcast transfer failed on-chain."""
+        return db.query(func.count(models.WithdrawalJob.id)).join(
+            models.WithdrawalRequest, models.WithdrawalJob.withdrawal_request_id == models.WithdrawalRequest.id
+        ).join(
+            models.FinalizedTransaction, models.FinalizedTransaction.tx_hash == models.WithdrawalRequest.ref_tx_id
+        ).filter(
+            and_(
+                models.WithdrawalJob.status == models.WithdrawalJobStatus.FAILED,
+                models.FinalizedTransaction.success == False
+            )
+        ).scalar() or 0
+    
+    def count_by_status(self, db: Session) -> Dict[str, int]:
+        """Number of jobs per status."""
+        rows = db.query(models.WithdrawalJob.status, func.count(models.WithdrawalJob.id)).group_by(
+            models.WithdrawalJob.status
+        ).all()
+        counts = {job_status.value: 0 for job_status in models.WithdrawalJobStatus}
+        counts.update({job_status.value: count for job_status, count in rows})
+        return counts
+
+
+class CRUDDepositAddress:
+    """CRUD operations for DepositAddress model."""
+    
+    def get_user_address(self, db: Session, user_id: int) -> Optional[models.DepositAddress]:
+        """Get the active HD deposit address of a user."""
+        return db.query(models.DepositAddress).filter(
+            and_(
+                models.DepositAddress.user_id == user_id,
+                models.DepositAddress.is_active == True,
+                models.DepositAddress.derivation_index.isnot(None)
+            )
+        ).first()
+    
+    def get_users_without_address(self, db: Session, after_user_id: int = 0, limit: int = 10000) -> List[int]:
+        """
+        Get IDs of active users that have no HD deposit address yet.
+        
+        Args:
+            db: Database session
+            after_user_id: Only return IDs greater than this (keyset pagination)
+            limit: Maximum number of IDs
+            
+        Returns:
+            Ascending list of user IDs
+        """
+        has_address = db.query(models.DepositAddress.user_id).filter(
+            models.DepositAddress.derivation_index.isnot(None)
+        )
+        rows = db.query(models.User.id).filter(
+            models.User.is_active == True,
+            models.User.id > after_user_id,
+            ~models.User.id.in_(has_address)
+        ).order_by(models.User.id).limit(limit).all()
+        return [row[0] for row in rows]
+    
+    def create_hd_addresses(self, db: Session, addresses: List[Tuple[int, int, str]]) -> int:
+        """
+        Store derived deposit addresses in one transaction.
+        
+        Addresses stored concurrently by another writer (e.g. a user
+        requesting their address during provisioning) are skipped; the rest
+        of the batch is still stored.
+        
+        Args:
+            db: Database session
+            addresses: (user_id, derivation_index, address) tuples
+            
+        Returns:
+            Number of stored addresses
+        """
+        candidates = [
+            models.DepositAddress(
+                user_id=user_id,
+                derivation_index=derivation_index,
+                address=address,
+                is_active=True
+            )
+            for user_id, derivation_index, address in addresses
+        ]
+        try:
+            with db.begin_nested():
+                db.add_all(candidates)
+            stored = len(candidates)
+        except IntegrityError:
+            # Some were stored concurrently; insert one at a time and skip those
+            stored = 0
+            for deposit_address in candidates:
+                try:
+                    with db.begin_nested():
+                        db.add(deposit_address)
+                except IntegrityError:
+                    continue
+                stored += 1
+        db.commit()
+        return stored
+
+
+class CRUDFinalizedTransaction:
+    """CRUD operations for FinalizedTransaction model."""
+    
+    def get_by_hash(self, db: Session, tx_hash: str) -> Optional[models.FinalizedTransaction]:
+        """Get finalized transaction by hash."""
+        return db.query(models.FinalizedTransaction).filter(
+            models.FinalizedTransaction.tx_hash == tx_hash
+        ).first()
+    
+    def create(self, db: Session, finalized_data: dict) -> models.FinalizedTransaction:
+        """
+        Store a finalized transaction receipt.
+        
+        Concurrent writers may race on the same hash; the loser keeps the
+        row that is already stored.
+        """
+        db_finalized = models.FinalizedTransaction(**finalized_data)
+        db.add(db_finalized)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            existing = self.get_by_hash(db, finalized_data["tx_hash"])
+            if existing:
+                return existing
+            raise
+        db.refresh(db_finalized)
+        return db_finalized
+
+
+class CRUDChainCursor:
+    """CRUD operations for ChainCursor model."""
+    
+    def get_or_create(self, db: Session, name: str) -> models.ChainCursor:
+        """Get cursor by name, creating an empty one if missing (not committed)."""
+        cursor = db.query(models.ChainCursor).filter(models.ChainCursor.name == name).first()
+        if not cursor:
+            cursor = models.ChainCursor(name=name, min_timestamp=0, last_timestamp=0, block_number=0)
+            db.add(cursor)
+            db.flush()
+        return cursor
+
+
+class CRUDChainBlock:
+    """CRUD operations for ChainBlock model."""
+    
+    def get(self, db: Session, block_number: int) -> Optional[models.ChainBlock]:
+        """Get a recorded block by number."""
+        return db.query(models.ChainBlock).filter(models.ChainBlock.block_number == block_number).first()
+    
+    def add(self, db: Session, block_number: int, block_hash: str) -> None:
+        """Record a scanned block (not committed)."""
+        db.merge(models.ChainBlock(block_number=block_number, block_hash=block_hash))
+    
+    def delete_from(self, db: Session, block_number: int) -> None:
+        """Forget blocks at or above ``block_number`` (not committed)."""
+        db.query(models.ChainBlock).filter(
+            models.ChainBlock.block_number >= block_number
+        ).delete(synchronize_session=False)
+    
+    def prune_below(self, db: Session, block_number: int) -> None:
+        """Forget blocks below ``block_number`` that can no longer be reorganized (not committed)."""
+        db.query(models.ChainBlock).filter(
+            models.ChainBlock.block_number < block_number
+        ).delete(synchronize_session=False)
+
+
+class CRUDDepositSweep:
+    """CRUD operations for DepositSweep model."""
+    
+    def get_unswept(
+        self,
+        db: Session,
+        asset: str = "USDT",
+        limit: Optional[int] = None
+    ) -> List[Tuple[models.DepositAddress, Decimal, int, int]]:
+        """
+        Get HD deposit addresses holding deposits not swept yet.
+        
+        Only on-chain deposits received on the address itself are counted;
+        deposits the owner made to other addresses (e.g. the company wallet
+        with a memo) never reached it.
+        
+        Args:
+            db: Database session
+            asset: Deposited asset
+            limit: Maximum number of addresses (largest balances first)
+            
+        Returns:
+            (address, unswept amount, deposit count, last deposit transaction id) tuples
+        """
+        swept = db.query(
+            models.DepositSweep.deposit_address_id,
+            func.max(models.DepositSweep.through_transaction_id).label("through_id")
+        ).filter(
+            models.DepositSweep.status == models.TransactionStatus.COMPLETED
+        ).group_by(models.DepositSweep.deposit_address_id).subquery()
+        
+        amount = func.sum(models.Transaction.amount)
+        query = db.query(
+            models.DepositAddress, amount, func.count(models.Transaction.id), func.max(models.Transaction.id)
+        ).join(
+            models.Transaction, and_(
+                models.Transaction.user_id == models.DepositAddress.user_id,
+                models.Transaction.to_address == models.DepositAddress.address
+            )
+        ).outerjoin(
+            swept, swept.c.deposit_address_id == models.DepositAddress.id
+        ).filter(
+            models.DepositAddress.is_active == True,
+            models.DepositAddress.derivation_index.isnot(None),
+            models.Transaction.type == models.TransactionType.DEPOSIT,
+            models.Transaction.status == models.TransactionStatus.COMPLETED,
+            models.Transaction.asset == asset,
+            models.Transaction.ref_tx_id.isnot(None),
+            models.Transaction.id > func.coalesce(swept.c.through_id, 0)
+        ).group_by(models.DepositAddress.id).order_by(desc(amount), models.DepositAddress.id)
+        if limit:
+            query = query.limit(limit)
+        return [
+            (address, Decimal(str(total)), int(count), int(through_id))
+            for address, total, count, through_id in query.all()
+        ]
+    
+    def create(self, db: Session, sweep_data: dict) -> models.DepositSweep:
+        """Record a sweep attempt."""
+        db_sweep = models.DepositSweep(**sweep_data)
+        db.add(db_sweep)
+        db.commit()
+        db.refresh(db_sweep)
+        return db_sweep
 
 
 # Global CRUD instances
@@ -391,3 +1359,9 @@ crud_user = CRUDUser()
 crud_balance = CRUDBalance()
 crud_transaction = CRUDTransaction()
 crud_withdrawal_request = CRUDWithdrawalRequest()
+crud_withdrawal_job = CRUDWithdrawalJob()
+crud_deposit_address = CRUDDepositAddress()
+crud_finalized_transaction = CRUDFinalizedTransaction()
+crud_chain_cursor = CRUDChainCursor()
+crud_chain_block = CRUDChainBlock()
+crud_deposit_sweep = CRUDDepositSweep()
@@ -8,12 +8,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.exc import SQLAlchemyError
+import asyncio
 import logging
 import time
 
 from .core.config import settings
 from .core.db import init_db
 from .routers import users, wallet, tx, admin, admin_web
+from .utils.tron import run_node_health_checks, run_block_height_refresher, warm_up_tron_service
+from .utils.company_wallet import company_balance
+from .utils.deposit_indexer import run_deposit_indexer
+from .utils.block_scanner import run_block_scanner
+from .utils.withdrawal_worker import run_withdrawal_worker
+from .utils.withdrawal_expiry import run_withdrawal_expiry
+from .utils.velocity import run_velocity_pruner
 
 # 로깅 설정
 logging.basicConfig(
@@ -22,6 +30,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 시작 시 생성되어 종료 시 취소되는 백그라운드 작업 목록
+background_tasks = []
+
 # FastAPI 애플리케이션 생성
 app = FastAPI(
     title=settings.project_name,
@@ -271,6 +282,42 @@ async def startup_event():
         logger.info(f"Tron 네트워크: {settings.tron_network}")
         logger.info(f"토큰 만료 시간: {settings.access_token_expire_minutes}분")
         
+        # 백그라운드 작업 시작
+        background_tasks.append(asyncio.create_task(warm_up_tron_service()))
+        if settings.tron_health_check_interval > 0:
+            background_tasks.append(
+                asyncio.create_task(run_node_health_checks(settings.tron_health_check_interval))
+            )
+        if settings.block_height_refresh_interval > 0:
+            background_tasks.append(
+                asyncio.create_task(run_block_height_refresher(settings.block_height_refresh_interval))
+            )
+        if settings.company_balance_refresh_interval > 0:
+            background_tasks.append(
+                asyncio.create_task(company_balance.run_refresher(settings.company_balance_refresh_interval))
+            )
+        if settings.deposit_indexer_interval > 0:
+            background_tasks.append(
+                asyncio.create_task(run_deposit_indexer(settings.deposit_indexer_interval))
+            )
+        if settings.deposit_scanner_interval > 0:
+            # 스캐너는 정확히 한 프로세스에서만 실행 (uvicorn 워커마다 켜지 않음)
+            background_tasks.append(
+                asyncio.create_task(run_block_scanner(settings.deposit_scanner_interval))
+            )
+        if settings.withdrawal_worker_interval > 0:
+            background_tasks.append(
+                asyncio.create_task(run_withdrawal_worker(settings.withdrawal_worker_interval))
+            )
+        if settings.withdrawal_expiry_interval > 0:
+            background_tasks.append(
+                asyncio.create_task(run_withdrawal_expiry(settings.withdrawal_expiry_interval))
+            )
+        if settings.velocity_prune_interval > 0:
+            background_tasks.append(
+                asyncio.create_task(run_velocity_pruner(settings.velocity_prune_interval))
+            )
+        
         logger.info("USDT TRC20 지갑 서비스가 성공적으로 시작되었습니다")
         
     except Exception as e:
@@ -287,8 +334,11 @@ async def shutdown_event():
     """
     logger.info("USDT TRC20 지갑 서비스를 종료합니다...")
     
-    # 여기에 정리 로직 추가
-    # 예: 데이터베이스 연결 종료, 백그라운드 작업 중지 등
+    # 백그라운드 작업 중지
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
     
     logger.info("USDT TRC20 지갑 서비스 종료 완료")
 
@@ -3,7 +3,7 @@ USDT TRC20 지갑 서비스의 데이터베이스 모델.
 사용자, 잔액, 트랜잭션에 대한 SQLAlchemy 모델을 정의합니다.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, ForeignKey, Text, DECIMAL
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Enum, ForeignKey, Index, Text, UniqueConstraint, DECIMAL
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
@@ -23,11 +23,20 @@ class TransactionType(PyEnum):
 class TransactionStatus(PyEnum):
     """트랜잭션 상태 열거형."""
     PENDING = "pending"       # 대기 중
+    PROCESSING = "processing" # 처리 중 (출금 브로드캐스트 대기)
     COMPLETED = "completed"   # 완료
     FAILED = "failed"         # 실패
     CANCELLED = "cancelled"   # 취소
 
 
+class WithdrawalJobStatus(PyEnum):
+    """출금 작업 상태 열거형."""
+    QUEUED = "queued"         # 대기열
+    RUNNING = "running"       # 브로드캐스트 중
+    SUCCEEDED = "succeeded"   # 성공
+    FAILED = "failed"         # 실패 (수동 확인 필요)
+
+
 class User(Base):
     """
     시스템 사용자를 나타내는 사용자 모델.
@@ -38,6 +47,7 @@ class User(Base):
         password_hash: 해시된 패스워드
         is_admin: 관리자 권한 플래그
         is_active: 계정 상태 플래그
+        priority_tier: 출금 처리 우선순위 등급 (높을수록 먼저)
         created_at: 계정 생성 타임스탬프
         updated_at: 마지막 업데이트 타임스탬프
     """
@@ -48,6 +58,7 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     is_admin = Column(Boolean, default=False, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    priority_tier = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -98,6 +109,9 @@ class Transaction(Base):
         asset: Asset symbol
         status: Transaction status
         ref_tx_id: Reference transaction ID (blockchain hash for on-chain transactions)
+        log_index: Position of a deposit among the transaction's transfers to the same user
+        block_number: Block containing the on-chain transaction (deposits)
+        to_address: Address that received the on-chain transaction (deposits)
         related_user_id: Related user ID (for internal transfers)
         memo: Transaction memo/description
         fee_amount: Transaction fee amount
@@ -113,6 +127,9 @@ class Transaction(Base):
     asset = Column(String, nullable=False, default="USDT")
     status = Column(Enum(TransactionStatus), nullable=False, default=TransactionStatus.PENDING)
     ref_tx_id = Column(String, nullable=True)  # 블록체인 트랜잭션 해시
+    log_index = Column(Integer, nullable=False, default=0)  # 같은 트랜잭션에서 같은 사용자에게 온 전송 순번 (입금)
+    block_number = Column(BigInteger, nullable=True)  # 온체인 입금이 포함된 블록
+    to_address = Column(String, nullable=True)  # 온체인 입금을 받은 주소
     related_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # 내부 송금용
     memo = Column(Text, nullable=True)
     fee_amount = Column(DECIMAL(precision=18, scale=8), nullable=False, default=PyDecimal('0.00000000'))
@@ -124,6 +141,19 @@ class Transaction(Base):
     related_user = relationship("User", foreign_keys=[related_user_id])
 
 
+# 같은 온체인 전송은 한 번만 입금 처리 (재구성으로 취소된 입금은 제외)
+_active_deposit = (Transaction.type == TransactionType.DEPOSIT) & (Transaction.status != TransactionStatus.CANCELLED)
+Index(
+    "uq_transactions_deposit_ref",
+    Transaction.ref_tx_id,
+    Transaction.log_index,
+    Transaction.user_id,
+    unique=True,
+    sqlite_where=_active_deposit,
+    postgresql_where=_active_deposit,
+)
+
+
 class DepositAddress(Base):
     """
     Deposit address model for tracking user-specific deposit addresses.
@@ -133,15 +163,17 @@ class DepositAddress(Base):
         user_id: Foreign key to user
         address: Tron wallet address
         memo: Deposit memo/tag for identification
+        derivation_index: HD address index (m/44'/195'/account'/0/index)
         is_active: Address status flag
         created_at: Creation timestamp
     """
     __tablename__ = "deposit_addresses"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    address = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    address = Column(String, nullable=False, index=True)
     memo = Column(String, nullable=True)  # 입금 식별을 위한 선택적 메모
+    derivation_index = Column(Integer, nullable=True, unique=True)  # HD 파생 주소 인덱스
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -163,7 +195,11 @@ class WithdrawalRequest(Base):
         admin_user_id: Admin who processed the request
         processed_at: Processing timestamp
         transaction_id: Related transaction ID after processing
+        ref_tx_id: Blockchain transaction hash once broadcast
+        claimed_by: Admin currently reviewing the request
+        claimed_until: End of the admin's review lease
         created_at: Request creation timestamp
+        updated_at: Last status change timestamp
     """
     __tablename__ = "withdrawal_requests"
 
@@ -176,10 +212,197 @@ class WithdrawalRequest(Base):
     admin_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     processed_at = Column(DateTime(timezone=True), nullable=True)
     transaction_id = Column(Integer, ForeignKey("transactions.id"), nullable=True)
+    ref_tx_id = Column(String, nullable=True, index=True)  # 블록체인 트랜잭션 해시
     memo = Column(Text, nullable=True)
+    claimed_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # 검토 중인 관리자
+    claimed_until = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # 사용자별 출금 요청 목록 (키셋 페이지네이션)
+    __table_args__ = (
+        Index("ix_withdrawal_requests_user_created", "user_id", "created_at"),
+    )
 
     # 관계 설정
     user = relationship("User", foreign_keys=[user_id])
     admin_user = relationship("User", foreign_keys=[admin_user_id])
     transaction = relationship("Transaction")
+
+
+class WithdrawalJob(Base):
+    """
+    Durable outbox entry for broadcasting an approved withdrawal.
+    
+    Written in the same database transaction as the approval and processed
+    by the withdrawal worker, so the HTTP request never waits on the chain.
+    
+    Attributes:
+        id: Primary key
+        withdrawal_request_id: Withdrawal request to broadcast (one job per request)
+        status: Job status
+        attempts: Number of times a worker claimed the job
+        last_error: Last failure message
+        recipient_type: 'new' or 'existing' USDT holder at send time
+        fee_limit: fee_limit the transfer was sent with (SUN)
+        started_at: When a worker claimed the job
+        created_at: Enqueue timestamp
+        updated_at: Last update timestamp
+    """
+    __tablename__ = "withdrawal_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    withdrawal_request_id = Column(Integer, ForeignKey("withdrawal_requests.id"), nullable=False, unique=True)
+    status = Column(Enum(WithdrawalJobStatus), nullable=False, default=WithdrawalJobStatus.QUEUED, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    recipient_type = Column(String(16), nullable=True)  # 수수료 추정용 수신자 유형
+    fee_limit = Column(BigInteger, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # 관계 설정
+    withdrawal_request = relationship("WithdrawalRequest")
+
+
+class FinalizedTransaction(Base):
+    """
+    Finalized on-chain transaction model caching immutable receipts.
+    
+    Once a transaction has MIN_CONFIRMATIONS its status can no longer
+    change, so status checks are answered from this table.
+    
+    Attributes:
+        id: Primary key
+        tx_hash: Blockchain transaction hash
+        block_number: Block containing the transaction
+        block_timestamp: Block timestamp (Unix milliseconds)
+        success: Whether the transaction executed successfully
+        energy_used: Total energy consumed
+        net_used: Bandwidth consumed
+        created_at: Record creation timestamp
+    """
+    __tablename__ = "finalized_transactions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tx_hash = Column(String(64), unique=True, index=True, nullable=False)
+    block_number = Column(BigInteger, nullable=False)
+    block_timestamp = Column(BigInteger, nullable=False, default=0)
+    success = Column(Boolean, nullable=False)
+    energy_used = Column(BigInteger, nullable=False, default=0)
+    net_used = Column(BigInteger, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ChainCursor(Base):
+    """
+    Persistent chain indexing cursor.
+    
+    Lets indexers resume after a restart without re-downloading history.
+    
+    Attributes:
+        id: Primary key
+        name: Unique cursor name (e.g. 'trc20:<contract>:<address>')
+        fingerprint: TronGrid page fingerprint for the pass in progress
+        min_timestamp: Lower timestamp bound of the pass in progress (Unix ms)
+        last_timestamp: Newest event timestamp seen so far (Unix ms)
+        block_number: Last fully processed block (block scanners)
+        updated_at: Last update timestamp
+    """
+    __tablename__ = "chain_cursors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+    fingerprint = Column(Text, nullable=True)
+    min_timestamp = Column(BigInteger, nullable=False, default=0)
+    last_timestamp = Column(BigInteger, nullable=False, default=0)
+    block_number = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ChainBlock(Base):
+    """
+    Recently scanned block hashes used to detect chain reorganizations.
+    
+    Only blocks that are not yet final are kept.
+    
+    Attributes:
+        block_number: Block number (primary key)
+        block_hash: Block ID as returned by the node
+        created_at: Scan timestamp
+    """
+    __tablename__ = "chain_blocks"
+
+    block_number = Column(BigInteger, primary_key=True)
+    block_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class VelocityCounter(Base):
+    """
+    Per-user amount counter for one time bucket, used for velocity limits.
+    
+    Each (user, asset, operation) has one row per bucket, so a sliding
+    window is read as the few buckets it covers instead of a scan over
+    transactions.
+    
+    Attributes:
+        id: Primary key
+        user_id: Foreign key to user
+        asset: Asset symbol
+        operation: Counted operation ('withdrawal' or 'transfer')
+        bucket_start: Start of the time bucket (UTC)
+        amount: Total amount in the bucket
+        count: Number of operations in the bucket
+    """
+    __tablename__ = "velocity_counters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    asset = Column(String, nullable=False)
+    operation = Column(String(16), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    amount = Column(DECIMAL(precision=18, scale=8), nullable=False, default=PyDecimal('0.00000000'))
+    count = Column(Integer, nullable=False, default=0)
+
+    # 버킷 범위 조회와 upsert 대상
+    __table_args__ = (
+        UniqueConstraint("user_id", "asset", "operation", "bucket_start", name="uq_velocity_counter_bucket"),
+    )
+
+
+class DepositSweep(Base):
+    """
+    Consolidation of a deposit address balance into the hot wallet.
+    
+    Deposits recorded for the address owner up to ``through_transaction_id``
+    count as swept once a sweep succeeds, so the unswept balance of an
+    address is the sum of its later completed deposits.
+    
+    Attributes:
+        id: Primary key
+        deposit_address_id: Foreign key to the swept deposit address
+        address: Swept address
+        amount: USDT moved to the hot wallet
+        through_transaction_id: Last deposit transaction covered by the sweep
+        funded_trx: TRX sent to the address beforehand to pay for the transfer
+        funding_tx_id: Blockchain hash of the TRX funding transfer
+        ref_tx_id: Blockchain hash of the USDT sweep transfer
+        status: COMPLETED when broadcast, FAILED otherwise
+        error: Failure reason
+        created_at: Creation timestamp
+    """
+    __tablename__ = "deposit_sweeps"
+
+    id = Column(Integer, primary_key=True, index=True)
+    deposit_address_id = Column(Integer, ForeignKey("deposit_addresses.id"), nullable=False, index=True)
+    address = Column(String, nullable=False)
+    amount = Column(DECIMAL(precision=18, scale=8), nullable=False, default=PyDecimal('0.00000000'))
+    through_transaction_id = Column(Integer, nullable=False, default=0)
+    funded_trx = Column(DECIMAL(precision=18, scale=8), nullable=False, default=PyDecimal('0.00000000'))
+    funding_tx_id = Column(String, nullable=True)  # TRX 충전 트랜잭션 해시
+    ref_tx_id = Column(String, nullable=True)  # USDT 스윕 트랜잭션 해시
+    status = Column(Enum(TransactionStatus), nullable=False, default=TransactionStatus.PENDING)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
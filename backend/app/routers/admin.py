@@ -3,16 +3,22 @@ Admin-related API routes.
 Handles admin functions like user management, withdrawal approvals, and system monitoring.
 """
 
-from typing import Any, List
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from decimal import Decimal
+from datetime import timedelta
 
 from ..core.db import get_db
 from ..core.config import settings
-from ..crud import crud_user, crud_balance, crud_withdrawal_request, crud_transaction
+from ..crud import crud_user, crud_balance, crud_withdrawal_request, crud_withdrawal_job, crud_transaction
 from ..deps import get_current_admin_user, common_pagination_params
-from ..utils.tron import get_tron_service
+from ..utils.address import is_valid_address
+from ..utils.tron import BroadcastUnknownError, get_tron_service
+from ..utils.company_wallet import company_balance
+from ..utils.withdrawal_expiry import expire_stale_withdrawals
+from ..utils.withdrawal_scheduler import withdrawal_scheduler
+from ..utils.withdrawal_worker import notify_withdrawal_worker
 from .. import schemas, models
 
 router = APIRouter()
@@ -137,6 +143,24 @@ def get_all_balances(
         )
 
 
+def _pending_request_data(db: Session, request: models.WithdrawalRequest) -> dict:
+    """Admin view of a pending withdrawal request."""
+    user = crud_user.get(db, int(request.user_id))  # type: ignore
+    return {
+        "id": int(request.id),  # type: ignore
+        "user_id": int(request.user_id),  # type: ignore
+        "user_email": str(user.email) if user else "Unknown",  # type: ignore
+        "amount": float(request.amount),  # type: ignore
+        "asset": str(request.asset),  # type: ignore
+        "destination_address": str(request.destination_address),  # type: ignore
+        "status": str(request.status),  # type: ignore
+        "memo": str(request.memo) if request.memo else None,  # type: ignore
+        "claimed_by": int(request.claimed_by) if request.claimed_by else None,  # type: ignore
+        "claimed_until": request.claimed_until.isoformat() if request.claimed_until else None,  # type: ignore
+        "created_at": request.created_at.isoformat() if request.created_at else None,  # type: ignore
+    }
+
+
 @router.get("/withdrawals/pending", response_model=schemas.AdminWithdrawalList)
 def get_pending_withdrawals(
     *,
@@ -150,29 +174,14 @@ def get_pending_withdrawals(
     - **page**: Page number (default: 1)
     - **page_size**: Items per page (default: 50)
     
-    Returns list of pending withdrawal requests.
+    Returns pending withdrawal requests in scheduling order (overdue,
+    user tier and amount tier per the queue policy, then oldest first).
     """
     try:
-        pending_requests = crud_withdrawal_request.get_pending_requests(
+        pending_requests = withdrawal_scheduler.pending(
             db, skip=pagination["skip"], limit=pagination["limit"]
         )
-        
-        requests_data = []
-        for request in pending_requests:
-            # Get user info
-            user = crud_user.get(db, int(request.user_id))  # type: ignore
-            
-            requests_data.append({
-                "id": int(request.id),  # type: ignore
-                "user_id": int(request.user_id),  # type: ignore
-                "user_email": str(user.email) if user else "Unknown",  # type: ignore
-                "amount": float(request.amount),  # type: ignore
-                "asset": str(request.asset),  # type: ignore
-                "destination_address": str(request.destination_address),  # type: ignore
-                "status": str(request.status),  # type: ignore
-                "memo": str(request.memo) if request.memo else None,  # type: ignore
-                "created_at": request.created_at.isoformat() if request.created_at else None,  # type: ignore
-            })
+        requests_data = [_pending_request_data(db, request) for request in pending_requests]
         
         return schemas.AdminWithdrawalList(
             requests=requests_data,
@@ -186,6 +195,117 @@ def get_pending_withdrawals(
         )
 
 
+@router.post("/withdrawals/claim", response_model=schemas.AdminWithdrawalList)
+def claim_pending_withdrawals(
+    *,
+    db: Session = Depends(get_db),
+    current_admin: models.User = Depends(get_current_admin_user),
+    limit: int = Query(20, ge=1, le=100, description="Maximum requests to claim")
+) -> Any:
+    """
+    Claim the next pending withdrawal requests for review.
+    
+    - **limit**: Maximum requests to claim (default: 20)
+    
+    Claimed requests are hidden from other admins' claims and cannot be
+    approved or rejected by them until the lease ends or they are released.
+    """
+    try:
+        claimed = withdrawal_scheduler.claim(db, int(current_admin.id), limit)  # type: ignore
+        requests_data = [_pending_request_data(db, request) for request in claimed]
+        
+        return schemas.AdminWithdrawalList(
+            requests=requests_data,
+            total_count=len(requests_data)
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to claim pending withdrawals: {str(e)}"
+        )
+
+
+@router.post("/withdrawals/release", response_model=schemas.SuccessResponse)
+def release_claimed_withdrawals(
+    *,
+    db: Session = Depends(get_db),
+    current_admin: models.User = Depends(get_current_admin_user),
+    release_data: schemas.WithdrawalRelease
+) -> Any:
+    """
+    Return claimed withdrawal requests to the queue.
+    
+    - **request_ids**: Requests claimed by the current admin
+    """
+    try:
+        released = withdrawal_scheduler.release(
+            db, release_data.request_ids, int(current_admin.id)  # type: ignore
+        )
+        return schemas.SuccessResponse(
+            message=f"{released} withdrawal requests released",
+            data={"released": released}
+        )
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to release withdrawal requests: {str(e)}"
+        )
+
+
+@router.post("/withdrawals/expire")
+def expire_stale_withdrawal_requests(
+    *,
+    db: Session = Depends(get_db),
+    current_admin: models.User = Depends(get_current_admin_user),
+    max_age_hours: Optional[float] = Query(None, gt=0, description="Expire pending requests older than this (default: configured age)")
+) -> Any:
+    """
+    Expire stale pending withdrawal requests now.
+    
+    Pending requests older than the given age are cancelled and their
+    frozen funds released. Returns the expired request IDs and the amount
+    released per affected user and asset.
+    """
+    try:
+        report = expire_stale_withdrawals(
+            db,
+            timedelta(hours=max_age_hours or settings.withdrawal_expiry_hours),
+            batch_size=settings.withdrawal_expiry_batch_size
+        )
+        return report.to_dict()
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to expire withdrawal requests: {str(e)}"
+        )
+
+
+@router.get("/withdrawals/queue-metrics")
+def get_withdrawal_queue_metrics(
+    *,
+    db: Session = Depends(get_db),
+    current_admin: models.User = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Get pending withdrawal queue metrics.
+    
+    Returns queue depth (total, claimed, past the SLA and per amount tier)
+    and time-in-queue percentiles in seconds for waiting requests and for
+    recently decided ones.
+    """
+    try:
+        return withdrawal_scheduler.metrics(db)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve withdrawal queue metrics: {str(e)}"
+        )
+
+
 @router.post("/withdrawals/approve", response_model=schemas.SuccessResponse)
 def approve_withdrawal_request(
     *,
@@ -200,7 +320,8 @@ def approve_withdrawal_request(
     - **approved**: True to approve, False to reject
     - **admin_memo**: Optional admin memo/reason
     
-    Approved requests will trigger blockchain transaction.
+    Approved requests are queued for the withdrawal worker and broadcast
+    in the background; poll the status endpoint for the result.
     """
     try:
         # Process approval
@@ -219,46 +340,15 @@ def approve_withdrawal_request(
             )
         
         if approval_data.approved:
-            # If approved, initiate blockchain transaction
-            # This would typically be done in a background task
-            try:
-                tx_hash = get_tron_service().send_usdt(
-                    to_address=str(updated_request.destination_address),  # type: ignore
-                    amount=Decimal(str(updated_request.amount)),  # type: ignore
-                    memo=approval_data.admin_memo
-                )
-                
-                if tx_hash:
-                    # Create transaction record
-                    transaction_data = {
-                        "user_id": int(updated_request.user_id),  # type: ignore
-                        "type": models.TransactionType.WITHDRAWAL,
-                        "amount": Decimal(str(updated_request.amount)),  # type: ignore
-                        "asset": str(updated_request.asset),  # type: ignore
-                        "status": models.TransactionStatus.COMPLETED,
-                        "ref_tx_id": tx_hash,
-                        "memo": approval_data.admin_memo,
-                        "fee_amount": Decimal('0.00000000')  # Fee already deducted
-                    }
-                    
-                    crud_transaction.create(db, transaction_data)
-                    
-                    return schemas.SuccessResponse(
-                        message=f"Withdrawal approved and blockchain transaction initiated: {tx_hash}",
-                        data={"tx_hash": tx_hash, "request_id": approval_data.request_id}
-                    )
-                else:
-                    return schemas.SuccessResponse(
-                        message="Withdrawal approved but blockchain transaction failed. Manual intervention required.",
-                        data={"request_id": approval_data.request_id}
-                    )
-                    
-            except Exception as blockchain_error:
-                # Log the error but don't fail the approval
-                return schemas.SuccessResponse(
-                    message=f"Withdrawal approved but blockchain error occurred: {str(blockchain_error)}",
-                    data={"request_id": approval_data.request_id}
-                )
+            notify_withdrawal_worker()
+            return schemas.SuccessResponse(
+                message="Withdrawal approved and queued for broadcast",
+                data={
+                    "request_id": approval_data.request_id,
+                    "status": updated_request.status.value,  # type: ignore
+                    "transaction_id": updated_request.transaction_id
+                }
+            )
         else:
             return schemas.SuccessResponse(
                 message="Withdrawal request rejected and funds unfrozen",
@@ -267,6 +357,11 @@ def approve_withdrawal_request(
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -274,6 +369,125 @@ def approve_withdrawal_request(
         )
 
 
+@router.post("/withdrawals/bulk", response_model=schemas.SuccessResponse)
+def bulk_process_withdrawal_requests(
+    *,
+    db: Session = Depends(get_db),
+    current_admin: models.User = Depends(get_current_admin_user),
+    bulk_data: schemas.WithdrawalBulkApproval
+) -> Any:
+    """
+    Approve or reject many withdrawal requests in one transaction.
+    
+    - **request_ids**: Withdrawal request IDs (up to 1000)
+    - **approved**: True to approve, False to reject
+    - **admin_memo**: Optional admin memo/reason
+    
+    Requests that are missing, no longer pending or claimed by another
+    admin are skipped. Approved requests are queued together and broadcast
+    as one batch.
+    """
+    try:
+        processed, skipped = crud_withdrawal_request.bulk_process(
+            db=db,
+            request_ids=bulk_data.request_ids,
+            admin_user_id=int(current_admin.id),  # type: ignore
+            approved=bulk_data.approved,
+            admin_memo=bulk_data.admin_memo
+        )
+        
+        if bulk_data.approved and processed:
+            notify_withdrawal_worker()
+        
+        action = "approved and queued for broadcast" if bulk_data.approved else "rejected and funds unfrozen"
+        return schemas.SuccessResponse(
+            message=f"{len(processed)} withdrawal requests {action}, {len(skipped)} skipped",
+            data={"processed": processed, "skipped": skipped}
+        )
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process withdrawal requests: {str(e)}"
+        )
+
+
+@router.get("/withdrawals/fee-estimate")
+def get_withdrawal_fee_estimate(
+    *,
+    db: Session = Depends(get_db),
+    current_admin: models.User = Depends(get_current_admin_user),
+    limit: int = Query(100, ge=1, le=500, description="Maximum withdrawals to include")
+) -> Any:
+    """
+    Estimate the TRX cost of the withdrawals waiting to be broadcast.
+    
+    Covers pending and queued withdrawal requests. Returns the chain energy
+    and bandwidth prices, per-recipient-type estimates learned from past
+    receipts, the expected TRX burn of the backlog and the maximum burn
+    (sum of fee limits) to keep available.
+    """
+    try:
+        tron_service = get_tron_service()
+        fee_estimator = tron_service.fee_estimator
+        fee_estimator.ensure_loaded(db)
+        
+        rows = db.query(
+            models.WithdrawalRequest.destination_address, models.WithdrawalJob.recipient_type
+        ).outerjoin(
+            models.WithdrawalJob, models.WithdrawalJob.withdrawal_request_id == models.WithdrawalRequest.id
+        ).filter(
+            models.WithdrawalRequest.status.in_([
+                models.TransactionStatus.PENDING,
+                models.TransactionStatus.PROCESSING
+            ])
+        ).order_by(models.WithdrawalRequest.id).limit(limit).all()
+        # Jobs that already went out carry their recipient type; only the
+        # rest are classified (cached per address)
+        unknown = [address for address, recipient_type in rows if not recipient_type]
+        classified = iter(fee_estimator.classify(unknown, concurrency=settings.withdrawal_worker_concurrency))
+        recipient_types = [recipient_type or next(classified) for _, recipient_type in rows]
+        
+        return {
+            "backlog": fee_estimator.estimate_batch(recipient_types),
+            "fees": fee_estimator.metrics(),
+            "batch_size": settings.withdrawal_batch_size,
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to estimate withdrawal fees: {str(e)}"
+        )
+
+
+@router.get("/withdrawals/{request_id}/status", response_model=schemas.WithdrawalStatus)
+def get_withdrawal_status(
+    *,
+    db: Session = Depends(get_db),
+    current_admin: models.User = Depends(get_current_admin_user),
+    request_id: int
+) -> Any:
+    """
+    Get the execution status of a withdrawal request.
+    
+    Returns the request status together with its broadcast job state and
+    the blockchain transaction hash once broadcast.
+    """
+    withdrawal_status = crud_withdrawal_request.get_status(db, request_id)
+    if not withdrawal_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Withdrawal request not found"
+        )
+    return withdrawal_status
+
+
 @router.post("/send", response_model=schemas.SuccessResponse)
 def admin_send_transaction(
     *,
@@ -293,46 +507,69 @@ def admin_send_transaction(
     """
     try:
         # Validate address
-        if not get_tron_service().is_valid_address(send_data.to_address):
+        if not is_valid_address(send_data.to_address):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid Tron address format"
             )
         
-        # Check company wallet balance
-        company_balance = get_tron_service().get_account_balance(get_tron_service().company_address)
-        
-        if send_data.asset == "USDT":
-            available_balance = company_balance.get("USDT", Decimal('0'))
-        else:
-            available_balance = company_balance.get("TRX", Decimal('0'))
+        if send_data.asset != "USDT":
+            # For TRX or other assets, implement separate sending logic
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Sending {send_data.asset} not implemented yet"
+            )
         
-        if available_balance < send_data.amount:
+        # Reserve against the company wallet snapshot (no fresh chain read)
+        reservation_id = company_balance.reserve(send_data.asset, send_data.amount)
+        if reservation_id is None:
+            available_balance = company_balance.available(send_data.asset)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Insufficient company wallet balance. Available: {available_balance} {send_data.asset}"
             )
         
         # Send transaction
-        if send_data.asset == "USDT":
+        try:
             tx_hash = get_tron_service().send_usdt(
                 to_address=send_data.to_address,
                 amount=send_data.amount,
                 memo=send_data.memo
             )
-        else:
-            # For TRX or other assets, implement separate sending logic
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Sending {send_data.asset} not implemented yet"
+        except BroadcastUnknownError as e:
+            # The transfer may still land: keep the reservation and record it
+            # as in flight so it is reconciled by txid, never re-sent
+            company_balance.commit(reservation_id)
+            transaction = crud_transaction.create(db, {
+                "user_id": int(current_admin.id),  # type: ignore
+                "type": models.TransactionType.WITHDRAWAL,
+                "amount": send_data.amount,
+                "asset": send_data.asset,
+                "status": models.TransactionStatus.PROCESSING,
+                "ref_tx_id": e.txid,
+                "memo": f"Admin send: {send_data.memo}" if send_data.memo else "Admin send",
+                "fee_amount": Decimal('0.00000000')
+            })
+            return schemas.SuccessResponse(
+                message="Admin transaction broadcast outcome unknown; check its status by tx_hash before retrying",
+                data={
+                    "tx_hash": e.txid,
+                    "status": "in_flight",
+                    "transaction_id": int(transaction.id),  # type: ignore
+                    "amount": float(send_data.amount),
+                    "to_address": send_data.to_address
+                }
             )
         
         if not tx_hash:
+            company_balance.release(reservation_id)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Blockchain transaction failed"
             )
         
+        company_balance.commit(reservation_id)
+        
         # Create transaction record (system transaction)
         transaction_data = {
             "user_id": int(current_admin.id),  # type: ignore
@@ -368,6 +605,7 @@ def admin_send_transaction(
 
 @router.get("/system/status")
 def get_system_status(
+    db: Session = Depends(get_db),
     current_admin: models.User = Depends(get_current_admin_user)
 ) -> Any:
     """
@@ -376,21 +614,29 @@ def get_system_status(
     Returns various system metrics and status information.
     """
     try:
-        # Get company wallet balance
-        company_balance = get_tron_service().get_account_balance(get_tron_service().company_address)
+        tron_service = get_tron_service()
+        
+        # Company wallet balance from the background-refreshed snapshot
+        try:
+            wallet_status = company_balance.status()
+        except Exception as e:
+            wallet_status = {"balances": {"TRX": 0.0, "USDT": 0.0}, "error": str(e)}
         
         return {
             "system_status": "operational",
-            "company_wallet": {
-                "address": get_tron_service().company_address,
-                "balances": {
-                    "TRX": float(company_balance.get("TRX", Decimal('0'))),
-                    "USDT": float(company_balance.get("USDT", Decimal('0')))
-                }
-            },
+            "company_wallet": dict(wallet_status, address=tron_service.company_address),
             "tron_network": settings.tron_network,
+            "tron_nodes": tron_service.node_pool.metrics(),
+            "tron_circuit_breaker": tron_service.circuit_breaker.metrics(),
+            "tron_bulkhead": tron_service.bulkhead.metrics(),
+            "tron_single_flight": tron_service.single_flight.metrics(),
+            "latest_block": {
+                "height": tron_service.block_height.height,
+                "age_seconds": tron_service.block_height.age
+            },
             "deposit_monitoring": "active",
             "withdrawal_processing": "manual_approval",
+            "withdrawal_queue": crud_withdrawal_job.count_by_status(db),
             "timestamp": int(time.time())
         }
         
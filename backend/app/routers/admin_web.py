@@ -8,12 +8,13 @@ from fastapi import APIRouter, Depends, Request, Form, HTTPException, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 
 from ..core.db import get_db
 from ..crud import crud_user, crud_balance, crud_withdrawal_request, crud_transaction
 from ..deps import get_current_admin_user_from_cookie, get_current_user_optional
 from ..utils.security import create_access_token, verify_password
+from ..utils.withdrawal_worker import notify_withdrawal_worker
 from .. import models, schemas
 
 router = APIRouter()
@@ -137,17 +138,47 @@ async def approve_withdrawal(
     current_admin: models.User = Depends(get_current_admin_user_from_cookie),
     db: Session = Depends(get_db)
 ):
-    """출금 요청을 승인합니다."""
-    withdrawal = crud_withdrawal_request.approve_request(
-        db=db, 
-        request_id=withdrawal_id, 
-        admin_user_id=current_admin.id,  # type: ignore
-        approved=True
-    )
+    """출금 요청을 승인하고 브로드캐스트 대기열에 등록합니다."""
+    try:
+        withdrawal = crud_withdrawal_request.approve_request(
+            db=db, 
+            request_id=withdrawal_id, 
+            admin_user_id=current_admin.id,  # type: ignore
+            approved=True
+        )
+    except ValueError:
+        raise HTTPException(status_code=409, detail="이미 처리된 출금 요청입니다.")
     
     if not withdrawal:
         raise HTTPException(status_code=404, detail="출금 요청을 찾을 수 없습니다.")
     
+    notify_withdrawal_worker()
+    return RedirectResponse(url="/admin/withdrawals", status_code=302)
+
+
+@router.post("/withdrawals/bulk")
+async def bulk_process_withdrawals(
+    request_ids: List[int] = Form(...),
+    action: str = Form(...),
+    current_admin: models.User = Depends(get_current_admin_user_from_cookie),
+    db: Session = Depends(get_db)
+):
+    """선택한 출금 요청을 한 번에 승인하거나 거부합니다."""
+    if action not in ("approve", "reject"):
+        raise HTTPException(status_code=400, detail="알 수 없는 작업입니다.")
+    
+    try:
+        processed, _ = crud_withdrawal_request.bulk_process(
+            db=db,
+            request_ids=request_ids,
+            admin_user_id=current_admin.id,  # type: ignore
+            approved=action == "approve"
+        )
+    except ValueError:
+        raise HTTPException(status_code=409, detail="다른 관리자가 처리 중인 출금 요청입니다.")
+    
+    if action == "approve" and processed:
+        notify_withdrawal_worker()
     return RedirectResponse(url="/admin/withdrawals", status_code=302)
 
 
@@ -158,12 +189,15 @@ async def reject_withdrawal(
     db: Session = Depends(get_db)
 ):
     """출금 요청을 거부합니다."""
-    withdrawal = crud_withdrawal_request.approve_request(
-        db=db, 
-        request_id=withdrawal_id, 
-        admin_user_id=current_admin.id,  # type: ignore
-        approved=False
-    )
+    try:
+        withdrawal = crud_withdrawal_request.approve_request(
+            db=db, 
+            request_id=withdrawal_id, 
+            admin_user_id=current_admin.id,  # type: ignore
+            approved=False
+        )
+    except ValueError:
+        raise HTTPException(status_code=409, detail="이미 처리된 출금 요청입니다.")
     
     if not withdrawal:
         raise HTTPException(status_code=404, detail="출금 요청을 찾을 수 없습니다.")
@@ -171,6 +205,19 @@ async def reject_withdrawal(
     return RedirectResponse(url="/admin/withdrawals", status_code=302)
 
 
+@router.get("/withdrawals/{withdrawal_id}/status", response_model=schemas.WithdrawalStatus)
+async def withdrawal_status(
+    withdrawal_id: int,
+    current_admin: models.User = Depends(get_current_admin_user_from_cookie),
+    db: Session = Depends(get_db)
+):
+    """출금 처리 상태를 반환합니다 (페이지에서 주기적으로 조회)."""
+    withdrawal_status = crud_withdrawal_request.get_status(db, withdrawal_id)
+    if not withdrawal_status:
+        raise HTTPException(status_code=404, detail="출금 요청을 찾을 수 없습니다.")
+    return withdrawal_status
+
+
 @router.get("/logout")
 async def admin_logout():
     """관리자 로그아웃을 처리합니다."""
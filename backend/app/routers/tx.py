@@ -7,12 +7,15 @@ from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from decimal import Decimal
+from datetime import datetime, timezone
 
 from ..core.db import get_db
 from ..core.config import settings
 from ..crud import crud_transaction, crud_withdrawal_request, crud_balance
 from ..deps import get_current_active_user, common_pagination_params
-from ..utils.tron import get_tron_service
+from ..utils.address import is_valid_address
+from ..utils.tx_status import get_transaction_status
+from ..utils.velocity import OP_WITHDRAWAL, velocity_limiter
 from .. import schemas, models
 
 router = APIRouter()
@@ -182,12 +185,22 @@ def create_withdrawal_request(
             )
         
         # Validate Tron address
-        if not get_tron_service().is_valid_address(withdrawal_data.destination_address):
+        if not is_valid_address(withdrawal_data.destination_address):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid Tron address format"
             )
         
+        # Check hourly/daily withdrawal limits
+        limit_error = velocity_limiter.check(
+            db, int(current_user.id), withdrawal_data.asset, OP_WITHDRAWAL, withdrawal_data.amount  # type: ignore
+        )
+        if limit_error:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=limit_error
+            )
+        
         # Check user balance
         user_balance = crud_balance.get_user_balance(
             db, int(current_user.id), withdrawal_data.asset  # type: ignore
@@ -244,26 +257,53 @@ def create_withdrawal_request(
         )
 
 
-@router.get("/withdraw/requests", response_model=List[dict])
+@router.get("/withdraw/requests", response_model=schemas.WithdrawalRequestPage)
 def get_user_withdrawal_requests(
     *,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
-    pagination: dict = Depends(common_pagination_params)
+    limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[int] = Query(None, description="next_cursor of the previous page"),
+    request_status: Optional[str] = Query(None, alias="status", description="Filter by status"),
+    changed_since: Optional[datetime] = Query(None, description="Only requests created or updated since")
 ) -> Any:
     """
-    Get user's withdrawal requests.
+    Get user's withdrawal requests, newest first.
     
-    - **page**: Page number (default: 1)
-    - **page_size**: Items per page (default: 20)
+    - **limit**: Items per page (default: 20, max: 100)
+    - **cursor**: Pass `next_cursor` from the previous page to get the next one
+    - **status**: Filter by status (pending, processing, completed, failed, cancelled)
+    - **changed_since**: Only requests created or updated at or after this time;
+      poll with the latest `updated_at`/`created_at` seen to fetch status changes only
     
-    Returns list of user's withdrawal requests.
+    Returns a page of withdrawal requests and the cursor of the next page.
     """
     try:
-        # Note: This would require adding a method to crud_withdrawal_request
-        # to get user-specific requests. For now, return empty list.
-        return []
+        status_filter = None
+        if request_status:
+            try:
+                status_filter = models.TransactionStatus(request_status.lower())
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid status: {request_status}"
+                )
+        
+        # 시간대가 있으면 DB에 저장된 UTC 기준으로 변환
+        if changed_since and changed_since.tzinfo:
+            changed_since = changed_since.astimezone(timezone.utc).replace(tzinfo=None)
         
+        return crud_withdrawal_request.get_user_requests(
+            db=db,
+            user_id=int(current_user.id),  # type: ignore
+            limit=limit,
+            cursor=cursor,
+            status=status_filter,
+            changed_since=changed_since
+        )
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -274,6 +314,7 @@ def get_user_withdrawal_requests(
 @router.get("/status/{tx_hash}")
 def check_transaction_status(
     tx_hash: str,
+    db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -282,6 +323,7 @@ def check_transaction_status(
     - **tx_hash**: Transaction hash to check
     
     Returns transaction status and confirmation information.
+    Finalized transactions are answered from the local cache.
     """
     try:
         if not tx_hash or len(tx_hash) != 64:
@@ -291,7 +333,7 @@ def check_transaction_status(
             )
         
         # Check transaction status on blockchain
-        status_info = get_tron_service().check_transaction_status(tx_hash)
+        status_info = get_transaction_status(db, tx_hash)
         
         return {
             "tx_hash": tx_hash,
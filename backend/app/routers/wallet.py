@@ -8,10 +8,14 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from decimal import Decimal
 
+from ..core.config import settings
 from ..core.db import get_db
-from ..crud import crud_balance, crud_user, crud_transaction
+from ..crud import crud_balance, crud_user, crud_transaction, crud_deposit_address
 from ..deps import get_current_active_user, common_pagination_params
+from ..utils.address import is_valid_address, validate_addresses
+from ..utils.hd_wallet import derive_address
 from ..utils.tron import get_tron_service
+from ..utils.velocity import OP_TRANSFER, velocity_limiter
 from .. import schemas, models
 
 router = APIRouter()
@@ -131,6 +135,16 @@ def create_internal_transfer(
             detail="Insufficient balance"
         )
     
+    # Check hourly/daily transfer limits
+    limit_error = velocity_limiter.check(
+        db, int(current_user.id), transfer_data.asset, OP_TRANSFER, transfer_data.amount  # type: ignore
+    )
+    if limit_error:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=limit_error
+        )
+    
     try:
         # Create transfer transaction
         transaction = crud_transaction.create_internal_transfer(
@@ -164,16 +178,32 @@ def create_internal_transfer(
 @router.get("/deposit/address", response_model=schemas.DepositAddress)
 def get_deposit_address(
     *,
+    db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
 ) -> Any:
     """
     Get deposit address for receiving USDT.
     
-    Returns the company wallet address where users can send USDT.
-    For deposit identification, users should include their user ID as memo.
+    With HD deposit addresses configured, returns the user's own address
+    derived from the deposit xpub (index = user ID), creating it on first
+    use. Otherwise returns the company wallet address with the user ID as memo.
     """
     try:
         user_id = int(current_user.id)  # type: ignore
+        
+        if settings.deposit_xpub:
+            deposit_address = crud_deposit_address.get_user_address(db, user_id)
+            if not deposit_address:
+                address = derive_address(settings.deposit_xpub, user_id)
+                crud_deposit_address.create_hd_addresses(db, [(user_id, user_id, address)])
+                deposit_address = crud_deposit_address.get_user_address(db, user_id)
+            
+            return schemas.DepositAddress(
+                address=str(deposit_address.address),  # type: ignore
+                memo=None,
+                qr_code=None
+            )
+        
         company_address = get_tron_service().company_address
         
         if not company_address:
@@ -188,6 +218,8 @@ def get_deposit_address(
             qr_code=None  # Could generate QR code here
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -258,18 +290,36 @@ def validate_tron_address(
     
     Returns validation result.
     """
-    try:
-        is_valid = get_tron_service().is_valid_address(address)
-        
-        return {
-            "address": address,
-            "is_valid": is_valid,
-            "message": "Valid Tron address" if is_valid else "Invalid Tron address format"
-        }
-        
-    except Exception as e:
-        return {
-            "address": address,
-            "is_valid": False,
-            "message": f"Validation error: {str(e)}"
-        }
+    is_valid = is_valid_address(address)
+    
+    return {
+        "address": address,
+        "is_valid": is_valid,
+        "message": "Valid Tron address" if is_valid else "Invalid Tron address format"
+    }
+
+
+@router.post("/address/validate/batch", response_model=schemas.AddressValidationBatchResponse)
+def validate_tron_addresses(
+    *,
+    current_user: models.User = Depends(get_current_active_user),
+    batch: schemas.AddressValidationBatch
+) -> Any:
+    """
+    Validate many Tron addresses at once (e.g. an uploaded payout list).
+    
+    - **addresses**: Up to 10,000 address strings
+    
+    Returns per-address results in input order plus valid/invalid counts.
+    """
+    results = validate_addresses(batch.addresses)
+    valid_count = sum(results)
+    
+    return schemas.AddressValidationBatchResponse(
+        results=[
+            schemas.AddressValidationResult(address=address, is_valid=is_valid)
+            for address, is_valid in zip(batch.addresses, results)
+        ],
+        valid_count=valid_count,
+        invalid_count=len(results) - valid_count
+    )
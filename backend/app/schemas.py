@@ -182,6 +182,18 @@ class WithdrawalApproval(BaseSchema):
     admin_memo: Optional[str] = None
 
 
+class WithdrawalBulkApproval(BaseSchema):
+    """Schema for approving or rejecting many withdrawal requests at once."""
+    request_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    approved: bool
+    admin_memo: Optional[str] = None
+
+
+class WithdrawalRelease(BaseSchema):
+    """Schema for returning claimed withdrawal requests to the queue."""
+    request_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
 # 입금 스키마
 class DepositAddress(BaseSchema):
     """Schema for deposit address."""
@@ -196,6 +208,25 @@ class DepositCheck(BaseSchema):
     message: str
 
 
+# 주소 검증 스키마
+class AddressValidationBatch(BaseSchema):
+    """Schema for batch address validation requests."""
+    addresses: List[str] = Field(..., min_length=1, max_length=10000)
+
+
+class AddressValidationResult(BaseSchema):
+    """Schema for a single address validation result."""
+    address: str
+    is_valid: bool
+
+
+class AddressValidationBatchResponse(BaseSchema):
+    """Schema for batch address validation response."""
+    results: List[AddressValidationResult]
+    valid_count: int
+    invalid_count: int
+
+
 # 관리자 스키마
 class AdminBalanceView(BaseSchema):
     """Schema for admin balance overview."""
@@ -217,6 +248,36 @@ class AdminWithdrawalList(BaseSchema):
     total_count: int
 
 
+class WithdrawalStatus(BaseSchema):
+    """Schema for the execution status of a withdrawal request."""
+    request_id: int
+    status: str
+    job_status: Optional[str] = None
+    attempts: int = 0
+    ref_tx_id: Optional[str] = None
+    last_error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+
+class WithdrawalRequestItem(BaseSchema):
+    """Schema for a withdrawal request in the user's request list."""
+    id: int
+    amount: Decimal
+    asset: str
+    destination_address: str
+    status: TransactionStatus
+    ref_tx_id: Optional[str] = None
+    memo: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class WithdrawalRequestPage(BaseSchema):
+    """Schema for a page of withdrawal requests, newest first."""
+    items: List[WithdrawalRequestItem]
+    next_cursor: Optional[int] = None
+
+
 class AdminSendTransaction(BaseSchema):
     """Schema for admin-initiated blockchain transactions."""
     to_address: str = Field(..., min_length=34, max_length=34)
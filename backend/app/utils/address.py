@@ -0,0 +1,100 @@
+"""
+Tron address validation and encoding.
+A standalone base58check implementation so validating an address never
+needs the Tron service or a network connection.
+"""
+
+import hashlib
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+BASE58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Byte value -> base58 digit, 255 for characters outside the alphabet
+_DECODE_TABLE = bytearray([255] * 256)
+for _digit, _char in enumerate(BASE58_ALPHABET):
+    _DECODE_TABLE[_char] = _digit
+
+# Mainnet address version byte
+ADDRESS_PREFIX = 0x41
+ADDRESS_LENGTH = 34
+
+
+def _double_sha256(data: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def b58decode(value: str) -> Optional[bytes]:
+    """Decode a base58 string, or return None if it has invalid characters."""
+    try:
+        encoded = value.encode("ascii")
+    except UnicodeEncodeError:
+        return None
+    number = 0
+    for char in encoded:
+        digit = _DECODE_TABLE[char]
+        if digit == 255:
+            return None
+        number = number * 58 + digit
+    leading_zeros = len(encoded) - len(encoded.lstrip(b"1"))
+    body = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    return b"\0" * leading_zeros + body
+
+
+def b58encode(data: bytes) -> str:
+    """Encode bytes as base58."""
+    number = int.from_bytes(data, "big")
+    encoded = bytearray()
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded.append(BASE58_ALPHABET[remainder])
+    leading_zeros = len(data) - len(data.lstrip(b"\0"))
+    return (BASE58_ALPHABET[:1] * leading_zeros + bytes(reversed(encoded))).decode("ascii")
+
+
+@lru_cache(maxsize=65536)
+def is_valid_address(address: str) -> bool:
+    """
+    Check that a string is a well-formed Tron base58check address.
+
+    Validates length, alphabet, the 0x41 version byte and the
+    double-SHA256 checksum.
+
+    Args:
+        address: Address string to validate
+
+    Returns:
+        True if the address is valid, False otherwise
+    """
+    if not isinstance(address, str) or len(address) != ADDRESS_LENGTH or address[0] != "T":
+        return False
+    raw = b58decode(address)
+    if raw is None or len(raw) != 25 or raw[0] != ADDRESS_PREFIX:
+        return False
+    return _double_sha256(raw[:21])[:4] == raw[21:]
+
+
+def validate_addresses(addresses: Iterable[str]) -> List[bool]:
+    """Validate many addresses; results are in input order."""
+    return [is_valid_address(address) for address in addresses]
+
+
+@lru_cache(maxsize=65536)
+def to_base58_address(raw: bytes) -> str:
+    """
+    Encode a 21-byte (0x41-prefixed) or 20-byte account id as a Tron address.
+
+    Results are cached: the same exchange and hot wallets appear in most
+    blocks, and base58 encoding is a big-integer division loop.
+
+    Args:
+        raw: Raw address bytes
+
+    Returns:
+        Base58check Tron address
+    """
+    if len(raw) == 20:
+        raw = bytes([ADDRESS_PREFIX]) + raw
+    if len(raw) != 21:
+        raise ValueError("Raw Tron address must be 20 or 21 bytes")
+    return b58encode(raw + _double_sha256(raw)[:4])
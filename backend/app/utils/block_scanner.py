@@ -0,0 +1,398 @@
+"""
+Block-scanning deposit detector.
+Streams each new block's TRC20 Transfer logs for the USDT contract and
+matches recipients against an in-memory set of active deposit addresses,
+so the work per block depends on the logs in the block and not on the
+number of users. Deposits stay PENDING until they are MIN_CONFIRMATIONS
+deep and are rolled back if their block is orphaned.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+from tronpy.keys import to_raw_address
+
+from ..core.config import settings
+from ..core.db import SessionLocal
+from ..crud import crud_chain_block, crud_chain_cursor, crud_transaction
+from .. import models
+from .address import to_base58_address
+from .block_store import BlockStore, TransferEvent, iter_events
+from .log_decoder import TRANSFER_TOPIC, TransferLogDecoder
+from .tron import MIN_CONFIRMATIONS, USDT_CONTRACT_ADDRESS, get_tron_service
+
+logger = logging.getLogger(__name__)
+
+
+def raw_address(address: str) -> bytes:
+    """Convert a base58 Tron address to its 20-byte account id (no 0x41 prefix)."""
+    return to_raw_address(address)[1:]
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte strings (double hashing on BLAKE2b)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: bytes) -> Iterable[int]:
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: bytes) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: bytes) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class DepositAddressSet:
+    """
+    In-memory index of active deposit addresses to their owners.
+
+    New addresses are picked up incrementally by primary key; a periodic
+    full reload also drops deactivated ones. The optional Bloom filter
+    rejects most non-matching recipients before the dictionary lookup.
+    """
+
+    def __init__(self, use_bloom: bool = False, bloom_error_rate: float = 0.001):
+        self.use_bloom = use_bloom
+        self.bloom_error_rate = bloom_error_rate
+        self.loaded_at: Optional[float] = None
+
+        self._owners: Dict[bytes, Optional[int]] = {}
+        self._bloom: Optional[BloomFilter] = None
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    def _add(self, owners: Dict[bytes, Optional[int]], address: str, user_id: int) -> Optional[bytes]:
+        try:
+            key = raw_address(address)
+        except Exception:
+            logger.warning(f"Ignoring invalid deposit address {address}")
+            return None
+        if key in owners and owners[key] != user_id:
+            # Shared (memo-based) addresses cannot be attributed by recipient
+            owners[key] = None
+        else:
+            owners[key] = user_id
+        return key
+
+    def refresh(self, db: Session, full: bool = False) -> int:
+        """
+        Load deposit addresses created since the last refresh.
+
+        Args:
+            db: Database session
+            full: Rebuild from scratch, dropping deactivated addresses
+
+        Returns:
+            Number of address rows loaded
+        """
+        query = db.query(
+            models.DepositAddress.id,
+            models.DepositAddress.address,
+            models.DepositAddress.user_id
+        ).filter(models.DepositAddress.is_active == True)
+        if not full:
+            query = query.filter(models.DepositAddress.id > self._last_id)
+        rows = query.order_by(models.DepositAddress.id).all()
+
+        with self._lock:
+            if full:
+                owners: Dict[bytes, Optional[int]] = {}
+                for _, address, user_id in rows:
+                    self._add(owners, address, user_id)
+                bloom = None
+                if self.use_bloom:
+                    # Leave headroom for incremental additions until the next full reload
+                    bloom = BloomFilter(max(2 * len(owners), 1024), self.bloom_error_rate)
+                    for key in owners:
+                        bloom.add(key)
+                self._owners, self._bloom = owners, bloom
+                self.loaded_at = time.monotonic()
+            else:
+                for _, address, user_id in rows:
+                    key = self._add(self._owners, address, user_id)
+                    if key is not None and self._bloom is not None:
+                        self._bloom.add(key)
+            if rows:
+                self._last_id = max(self._last_id, rows[-1][0])
+        return len(rows)
+
+    def owner(self, account: bytes) -> Optional[int]:
+        """Return the user owning the 20-byte account id, if it is a deposit address."""
+        bloom = self._bloom
+        if bloom is not None and account not in bloom:
+            return None
+        return self._owners.get(account)
+
+
+class BlockScanner:
+    """
+    Scan blocks for USDT transfers to deposit addresses.
+
+    Blocks are scanned up to the chain head and their deposits recorded as
+    PENDING together with the checkpoint and block hash. A confirmation
+    watermark (head - ``confirmations``) then promotes every pending deposit
+    below it in bulk. When a block's parent hash no longer matches the
+    recorded hash, pending deposits from the orphaned blocks are cancelled
+    and scanning resumes at the fork point.
+    """
+
+    def __init__(
+        self,
+        address_set: DepositAddressSet,
+        session_factory: Callable[[], Session] = SessionLocal,
+        tron_service: Any = None,
+        contract_address: str = USDT_CONTRACT_ADDRESS,
+        asset: str = "USDT",
+        decimals: int = 6,
+        confirmations: int = MIN_CONFIRMATIONS,
+        max_blocks: int = 100,
+        full_reload_interval: float = 60.0,
+        block_store: Optional[BlockStore] = None
+    ):
+        self.address_set = address_set
+        self.block_store = block_store
+        self.session_factory = session_factory
+        self._tron_service = tron_service
+        self.contract_address = contract_address
+        self.contract_hex = raw_address(contract_address).hex()
+        self.log_decoder = TransferLogDecoder(self.contract_hex)
+        self.asset = asset
+        self.decimals = decimals
+        self.confirmations = confirmations
+        self.max_blocks = max_blocks
+        self.full_reload_interval = full_reload_interval
+
+    @property
+    def tron_service(self) -> Any:
+        if self._tron_service is None:
+            self._tron_service = get_tron_service()
+        return self._tron_service
+
+    @property
+    def cursor_name(self) -> str:
+        return f"blocks:{self.contract_address}"
+
+    @property
+    def watermark_name(self) -> str:
+        return f"confirmations:{self.contract_address}"
+
+    def decode_transfers(self, tx_infos: List[Dict[str, Any]]) -> List[TransferEvent]:
+        """
+        Decode every successful USDT Transfer event in a block's receipts.
+
+        Args:
+            tx_infos: Output of ``get_block_transaction_info``
+
+        Returns:
+            (tx_id, sender, recipient, raw amount) tuples
+        """
+        return self.log_decoder.decode(tx_infos)
+
+    def match_transfers(self, block_number: int, record: memoryview) -> List[Dict[str, Any]]:
+        """
+        Match a block record's transfer recipients against the deposit addresses.
+
+        Args:
+            block_number: Block the record belongs to
+            record: Block record (see ``block_store.encode_events``)
+
+        Returns:
+            Deposit dictionaries ready for ``crud_transaction.credit_deposits``
+        """
+        deposits = []
+        for tx_id, sender, recipient, amount in iter_events(record):
+            # Read-only memoryviews hash like bytes, so no copy is needed to look up
+            user_id = self.address_set.owner(recipient)
+            if user_id is None:
+                continue
+
+            value = int.from_bytes(amount, "big")
+            if value <= 0:
+                continue
+            sender_address = to_base58_address(bytes(sender))
+            deposits.append({
+                "user_id": user_id,
+                "amount": Decimal(value).scaleb(-self.decimals),
+                "asset": self.asset,
+                "ref_tx_id": tx_id.hex(),
+                "block_number": block_number,
+                "to_address": to_base58_address(bytes(recipient)),
+                "memo": f"On-chain deposit from {sender_address}",
+            })
+        return deposits
+
+    def extract_deposits(self, block_number: int, tx_infos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Find transfers to deposit addresses in a block's transaction receipts."""
+        return self.match_transfers(block_number, memoryview(self.log_decoder.decode_record(tx_infos)))
+
+    def scan_block(self, block_number: int) -> List[Dict[str, Any]]:
+        """
+        Extract deposits from one block, replaying it from the block store
+        when cached and fetching (and caching) its receipts otherwise.
+        """
+        record = self.block_store.get(block_number) if self.block_store else None
+        if record is None:
+            tx_infos = self.tron_service.get_block_transaction_info(block_number)
+            data = self.log_decoder.decode_record(tx_infos)
+            if self.block_store:
+                self.block_store.put(block_number, data)
+            record = memoryview(data)
+        return self.match_transfers(block_number, record)
+
+    def refresh_addresses(self, db: Session) -> None:
+        """Pick up new deposit addresses, fully reloading when due."""
+        loaded_at = self.address_set.loaded_at
+        full = loaded_at is None or time.monotonic() - loaded_at > self.full_reload_interval
+        self.address_set.refresh(db, full=full)
+
+    def _find_fork(self, db: Session, block_number: int, watermark: int) -> int:
+        """
+        Walk back from ``block_number`` to the first block that changed.
+
+        Returns:
+            Lowest block number whose recorded hash is no longer canonical
+        """
+        while block_number > watermark:
+            recorded = crud_chain_block.get(db, block_number)
+            if recorded is None:
+                break
+            if self.tron_service.get_block_header(block_number)["hash"] == recorded.block_hash:
+                return block_number + 1
+            block_number -= 1
+        if block_number <= watermark:
+            logger.critical(
+                f"Chain reorganization reaches below the confirmation watermark ({watermark}); "
+                "confirmed deposits were not rolled back"
+            )
+        return block_number + 1
+
+    def rollback_from(self, db: Session, fork_block: int) -> int:
+        """
+        Cancel pending deposits and forget scanned blocks from ``fork_block`` on.
+
+        Returns:
+            Number of cancelled deposits
+        """
+        cancelled = crud_transaction.cancel_pending_deposits(db, fork_block)
+        crud_chain_block.delete_from(db, fork_block)
+        if self.block_store:
+            self.block_store.invalidate_from(fork_block)
+        return cancelled
+
+    def promote(self, db: Session, head: int) -> int:
+        """
+        Advance the confirmation watermark and complete deposits below it.
+
+        Returns:
+            Number of promoted deposits
+        """
+        watermark = head - self.confirmations
+        cursor = crud_chain_cursor.get_or_create(db, self.watermark_name)
+        if watermark <= cursor.block_number:  # type: ignore
+            return 0
+        promoted = crud_transaction.promote_pending_deposits(db, watermark)
+        cursor.block_number = watermark  # type: ignore
+        # Blocks below the watermark are final; their hashes are no longer needed
+        crud_chain_block.prune_below(db, watermark)
+        db.commit()
+        return promoted
+
+    def run_once(self) -> int:
+        """
+        Scan up to ``max_blocks`` blocks past the checkpoint and promote
+        deposits that reached the confirmation watermark.
+
+        Returns:
+            Number of deposits promoted to COMPLETED
+        """
+        head = self.tron_service.get_latest_block_number()
+
+        recorded = 0
+        db = self.session_factory()
+        try:
+            self.refresh_addresses(db)
+            cursor = crud_chain_cursor.get_or_create(db, self.cursor_name)
+            if not cursor.block_number:
+                # First run starts at the current head; use the backfill for
+                # older history
+                cursor.block_number = head - 1  # type: ignore
+            db.commit()
+
+            start = int(cursor.block_number) + 1  # type: ignore
+            if not len(self.address_set):
+                # Nothing can be credited: skip fetching and keep the
+                # checkpoint at the head so the first address starts there
+                cursor.block_number = head  # type: ignore
+                db.commit()
+                start = head + 1
+            for block_number in range(start, min(head, start + self.max_blocks - 1) + 1):
+                header = self.tron_service.get_block_header(block_number)
+                parent = crud_chain_block.get(db, block_number - 1)
+                if parent is not None and parent.block_hash != header["parent_hash"]:
+                    watermark = crud_chain_cursor.get_or_create(db, self.watermark_name).block_number
+                    fork_block = self._find_fork(db, block_number - 1, int(watermark))  # type: ignore
+                    cancelled = self.rollback_from(db, fork_block)
+                    cursor.block_number = fork_block - 1  # type: ignore
+                    db.commit()
+                    logger.warning(
+                        f"Chain reorganization at block {fork_block}: "
+                        f"cancelled {cancelled} pending deposits"
+                    )
+                    break
+
+                deposits = self.scan_block(block_number)
+                for deposit in deposits:
+                    deposit["status"] = models.TransactionStatus.PENDING
+                created = crud_transaction.credit_deposits(db, deposits, commit=False)
+                recorded += len(created)
+                crud_chain_block.add(db, block_number, header["hash"])
+                cursor.block_number = block_number  # type: ignore
+                db.commit()
+
+            promoted = self.promote(db, head)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if recorded or promoted:
+            logger.info(f"Recorded {recorded} pending deposits, promoted {promoted} (head {head})")
+        return promoted
+
+
+async def run_block_scanner(scan_interval: float) -> None:
+    """블록 스캐너를 백그라운드에서 주기적으로 실행합니다."""
+    scanner = BlockScanner(
+        DepositAddressSet(use_bloom=settings.deposit_scanner_use_bloom),
+        max_blocks=settings.deposit_scanner_max_blocks,
+        full_reload_interval=settings.deposit_address_reload_interval,
+        block_store=BlockStore.from_settings()
+    )
+    logger.info(f"Starting block scanner (every {scan_interval}s)")
+    while True:
+        try:
+            await asyncio.to_thread(scanner.run_once)
+        except Exception as e:
+            logger.error(f"Error in block scanner: {e}")
+        await asyncio.sleep(scan_interval)
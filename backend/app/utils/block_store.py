@@ -0,0 +1,304 @@
+"""
+Local on-disk cache of decoded TRC20 transfer events per block.
+Events are appended to size-bounded segment files and located through a
+memory-mapped fixed-size ring index keyed by block number, so re-scans,
+reorg handling and backfill retries replay from disk instead of the node.
+A store directory is owned by one process at a time.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# A decoded Transfer event: (tx_id, sender, recipient, raw amount)
+TransferEvent = Tuple[bytes, bytes, bytes, int]
+
+# Event record: 32-byte tx id, 20-byte sender, 20-byte recipient, uint256 amount
+EVENT_RECORD = struct.Struct(">32s20s20s32s")
+# Block record header: number of events
+BLOCK_HEADER = struct.Struct("<I")
+
+# Index file header: magic, highest indexed block number
+INDEX_MAGIC = b"DWBIDX02"
+INDEX_HEADER = struct.Struct("<8sQ")
+# Index slot per block (at block_number % slots): block number, segment
+# id + 1 (0 = empty), offset, length
+INDEX_SLOT = struct.Struct("<QIQI")
+# Default number of recent blocks the index can address (about 35 days)
+DEFAULT_INDEX_BLOCKS = 1_000_000
+
+
+class BlockStoreLockedError(Exception):
+    """Raised when another process already owns the store directory."""
+
+
+def encode_events(events: Iterable[TransferEvent]) -> bytes:
+    """Serialize a block's transfer events into one block record."""
+    records = [
+        EVENT_RECORD.pack(tx_id, sender, recipient, amount.to_bytes(32, "big"))
+        for tx_id, sender, recipient, amount in events
+    ]
+    return BLOCK_HEADER.pack(len(records)) + b"".join(records)
+
+
+def iter_events(record: memoryview) -> Iterator[Tuple[memoryview, memoryview, memoryview, memoryview]]:
+    """
+    Iterate over a block record without copying.
+
+    Yields:
+        (tx_id, sender, recipient, amount) memoryview slices; ``amount`` is a
+        32-byte big-endian integer
+    """
+    (count,) = BLOCK_HEADER.unpack_from(record)
+    offset = BLOCK_HEADER.size
+    for _ in range(count):
+        yield (
+            record[offset:offset + 32],
+            record[offset + 32:offset + 52],
+            record[offset + 52:offset + 72],
+            record[offset + 72:offset + 104],
+        )
+        offset += EVENT_RECORD.size
+
+
+class BlockStore:
+    """
+    Append-only segment store with a memory-mapped ring index of blocks.
+
+    Segments are written sequentially and evicted oldest first once their
+    total size exceeds ``max_bytes``; index slots pointing into an evicted
+    segment read as missing. The index holds ``index_blocks`` slots and a
+    block reuses the slot of the block ``index_blocks`` before it, so both
+    the index and the segments stay bounded. Reads return memoryview slices
+    of read-only segment mappings.
+
+    The directory is locked for the lifetime of the store; a second process
+    opening it gets ``BlockStoreLockedError``.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        segment_bytes: int = 64 * 1024 * 1024,
+        index_blocks: int = DEFAULT_INDEX_BLOCKS
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.index_blocks = index_blocks
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._lock_file = self._acquire_directory()
+
+        segment_ids = sorted(
+            int(name[:-4]) for name in os.listdir(directory)
+            if name.endswith(".seg") and name[:-4].isdigit()
+        )
+        self._first_segment = segment_ids[0] if segment_ids else 0
+        self._segment_id = segment_ids[-1] if segment_ids else 0
+        self._segment = open(self._segment_path(self._segment_id), "ab")
+
+        self._open_index()
+
+    @classmethod
+    def from_settings(cls) -> Optional["BlockStore"]:
+        """Open the configured store, or return None when caching is disabled or the store is in use."""
+        if not settings.block_store_dir:
+            return None
+        try:
+            return cls(
+                settings.block_store_dir,
+                max_bytes=settings.block_store_max_mb * 1024 * 1024,
+                segment_bytes=settings.block_store_segment_mb * 1024 * 1024,
+                index_blocks=settings.block_store_index_blocks
+            )
+        except BlockStoreLockedError as e:
+            logger.warning(f"Block store disabled in this process: {e}")
+            return None
+
+    def _acquire_directory(self):
+        """Take an exclusive, non-blocking lock on the directory for this process."""
+        lock_file = open(os.path.join(self.directory, "LOCK"), "a+b")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                raise BlockStoreLockedError(f"{self.directory} is in use by another process")
+        return lock_file
+
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"{segment_id:08d}.seg")
+
+    def _open_index(self) -> None:
+        path = os.path.join(self.directory, "index.bin")
+        size = INDEX_HEADER.size + self.index_blocks * INDEX_SLOT.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT)
+        self._index_file = os.fdopen(fd, "r+b")
+        if os.fstat(fd).st_size == size:
+            self._index = mmap.mmap(fd, 0)
+            magic, self._head_block = INDEX_HEADER.unpack_from(self._index)
+            if magic == INDEX_MAGIC:
+                return
+            self._index.close()
+        if os.fstat(fd).st_size >= INDEX_HEADER.size:
+            # Older format or different size: the index is only a cache
+            logger.warning(f"Rebuilding block store index {path}")
+        self._index_file.truncate(0)
+        self._index_file.truncate(size)
+        self._index = mmap.mmap(fd, 0)
+        INDEX_HEADER.pack_into(self._index, 0, INDEX_MAGIC, 0)
+        self._head_block = 0
+
+    def _slot_offset(self, block_number: int) -> int:
+        return INDEX_HEADER.size + (block_number % self.index_blocks) * INDEX_SLOT.size
+
+    def _segment_map(self, segment_id: int, end: int) -> Optional[mmap.mmap]:
+        """Return a read-only mapping of a segment covering at least ``end`` bytes."""
+        mapped = self._maps.get(segment_id)
+        if mapped is None or len(mapped) < end:
+            # The segment grew since it was mapped; the old mapping is released
+            # once no reader holds a view of it
+            try:
+                with open(self._segment_path(segment_id), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                self._maps.pop(segment_id, None)
+                return None
+            self._maps[segment_id] = mapped
+        return mapped
+
+    def get(self, block_number: int) -> Optional[memoryview]:
+        """
+        Return the cached block record, or None if the block is not cached.
+
+        The returned memoryview points into the segment mapping; use
+        ``iter_events`` to walk it.
+        """
+        with self._lock:
+            stored_block, segment, start, length = INDEX_SLOT.unpack_from(
+                self._index, self._slot_offset(block_number)
+            )
+            segment_id = segment - 1
+            if stored_block != block_number or segment == 0 or segment_id < self._first_segment:
+                self.misses += 1
+                return None
+            mapped = self._segment_map(segment_id, start + length)
+            if mapped is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return memoryview(mapped)[start:start + length]
+
+    def put(self, block_number: int, record: bytes) -> None:
+        """Append a block record (see ``encode_events``) and index it."""
+        with self._lock:
+            if block_number <= self._head_block - self.index_blocks:
+                # Older than the blocks the index can address - not cached
+                return
+            if self._segment.tell() + len(record) > self.segment_bytes and self._segment.tell() > 0:
+                self._roll_segment()
+            start = self._segment.tell()
+            self._segment.write(record)
+            # Data must be on disk before the index points at it
+            self._segment.flush()
+            INDEX_SLOT.pack_into(
+                self._index, self._slot_offset(block_number), block_number, self._segment_id + 1, start, len(record)
+            )
+            if block_number > self._head_block:
+                self._head_block = block_number
+                INDEX_HEADER.pack_into(self._index, 0, INDEX_MAGIC, block_number)
+
+    def invalidate_from(self, block_number: int) -> None:
+        """Forget every cached block at or above ``block_number`` (after a reorg)."""
+        with self._lock:
+            first = max(block_number, self._head_block - self.index_blocks + 1)
+            for number in range(first, self._head_block + 1):
+                offset = self._slot_offset(number)
+                if INDEX_SLOT.unpack_from(self._index, offset)[0] == number:
+                    INDEX_SLOT.pack_into(self._index, offset, 0, 0, 0, 0)
+            if block_number <= self._head_block:
+                self._head_block = max(0, block_number - 1)
+                INDEX_HEADER.pack_into(self._index, 0, INDEX_MAGIC, self._head_block)
+
+    def _roll_segment(self) -> None:
+        """Start a new segment and evict the oldest ones over the size limit."""
+        self._segment.close()
+        self._segment_id += 1
+        self._segment = open(self._segment_path(self._segment_id), "ab")
+
+        sizes = {
+            segment_id: os.path.getsize(self._segment_path(segment_id))
+            for segment_id in range(self._first_segment, self._segment_id + 1)
+            if os.path.exists(self._segment_path(segment_id))
+        }
+        total = sum(sizes.values())
+        # Leave room for the new segment so the store stays within max_bytes
+        while total + self.segment_bytes > self.max_bytes and self._first_segment < self._segment_id:
+            segment_id = self._first_segment
+            mapped = self._maps.pop(segment_id, None)
+            if mapped is not None:
+                try:
+                    mapped.close()
+                except BufferError:
+                    # A reader still holds a view; the mapping is freed with it
+                    pass
+            try:
+                os.remove(self._segment_path(segment_id))
+            except FileNotFoundError:
+                pass
+            total -= sizes.get(segment_id, 0)
+            self._first_segment += 1
+            logger.info(f"Evicted block store segment {segment_id}")
+
+    def size_bytes(self) -> int:
+        """Total size of the live segments."""
+        return sum(
+            os.path.getsize(self._segment_path(segment_id))
+            for segment_id in range(self._first_segment, self._segment_id + 1)
+            if os.path.exists(self._segment_path(segment_id))
+        )
+
+    def metrics(self) -> Dict[str, int]:
+        """Return cache usage counters for the admin status page."""
+        return {
+            "segments": self._segment_id - self._first_segment + 1,
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+            "index_bytes": len(self._index),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        """Flush the index and close all files."""
+        with self._lock:
+            for mapped in self._maps.values():
+                try:
+                    mapped.close()
+                except BufferError:
+                    pass
+            self._maps.clear()
+            self._index.flush()
+            self._index.close()
+            self._index_file.close()
+            self._segment.close()
+            # Closing the file releases the directory lock
+            self._lock_file.close()
@@ -0,0 +1,32 @@
+"""
+Small helpers shared by the utility modules.
+Timestamp normalization across database backends and nearest-rank
+percentiles over in-memory samples.
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, TypeVar
+
+T = TypeVar("T", int, float)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Timestamps come back naive (SQLite) or aware (PostgreSQL); compare in naive UTC."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def percentile(values: Sequence[T], fraction: float) -> T:
+    """
+    Nearest-rank percentile of a non-empty sample.
+
+    Args:
+        values: Samples, in any order
+        fraction: Percentile as a fraction (0.95 for p95)
+
+    Returns:
+        The sample at that rank, clamped to the largest one
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,185 @@
+"""
+Company wallet balance snapshot.
+Keeps the company wallet TRX/USDT balances refreshed in the background and
+tracks locally reserved outflows so admin pages and sends do not need a
+fresh chain read every time.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from .tron import get_tron_service
+
+logger = logging.getLogger(__name__)
+
+
+class _Reservation:
+    """An outflow reserved against the snapshot, optionally already broadcast."""
+
+    def __init__(self, asset: str, amount: Decimal):
+        self.asset = asset
+        self.amount = amount
+        self.broadcast_at: Optional[float] = None
+
+
+class CompanyBalanceSnapshot:
+    """
+    Background-refreshed view of the company wallet balances.
+
+    Sends reserve their amount before broadcasting; the reservation stays
+    counted as pending outflow until a refresh that started at least
+    ``settle_seconds`` after the broadcast, by which time the chain balance
+    already reflects it.
+    """
+
+    def __init__(self, max_age: float, settle_seconds: float):
+        self.max_age = max_age
+        self.settle_seconds = settle_seconds
+
+        self.balances: Dict[str, Decimal] = {}
+        self.refreshed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+        self._reservations: Dict[int, _Reservation] = {}
+        self._ids = itertools.count(1)
+        self._refresh_requested = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful refresh, or None if never refreshed."""
+        if self.refreshed_at is None:
+            return None
+        return time.monotonic() - self.refreshed_at
+
+    def refresh(self) -> Dict[str, Decimal]:
+        """
+        Read the company wallet balances from the chain.
+
+        Returns:
+            The refreshed balances
+
+        Raises:
+            Exception: If the chain read fails; the previous snapshot is kept
+        """
+        tron_service = get_tron_service()
+        started = time.monotonic()
+        try:
+            balances = tron_service.fetch_account_balance(tron_service.company_address)
+        except Exception as e:
+            self.last_error = str(e)
+            raise
+
+        with self._lock:
+            self.balances = balances
+            self.refreshed_at = started
+            self.last_error = None
+            settled_before = started - self.settle_seconds
+            for reservation_id, reservation in list(self._reservations.items()):
+                if reservation.broadcast_at is not None and reservation.broadcast_at <= settled_before:
+                    del self._reservations[reservation_id]
+        return balances
+
+    def _ensure_fresh(self) -> None:
+        """Refresh synchronously if there is no snapshot or it is too old."""
+        age = self.age
+        if age is None or age > self.max_age:
+            self.refresh()
+
+    def pending_outflow(self, asset: str) -> Decimal:
+        """Total reserved or recently broadcast outflow for ``asset``."""
+        with self._lock:
+            return sum(
+                (r.amount for r in self._reservations.values() if r.asset == asset),
+                Decimal('0')
+            )
+
+    def available(self, asset: str) -> Decimal:
+        """Snapshot balance minus pending outflow for ``asset``."""
+        self._ensure_fresh()
+        return self.balances.get(asset, Decimal('0')) - self.pending_outflow(asset)
+
+    def reserve(self, asset: str, amount: Decimal) -> Optional[int]:
+        """
+        Reserve ``amount`` of ``asset`` for an outgoing transfer.
+
+        Args:
+            asset: Asset symbol ('TRX' or 'USDT')
+            amount: Amount to reserve
+
+        Returns:
+            Reservation ID, or None if the available balance is insufficient
+        """
+        self._ensure_fresh()
+        with self._lock:
+            pending = sum(
+                (r.amount for r in self._reservations.values() if r.asset == asset),
+                Decimal('0')
+            )
+            if self.balances.get(asset, Decimal('0')) - pending < amount:
+                return None
+            reservation_id = next(self._ids)
+            self._reservations[reservation_id] = _Reservation(asset, amount)
+            return reservation_id
+
+    def commit(self, reservation_id: int) -> None:
+        """Mark a reservation as broadcast and schedule an immediate refresh."""
+        with self._lock:
+            reservation = self._reservations.get(reservation_id)
+            if reservation is not None:
+                reservation.broadcast_at = time.monotonic()
+        self._refresh_requested.set()
+
+    def release(self, reservation_id: int) -> None:
+        """Drop a reservation whose transfer was never broadcast."""
+        with self._lock:
+            self._reservations.pop(reservation_id, None)
+
+    def record_outflow(self, asset: str, amount: Decimal) -> None:
+        """Track an outflow that was broadcast without a prior reservation."""
+        with self._lock:
+            reservation_id = next(self._ids)
+            reservation = _Reservation(asset, amount)
+            reservation.broadcast_at = time.monotonic()
+            self._reservations[reservation_id] = reservation
+        self._refresh_requested.set()
+
+    def status(self) -> Dict[str, Any]:
+        """Return balances, pending outflow and snapshot age for admin views."""
+        self._ensure_fresh()
+        assets = set(self.balances) | {r.asset for r in self._reservations.values()}
+        return {
+            "balances": {asset: float(self.balances.get(asset, Decimal('0'))) for asset in sorted(assets)},
+            "pending_outflow": {asset: float(self.pending_outflow(asset)) for asset in sorted(assets)},
+            "age_seconds": round(self.age, 1) if self.age is not None else None,
+            "last_error": self.last_error,
+        }
+
+    async def run_refresher(self, refresh_interval: float) -> None:
+        """Refresh on a schedule and right after every broadcast."""
+        logger.info(f"Starting company balance refresher (every {refresh_interval}s)")
+        while True:
+            self._refresh_requested.clear()
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"Error refreshing company wallet balance: {e}")
+
+            # Sleep in short steps so a broadcast can cut the wait short
+            waited = 0.0
+            while waited < refresh_interval and not self._refresh_requested.is_set():
+                await asyncio.sleep(0.5)
+                waited += 0.5
+
+
+# 전역 회사 지갑 잔액 스냅샷
+company_balance = CompanyBalanceSnapshot(
+    max_age=settings.company_balance_max_age,
+    settle_seconds=settings.company_balance_settle_seconds,
+)
@@ -0,0 +1,111 @@
+"""
+Smart contract loading with a persistent ABI cache.
+Contract metadata fetched from the node is stored on disk so later starts
+build the contract object without a network round-trip.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from tronpy import Tron
+from tronpy.contract import Contract
+
+logger = logging.getLogger(__name__)
+
+# Minimal TRC20 ABI used when the contract metadata is neither cached nor
+# reachable; covers every call this service makes
+TRC20_ABI = [
+    {
+        "name": "balanceOf", "type": "Function", "stateMutability": "View",
+        "inputs": [{"name": "who", "type": "address"}],
+        "outputs": [{"type": "uint256"}],
+    },
+    {
+        "name": "transfer", "type": "Function", "stateMutability": "Nonpayable",
+        "inputs": [{"name": "_to", "type": "address"}, {"name": "_value", "type": "uint256"}],
+        "outputs": [{"type": "bool"}],
+    },
+    {
+        "name": "decimals", "type": "Function", "stateMutability": "View",
+        "inputs": [],
+        "outputs": [{"type": "uint8"}],
+    },
+    {
+        "name": "Transfer", "type": "Event",
+        "inputs": [
+            {"indexed": True, "name": "from", "type": "address"},
+            {"indexed": True, "name": "to", "type": "address"},
+            {"name": "value", "type": "uint256"},
+        ],
+    },
+]
+
+
+def _cache_path(cache_dir: str, address: str) -> str:
+    return os.path.join(cache_dir, f"{address}.json")
+
+
+def _read_cached(cache_dir: str, address: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_cache_path(cache_dir, address)) as f:
+            info = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable ABI cache for {address}: {e}")
+        return None
+    return info if info.get("abi", {}).get("entrys") else None
+
+
+def _write_cached(cache_dir: str, address: str, info: Dict[str, Any]) -> None:
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = _cache_path(cache_dir, address)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(info, f)
+        # Atomic so concurrent workers never read a partial file
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write ABI cache for {address}: {e}")
+
+
+def load_contract(client: Tron, address: str, cache_dir: str) -> Contract:
+    """
+    Build a contract object, preferring the on-disk ABI cache.
+
+    Args:
+        client: Tron client the contract is bound to
+        address: Contract address (base58)
+        cache_dir: ABI cache directory (empty to disable caching)
+
+    Returns:
+        Contract bound to ``client``; falls back to the bundled TRC20 ABI
+        when the metadata is not cached and cannot be fetched
+    """
+    info = _read_cached(cache_dir, address) if cache_dir else None
+    if info is None:
+        try:
+            info = client.provider.make_request("wallet/getcontract", {"value": address, "visible": True})
+            if not info.get("abi", {}).get("entrys"):
+                raise ValueError(f"No ABI returned for contract {address}")
+            # Bytecode is never needed to call a deployed contract
+            info.pop("bytecode", None)
+            if cache_dir:
+                _write_cached(cache_dir, address, info)
+        except Exception as e:
+            logger.warning(f"Using bundled TRC20 ABI for {address}: {e}")
+            info = {"abi": {"entrys": TRC20_ABI}}
+
+    return Contract(
+        addr=address,
+        name=info.get("name", ""),
+        abi=info["abi"]["entrys"],
+        origin_energy_limit=info.get("origin_energy_limit", 0),
+        user_resource_percent=info.get("consume_user_resource_percent", 100),
+        origin_address=info.get("origin_address", ""),
+        code_hash=info.get("code_hash", ""),
+        client=client,
+    )
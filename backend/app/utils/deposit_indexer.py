@@ -0,0 +1,178 @@
+"""
+TRC20 deposit indexer.
+Pages through USDT transfers to user deposit addresses via TronGrid,
+credits new deposits and persists a cursor per address so restarts resume
+where the previous run stopped.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.db import SessionLocal
+from ..crud import crud_chain_cursor, crud_transaction
+from .. import models
+from .tron import USDT_CONTRACT_ADDRESS
+from .trongrid import TronGridClient
+
+logger = logging.getLogger(__name__)
+
+
+class DepositIndexer:
+    """
+    Index incoming TRC20 transfers for every active deposit address.
+
+    Each page is credited in one database transaction together with the
+    cursor update, so a crash never loses or double-credits a page; deposits
+    are additionally deduplicated by ``ref_tx_id``.
+    """
+
+    def __init__(
+        self,
+        grid_client: TronGridClient,
+        session_factory: Callable[[], Session] = SessionLocal,
+        contract_address: str = USDT_CONTRACT_ADDRESS,
+        asset: str = "USDT"
+    ):
+        self.grid_client = grid_client
+        self.session_factory = session_factory
+        self.contract_address = contract_address
+        self.asset = asset
+
+    def cursor_name(self, address: str) -> str:
+        """Name of the persisted cursor for ``address``."""
+        return f"trc20:{self.contract_address}:{address}"
+
+    def _deposit_owners(self, db: Session) -> Dict[str, int]:
+        """Map each active deposit address to the single user owning it."""
+        owners: Dict[str, Optional[int]] = {}
+        rows = db.query(models.DepositAddress.address, models.DepositAddress.user_id).filter(
+            models.DepositAddress.is_active == True
+        ).all()
+        for address, user_id in rows:
+            if address in owners and owners[address] != user_id:
+                # Shared (memo-based) addresses cannot be attributed by address alone
+                owners[address] = None
+            else:
+                owners[address] = user_id
+
+        result = {}
+        for address, user_id in owners.items():
+            if user_id is None:
+                logger.warning(f"Skipping deposit address {address} shared by several users")
+            else:
+                result[address] = user_id
+        return result
+
+    def index_address(self, address: str, user_id: int) -> int:
+        """
+        Index all new transfers to one address.
+
+        Args:
+            address: Deposit address
+            user_id: User credited for transfers to the address
+
+        Returns:
+            Number of newly credited deposits
+        """
+        credited = 0
+        db = self.session_factory()
+        try:
+            cursor = crud_chain_cursor.get_or_create(db, self.cursor_name(address))
+            db.commit()
+
+            while True:
+                transfers, next_fingerprint = self.grid_client.get_trc20_transfers(
+                    address,
+                    self.contract_address,
+                    min_timestamp=cursor.min_timestamp,  # type: ignore
+                    fingerprint=cursor.fingerprint  # type: ignore
+                )
+
+                # TronGrid records carry no log index and a page may repeat a
+                # record, so identical transfers within a transaction collapse
+                # into one; distinct ones are numbered by credit_deposits
+                unique = {
+                    (transfer["tx_id"], transfer["from"], transfer["amount"]): transfer
+                    for transfer in transfers
+                    if transfer["to"] == address and transfer["type"] == "Transfer" and transfer["amount"] > 0
+                }
+                deposits = [
+                    {
+                        "user_id": user_id,
+                        "amount": transfer["amount"],
+                        "asset": self.asset,
+                        "ref_tx_id": transfer["tx_id"],
+                        "to_address": address,
+                        "memo": f"On-chain deposit from {transfer['from']}",
+                    }
+                    for transfer in unique.values()
+                ]
+                created = crud_transaction.credit_deposits(db, deposits, commit=False)
+                credited += len(created)
+
+                if transfers:
+                    cursor.last_timestamp = max(
+                        cursor.last_timestamp,  # type: ignore
+                        max(transfer["timestamp"] for transfer in transfers)
+                    )
+                if next_fingerprint:
+                    cursor.fingerprint = next_fingerprint  # type: ignore
+                else:
+                    # Pass complete - the next one starts at the newest timestamp
+                    # (inclusive, duplicates are skipped by ref_tx_id)
+                    cursor.fingerprint = None  # type: ignore
+                    cursor.min_timestamp = cursor.last_timestamp
+                db.commit()
+
+                if not next_fingerprint:
+                    break
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if credited:
+            logger.info(f"Credited {credited} deposits to user {user_id} ({address})")
+        return credited
+
+    def run_once(self) -> int:
+        """
+        Index every active deposit address once.
+
+        Returns:
+            Total number of newly credited deposits
+        """
+        db = self.session_factory()
+        try:
+            owners = self._deposit_owners(db)
+        finally:
+            db.close()
+
+        total = 0
+        for address, user_id in owners.items():
+            try:
+                total += self.index_address(address, user_id)
+            except Exception as e:
+                # One failing address must not block the others; its cursor
+                # still points at the last committed page
+                logger.error(f"Failed to index deposits for {address}: {e}")
+        return total
+
+
+async def run_deposit_indexer(index_interval: int) -> None:
+    """TronGrid 입금 인덱서를 백그라운드에서 주기적으로 실행합니다."""
+    indexer = DepositIndexer(TronGridClient.from_settings())
+    logger.info(f"Starting deposit indexer (every {index_interval}s)")
+    try:
+        while True:
+            try:
+                await asyncio.to_thread(indexer.run_once)
+            except Exception as e:
+                logger.error(f"Error in deposit indexer: {e}")
+            await asyncio.sleep(index_interval)
+    finally:
+        indexer.grid_client.close()
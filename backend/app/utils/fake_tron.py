@@ -0,0 +1,542 @@
+"""
+Deterministic in-process fake Tron network.
+Selected with ``TRON_NETWORK=fake``: the node pool talks to a fake provider
+and TronGrid to a mock transport, both backed by one simulated chain that
+produces a block every interval and executes TRX and TRC20 transfers with
+balances, receipts, logs and confirmations. Each node adds configurable
+latency and injected failures, so the whole API can be load-tested and
+benchmarked without a live node.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from tronpy.keys import Signature, to_raw_address
+from tronpy.providers import HTTPProvider
+
+from ..core.config import settings
+from .address import to_base58_address
+from .batch_sender import transaction_id
+from .contracts import TRC20_ABI
+from .fees import DEFAULT_BANDWIDTH_PRICE, DEFAULT_ENERGY, DEFAULT_ENERGY_PRICE, DEFAULT_NET, RECIPIENT_EXISTING, RECIPIENT_NEW
+from .log_decoder import TRANSFER_TOPIC
+from .tron import MIN_CONFIRMATIONS, USDT_CONTRACT_ADDRESS
+
+logger = logging.getLogger(__name__)
+
+SUN_PER_TRX = 1_000_000
+
+# transfer(address,uint256) / balanceOf(address) / decimals()
+TRANSFER_SELECTOR = "a9059cbb"
+BALANCE_OF = "balanceOf(address)"
+DECIMALS = "decimals()"
+
+# Receipts kept per block before old blocks are forgotten
+DEFAULT_HISTORY_BLOCKS = 20_000
+
+# Sender of simulated external transfers (token balance is not tracked)
+EXTERNAL_SENDER = "00" * 20
+
+
+class FakeNodeError(ConnectionError):
+    """Failure injected by a fake node."""
+
+
+def _account(address: str) -> str:
+    """20-byte account id (hex) of a base58, 41-prefixed hex or bare hex address."""
+    if address.startswith("T"):
+        return to_raw_address(address)[1:].hex()
+    value = address.lower()
+    if len(value) == 42 and value.startswith("41"):
+        return value[2:]
+    if len(value) == 40:
+        return value
+    raise ValueError(f"Invalid address {address}")
+
+
+def _base58(account: str) -> str:
+    return to_base58_address(bytes.fromhex(account))
+
+
+def _error(code: str, message: str) -> Dict[str, Any]:
+    return {"code": code, "message": message.encode().hex()}
+
+
+class FakeTronChain:
+    """
+    Simulated chain state shared by every fake node.
+
+    Blocks are produced lazily from the clock: each request first produces
+    every block whose slot has passed, so a given sequence of requests and
+    clock readings always yields the same chain. Broadcast transactions are
+    validated, queued and executed in the next block.
+    """
+
+    def __init__(
+        self,
+        block_interval: float = 3.0,
+        seed: int = 1,
+        transfers_per_block: int = 0,
+        confirmations: int = MIN_CONFIRMATIONS,
+        history_blocks: int = DEFAULT_HISTORY_BLOCKS,
+        verify_signatures: bool = True,
+        clock: Callable[[], float] = time.time
+    ):
+        self.block_interval = block_interval
+        self.transfers_per_block = transfers_per_block
+        self.confirmations = confirmations
+        self.history_blocks = history_blocks
+        self.verify_signatures = verify_signatures
+        self.clock = clock
+        self.energy_price = DEFAULT_ENERGY_PRICE
+        self.bandwidth_price = DEFAULT_BANDWIDTH_PRICE
+
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._genesis_ms = int(clock() * 1000)
+        self._headers: List[Dict[str, Any]] = []
+        self._block_receipts: Dict[int, List[Dict[str, Any]]] = {}
+        self._receipts: Dict[str, Dict[str, Any]] = {}
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_ids: set = set()
+        self._trx: Dict[str, int] = {}
+        self._tokens: Dict[Tuple[str, str], int] = {}
+        self._contracts: Dict[str, str] = {}
+        self._trc20_history: Dict[str, List[Dict[str, Any]]] = {}
+        self._produce(0)
+
+    @classmethod
+    def from_settings(cls) -> "FakeTronChain":
+        return cls(
+            block_interval=settings.fake_tron_block_ms / 1000,
+            seed=settings.fake_tron_seed,
+            transfers_per_block=settings.fake_tron_transfers_per_block
+        )
+
+    # Chain state
+
+    @property
+    def head(self) -> int:
+        with self._lock:
+            self._advance()
+            return len(self._headers) - 1
+
+    def add_contract(self, address: str, name: str = "TetherToken") -> None:
+        """Deploy a TRC20 token (Transfer/balanceOf/decimals with 6 decimals)."""
+        with self._lock:
+            self._contracts[_account(address)] = name
+
+    def mint(self, address: str, trx: int = 0, tokens: int = 0, contract: str = USDT_CONTRACT_ADDRESS) -> None:
+        """Credit TRX (SUN) and token units to an address out of thin air."""
+        with self._lock:
+            account = _account(address)
+            if trx or account not in self._trx:
+                self._trx[account] = self._trx.get(account, 0) + trx
+            if tokens:
+                key = (_account(contract), account)
+                self._tokens[key] = self._tokens.get(key, 0) + tokens
+
+    def deposit(self, address: str, amount: int, sender: Optional[str] = None,
+                contract: str = USDT_CONTRACT_ADDRESS) -> str:
+        """
+        Queue an incoming token transfer from outside the service.
+
+        Returns:
+            Transaction ID, included in the next block
+        """
+        with self._lock:
+            self._advance()
+            txid = hashlib.sha256(f"deposit:{len(self._receipts)}:{len(self._pending)}:{self._rng.random()}".encode()).hexdigest()
+            self._queue({
+                "txID": txid,
+                "external": (_account(contract), _account(sender) if sender else EXTERNAL_SENDER, _account(address), amount),
+            })
+            return txid
+
+    def trx_balance(self, address: str) -> int:
+        with self._lock:
+            self._advance()
+            return self._trx.get(_account(address), 0)
+
+    def token_balance(self, address: str, contract: str = USDT_CONTRACT_ADDRESS) -> int:
+        with self._lock:
+            self._advance()
+            return self._tokens.get((_account(contract), _account(address)), 0)
+
+    def _block_id(self, number: int, parent: str, txids: List[str]) -> str:
+        digest = hashlib.sha256(f"{number}:{parent}:{','.join(txids)}".encode()).hexdigest()
+        return f"{number:016x}" + digest[16:]
+
+    def _advance(self) -> None:
+        """Produce every block whose slot has passed."""
+        target = int((self.clock() * 1000 - self._genesis_ms) // (self.block_interval * 1000))
+        while len(self._headers) - 1 < target:
+            self._produce(len(self._headers))
+
+    def _produce(self, number: int) -> None:
+        timestamp = self._genesis_ms + int(number * self.block_interval * 1000)
+        receipts = []
+        for tx in self._pending:
+            receipt = self._execute(tx, number, timestamp)
+            if receipt is not None:
+                receipts.append(receipt)
+        self._pending, self._pending_ids = [], set()
+        if number and self.transfers_per_block and self._contracts:
+            receipts.extend(self._external_traffic(number, timestamp))
+
+        parent = self._headers[-1]["id"] if self._headers else "00" * 32
+        self._headers.append({
+            "number": number,
+            "id": self._block_id(number, parent, [receipt["id"] for receipt in receipts]),
+            "parent": parent,
+            "timestamp": timestamp,
+        })
+        self._block_receipts[number] = receipts
+        for receipt in receipts:
+            self._receipts[receipt["id"]] = receipt
+
+        expired = number - self.history_blocks
+        for receipt in self._block_receipts.pop(expired, ()):
+            self._receipts.pop(receipt["id"], None)
+
+    def _external_traffic(self, number: int, timestamp: int) -> List[Dict[str, Any]]:
+        """Random token transfers between unrelated accounts, for realistic log volume."""
+        contract = next(iter(self._contracts))
+        receipts = []
+        for _ in range(self.transfers_per_block):
+            txid = self._rng.getrandbits(256).to_bytes(32, "big").hex()
+            sender = self._rng.getrandbits(160).to_bytes(20, "big").hex()
+            recipient = self._rng.getrandbits(160).to_bytes(20, "big").hex()
+            receipt = self._receipt(txid, number, timestamp, contract, DEFAULT_ENERGY[RECIPIENT_EXISTING], "SUCCESS")
+            receipt["log"] = [self._transfer_log(contract, sender, recipient, self._rng.randrange(1, 10 ** 10))]
+            receipts.append(receipt)
+        return receipts
+
+    # Transactions
+
+    def _queue(self, tx: Dict[str, Any]) -> None:
+        self._pending.append(tx)
+        self._pending_ids.add(tx["txID"])
+
+    def txid(self, raw_data: Dict[str, Any]) -> str:
+        """Transaction ID; smart contract calls match the node's protobuf hashing."""
+        if raw_data["contract"][0]["type"] == "TriggerSmartContract":
+            return transaction_id(raw_data)
+        return hashlib.sha256(json.dumps(raw_data, sort_keys=True).encode()).hexdigest()
+
+    def broadcast(self, tx: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a signed transaction and queue it for the next block."""
+        with self._lock:
+            self._advance()
+            txid = tx.get("txID") or ""
+            raw_data = tx.get("raw_data") or {}
+            if txid in self._receipts or txid in self._pending_ids:
+                return _error("DUP_TRANSACTION_ERROR", "dup transaction")
+            if raw_data.get("expiration", 0) <= int(self.clock() * 1000):
+                return _error("TRANSACTION_EXPIRATION_ERROR", "transaction expired")
+            contract = raw_data["contract"][0]
+            value = contract["parameter"]["value"]
+            owner = _account(value["owner_address"])
+            if self.verify_signatures:
+                try:
+                    signer = Signature.fromhex(tx["signature"][0]).recover_public_key_from_msg_hash(bytes.fromhex(txid))
+                    signed = signer.to_hex_address()[2:] == owner
+                except Exception:
+                    signed = False
+                if not signed:
+                    return _error("SIGERROR", "validate signature error")
+
+            if contract["type"] == "TransferContract":
+                if self._trx.get(owner, 0) < value["amount"]:
+                    return _error("CONTRACT_VALIDATE_ERROR", "Validate TransferContract error, balance is not sufficient.")
+            elif contract["type"] == "TriggerSmartContract":
+                if _account(value["contract_address"]) not in self._contracts:
+                    return _error("CONTRACT_VALIDATE_ERROR", "No contract or not a smart contract")
+                if owner not in self._trx:
+                    return _error("CONTRACT_VALIDATE_ERROR", "Validate TriggerSmartContract error, no OwnerAccount.")
+            else:
+                return _error("CONTRACT_VALIDATE_ERROR", f"{contract['type']} is not supported by the fake node")
+
+            self._queue({"txID": txid, "raw_data": raw_data})
+            return {"result": True, "txid": txid}
+
+    def _burn(self, account: str, sun: int) -> int:
+        paid = min(sun, self._trx.get(account, 0))
+        self._trx[account] = self._trx.get(account, 0) - paid
+        return paid
+
+    def _receipt(self, txid: str, number: int, timestamp: int, contract: Optional[str],
+                 energy: int, result: Optional[str], fee: int = 0) -> Dict[str, Any]:
+        receipt: Dict[str, Any] = {"energy_usage_total": energy, "net_usage": DEFAULT_NET}
+        if result:
+            receipt["result"] = result
+        info: Dict[str, Any] = {
+            "id": txid,
+            "fee": fee,
+            "blockNumber": number,
+            "blockTimeStamp": timestamp,
+            "receipt": receipt,
+        }
+        if contract:
+            info["contract_address"] = "41" + contract
+        return info
+
+    def _transfer_log(self, contract: str, sender: str, recipient: str, amount: int) -> Dict[str, Any]:
+        return {
+            "address": contract,
+            "topics": [TRANSFER_TOPIC, "0" * 24 + sender, "0" * 24 + recipient],
+            "data": f"{amount:064x}",
+        }
+
+    def _record_transfer(self, txid: str, timestamp: int, contract: str, sender: str, recipient: str, amount: int) -> None:
+        key = (contract, recipient)
+        self._tokens[key] = self._tokens.get(key, 0) + amount
+        record = {
+            "transaction_id": txid,
+            "token_info": {"address": _base58(contract), "decimals": 6, "symbol": "USDT"},
+            "block_timestamp": timestamp,
+            "from": _base58(sender),
+            "to": _base58(recipient),
+            "type": "Transfer",
+            "value": str(amount),
+        }
+        for account in {sender, recipient}:
+            self._trc20_history.setdefault(account, []).append(record)
+
+    def _execute(self, tx: Dict[str, Any], number: int, timestamp: int) -> Optional[Dict[str, Any]]:
+        txid = tx["txID"]
+        if "external" in tx:
+            contract, sender, recipient, amount = tx["external"]
+            receipt = self._receipt(txid, number, timestamp, contract, DEFAULT_ENERGY[RECIPIENT_EXISTING], "SUCCESS")
+            receipt["log"] = [self._transfer_log(contract, sender, recipient, amount)]
+            self._record_transfer(txid, timestamp, contract, sender, recipient, amount)
+            return receipt
+
+        contract_call = tx["raw_data"]["contract"][0]
+        value = contract_call["parameter"]["value"]
+        owner = _account(value["owner_address"])
+        net_fee = DEFAULT_NET * self.bandwidth_price
+
+        if contract_call["type"] == "TransferContract":
+            amount = value["amount"]
+            if self._trx.get(owner, 0) < amount:
+                # Spent by an earlier transaction in the same block; never included
+                return None
+            to = _account(value["to_address"])
+            self._trx[owner] -= amount
+            self._trx[to] = self._trx.get(to, 0) + amount
+            return self._receipt(txid, number, timestamp, None, 0, None, fee=self._burn(owner, net_fee))
+
+        contract = _account(value["contract_address"])
+        data = value.get("data") or ""
+        recipient, amount = (data[32:72], int(data[72:136] or "0", 16)) if len(data) >= 136 else ("", 0)
+        holds_tokens = self._tokens.get((contract, recipient), 0) > 0
+        energy = DEFAULT_ENERGY[RECIPIENT_EXISTING if holds_tokens else RECIPIENT_NEW]
+        energy_fee = energy * self.energy_price
+        fee_limit = tx["raw_data"].get("fee_limit", 0)
+
+        if not data.startswith(TRANSFER_SELECTOR) or not recipient:
+            result = "REVERT"
+        elif energy_fee > fee_limit or self._trx.get(owner, 0) < energy_fee + net_fee:
+            result, energy_fee = "OUT_OF_ENERGY", min(fee_limit, energy_fee)
+        elif self._tokens.get((contract, owner), 0) < amount:
+            result = "REVERT"
+        else:
+            result = "SUCCESS"
+
+        fee = self._burn(owner, energy_fee + net_fee)
+        receipt = self._receipt(txid, number, timestamp, contract, energy, result, fee=fee)
+        receipt["receipt"]["energy_fee"] = energy_fee
+        if result == "SUCCESS":
+            self._tokens[(contract, owner)] -= amount
+            self._record_transfer(txid, timestamp, contract, owner, recipient, amount)
+            receipt["log"] = [self._transfer_log(contract, owner, recipient, amount)]
+        return receipt
+
+    # Node API
+
+    def _header(self, number: int) -> Dict[str, Any]:
+        header = self._headers[number]
+        return {
+            "blockID": header["id"],
+            "block_header": {"raw_data": {
+                "number": number,
+                "parentHash": header["parent"],
+                "timestamp": header["timestamp"],
+            }},
+        }
+
+    def _constant_call(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        contract = _account(params["contract_address"])
+        if contract not in self._contracts:
+            return {"result": {"code": "CONTRACT_VALIDATE_ERROR", "message": b"No contract".hex()}}
+        selector = params.get("function_selector")
+        if selector == BALANCE_OF:
+            value = self._tokens.get((contract, params.get("parameter", "")[-40:].lower()), 0)
+        elif selector == DECIMALS:
+            value = 6
+        else:
+            return {"result": {"result": True, "message": b"REVERT opcode executed".hex()}, "constant_result": [""]}
+        return {"result": {"result": True}, "constant_result": [f"{value:064x}"], "energy_used": 500}
+
+    def handle(self, method: str, params: Dict[str, Any]) -> Any:
+        """Answer one full node HTTP API call."""
+        with self._lock:
+            self._advance()
+            head = len(self._headers) - 1
+            # Solidity endpoints only see blocks with enough confirmations
+            solid = max(0, head - self.confirmations)
+            if method == "wallet/getnodeinfo":
+                return {
+                    "block": f"Num:{head},ID:{self._headers[head]['id']}",
+                    "solidityBlock": f"Num:{solid},ID:{self._headers[solid]['id']}",
+                }
+            if method == "wallet/getnowblock":
+                return self._header(head)
+            if method == "walletsolidity/getnowblock":
+                return self._header(solid)
+            if method in ("wallet/getblock", "wallet/getblockbynum"):
+                number = int(params.get("id_or_num", params.get("num", head)))
+                return self._header(number) if 0 <= number <= head else {}
+            if method == "wallet/gettransactioninfobyblocknum":
+                return list(self._block_receipts.get(int(params["num"]), []))
+            if method == "wallet/gettransactioninfobyid":
+                return self._receipts.get(params["value"], {})
+            if method == "walletsolidity/gettransactioninfobyid":
+                receipt = self._receipts.get(params["value"], {})
+                return receipt if receipt and receipt["blockNumber"] <= solid else {}
+            if method == "wallet/getaccount":
+                account = _account(params["address"])
+                if account not in self._trx:
+                    return {}
+                return {"address": _base58(account), "balance": self._trx[account]}
+            if method == "wallet/getchainparameters":
+                return {"chainParameter": [
+                    {"key": "getEnergyFee", "value": self.energy_price},
+                    {"key": "getTransactionFee", "value": self.bandwidth_price},
+                ]}
+            if method == "wallet/getcontract":
+                contract = _account(params["value"])
+                if contract not in self._contracts:
+                    return {}
+                return {"name": self._contracts[contract], "contract_address": "41" + contract, "abi": {"entrys": TRC20_ABI}}
+            if method == "wallet/triggerconstantcontract":
+                return self._constant_call(params)
+            if method == "wallet/getsignweight":
+                return {"transaction": {"transaction": {"txID": self.txid(params["raw_data"]), "raw_data": params["raw_data"]}}}
+            if method == "wallet/broadcasttransaction":
+                return self.broadcast(params)
+        return {"Error": f"{method} is not implemented by the fake node"}
+
+    def trc20_transfers(self, address: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer TronGrid's /v1/accounts/{address}/transactions/trc20."""
+        with self._lock:
+            self._advance()
+            account = _account(address)
+            confirmed_before = self._headers[max(0, len(self._headers) - 1 - self.confirmations)]["timestamp"]
+            records = [
+                record for record in self._trc20_history.get(account, [])
+                if record["block_timestamp"] >= int(params.get("min_timestamp") or 0)
+                and (params.get("only_to") != "true" or record["to"] == _base58(account))
+                and (not params.get("contract_address") or record["token_info"]["address"] == params["contract_address"])
+                and (params.get("only_confirmed") != "true" or record["block_timestamp"] <= confirmed_before)
+            ]
+        start = int(params.get("fingerprint") or 0)
+        limit = int(params.get("limit") or 20)
+        page = records[start:start + limit]
+        meta: Dict[str, Any] = {"page_size": len(page)}
+        if start + limit < len(records):
+            meta["fingerprint"] = str(start + limit)
+        return {"success": True, "data": page, "meta": meta}
+
+
+class FailureInjector:
+    """Seeded latency and failure injection for one fake endpoint."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 1):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, method: str) -> None:
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise FakeNodeError(f"Injected failure for {method}")
+
+
+class FakeTronProvider(HTTPProvider):
+    """tronpy provider answering from a ``FakeTronChain`` instead of HTTP."""
+
+    def __init__(self, chain: FakeTronChain, endpoint_uri: str = "fake://node", inject: Optional[FailureInjector] = None):
+        # No HTTP session: every request is answered in-process
+        self.endpoint_uri = endpoint_uri
+        self.chain = chain
+        self.inject = inject or FailureInjector()
+
+    def make_request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        self.inject(method)
+        return self.chain.handle(method, params or {})
+
+
+def trongrid_transport(chain: FakeTronChain, inject: Optional[FailureInjector] = None) -> httpx.MockTransport:
+    """httpx transport answering TronGrid TRC20 history requests from the chain."""
+    inject = inject or FailureInjector()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")
+        if len(parts) != 5 or parts[:2] != ["v1", "accounts"] or parts[3:] != ["transactions", "trc20"]:
+            return httpx.Response(404, json={"success": False, "error": "Not found"})
+        try:
+            inject(request.url.path)
+        except FakeNodeError as e:
+            return httpx.Response(503, json={"success": False, "error": str(e)})
+        return httpx.Response(200, json=chain.trc20_transfers(parts[2], dict(request.url.params)))
+
+    return httpx.MockTransport(handler)
+
+
+_chain: Optional[FakeTronChain] = None
+_chain_lock = threading.Lock()
+
+
+def get_fake_chain() -> FakeTronChain:
+    """Return the process-wide fake chain, deploying USDT and funding the company wallet on first use."""
+    global _chain
+    with _chain_lock:
+        if _chain is None:
+            chain = FakeTronChain.from_settings()
+            chain.add_contract(USDT_CONTRACT_ADDRESS)
+            company_address = settings.company_wallet_address
+            if settings.company_wallet_private_key:
+                from tronpy.keys import PrivateKey
+                company_address = PrivateKey(bytes.fromhex(settings.company_wallet_private_key)).public_key.to_base58check_address()
+            if company_address:
+                chain.mint(
+                    company_address,
+                    trx=int(settings.fake_tron_company_trx * SUN_PER_TRX),
+                    tokens=int(settings.fake_tron_company_usdt * 1_000_000)
+                )
+            _chain = chain
+        return _chain
+
+
+def fake_injector(index: int = 0) -> FailureInjector:
+    """Latency and failure injection configured in the settings (one seed per endpoint)."""
+    return FailureInjector(
+        latency=settings.fake_tron_latency_ms / 1000,
+        jitter=settings.fake_tron_latency_jitter_ms / 1000,
+        error_rate=settings.fake_tron_error_rate,
+        seed=settings.fake_tron_seed + index
+    )
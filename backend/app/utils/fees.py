@@ -0,0 +1,267 @@
+"""
+Energy-aware fee estimation for outgoing USDT transfers.
+Caches the chain's energy and bandwidth prices and learns what transfers
+actually cost from finalized receipts, per recipient type, so each send
+gets a tight fee_limit and payouts can be costed before they run.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from .. import models
+from .common import percentile
+
+logger = logging.getLogger(__name__)
+
+SUN_PER_TRX = 1_000_000
+
+# Recipient types: a transfer to an address that holds no USDT yet has to
+# initialise its balance slot and costs roughly twice the energy
+RECIPIENT_EXISTING = "existing"
+RECIPIENT_NEW = "new"
+RECIPIENT_TYPES = (RECIPIENT_EXISTING, RECIPIENT_NEW)
+
+# Typical USDT transfer cost, used until enough receipts were observed
+DEFAULT_ENERGY = {RECIPIENT_EXISTING: 65_000, RECIPIENT_NEW: 131_000}
+DEFAULT_NET = 345
+
+# Chain parameter defaults (SUN per energy unit / per bandwidth byte)
+DEFAULT_ENERGY_PRICE = 420
+DEFAULT_BANDWIDTH_PRICE = 1000
+
+# Observations needed before they replace the defaults
+MIN_SAMPLES = 5
+
+
+class FeeEstimator:
+    """
+    Estimate energy, fee_limit and TRX burn for USDT transfers.
+
+    The fee_limit covers the high percentile of recently observed energy
+    usage for the recipient type plus a safety margin; the expected burn
+    uses the median and assumes the wallet has no staked resources.
+    """
+
+    def __init__(
+        self,
+        tron_service: Any,
+        margin: float = 1.2,
+        max_fee_limit: int = 100 * SUN_PER_TRX,
+        refresh_interval: float = 600.0,
+        sample_size: int = 200,
+        recipient_cache_ttl: float = 600.0,
+        recipient_cache_size: int = 10_000
+    ):
+        self.tron_service = tron_service
+        self.margin = margin
+        self.max_fee_limit = max_fee_limit
+        self.refresh_interval = refresh_interval
+        self.recipient_cache_ttl = recipient_cache_ttl
+        self.recipient_cache_size = recipient_cache_size
+
+        self.energy_price = DEFAULT_ENERGY_PRICE
+        self.bandwidth_price = DEFAULT_BANDWIDTH_PRICE
+        self.prices_updated_at: Optional[float] = None
+
+        self._samples: Dict[str, Deque[Tuple[int, int]]] = {
+            recipient_type: deque(maxlen=sample_size) for recipient_type in RECIPIENT_TYPES
+        }
+        self._loaded = False
+        self._lock = threading.Lock()
+        # address -> (recipient type, classified at), oldest first
+        self._recipients: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    @classmethod
+    def from_settings(cls, tron_service: Any) -> "FeeEstimator":
+        return cls(
+            tron_service,
+            margin=settings.fee_limit_margin,
+            max_fee_limit=int(settings.max_fee_limit_trx * SUN_PER_TRX),
+            refresh_interval=settings.fee_parameters_refresh_interval,
+            sample_size=settings.fee_sample_size,
+            recipient_cache_ttl=settings.fee_recipient_cache_ttl
+        )
+
+    def refresh_prices(self) -> None:
+        """Read the current energy and bandwidth prices from the chain."""
+        parameters = self.tron_service._call(
+            lambda node: node.client.get_chain_parameters(),
+            timeout=settings.tron_read_timeout,
+            idempotent=True
+        )
+        values = {parameter.get("key"): parameter.get("value") for parameter in parameters}
+        with self._lock:
+            self.energy_price = int(values.get("getEnergyFee") or self.energy_price)
+            self.bandwidth_price = int(values.get("getTransactionFee") or self.bandwidth_price)
+            self.prices_updated_at = time.monotonic()
+
+    def _ensure_prices(self) -> None:
+        """Refresh prices when stale; keep the last known prices if the node fails."""
+        updated_at = self.prices_updated_at
+        if updated_at is not None and time.monotonic() - updated_at < self.refresh_interval:
+            return
+        try:
+            self.refresh_prices()
+        except Exception as e:
+            logger.warning(f"Using cached chain fee prices: {e}")
+            # Do not retry on every transfer while the node is failing
+            self.prices_updated_at = time.monotonic()
+
+    def cached_recipient_type(self, address: str) -> Optional[str]:
+        """Recipient type classified within the cache TTL, if any."""
+        with self._lock:
+            entry = self._recipients.get(address)
+        if entry is None or time.monotonic() - entry[1] >= self.recipient_cache_ttl:
+            return None
+        return entry[0]
+
+    def recipient_type(self, address: str) -> str:
+        """
+        Classify a recipient by whether it already holds USDT (new if unknown).
+
+        Results are cached per address for ``recipient_cache_ttl`` seconds so
+        repeated sends and fee estimates do not each cost a balanceOf call;
+        failed lookups are not cached.
+        """
+        cached = self.cached_recipient_type(address)
+        if cached is not None:
+            return cached
+        contract = self.tron_service.usdt_contract
+        if not contract:
+            return RECIPIENT_NEW
+        try:
+            balance = self.tron_service._call(
+                lambda node: node.contract(contract).functions.balanceOf(address),
+                timeout=settings.tron_read_timeout,
+                idempotent=True
+            )
+        except Exception as e:
+            logger.warning(f"Could not classify recipient {address}, assuming new holder: {e}")
+            return RECIPIENT_NEW
+        recipient_type = RECIPIENT_EXISTING if balance > 0 else RECIPIENT_NEW
+        with self._lock:
+            self._recipients[address] = (recipient_type, time.monotonic())
+            self._recipients.move_to_end(address)
+            while len(self._recipients) > self.recipient_cache_size:
+                self._recipients.popitem(last=False)
+        return recipient_type
+
+    def classify(self, addresses: List[str], concurrency: int = 4) -> List[str]:
+        """Classify many recipients concurrently; results are in input order."""
+        types: Dict[str, str] = {}
+        for address in dict.fromkeys(addresses):
+            cached = self.cached_recipient_type(address)
+            if cached is not None:
+                types[address] = cached
+        missing = [address for address in dict.fromkeys(addresses) if address not in types]
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(missing)))) as executor:
+                types.update(zip(missing, executor.map(self.recipient_type, missing)))
+        return [types[address] for address in addresses]
+
+    def observe(self, recipient_type: str, energy_used: int, net_used: int) -> None:
+        """Record the resources a finalized transfer actually used."""
+        if recipient_type in self._samples and energy_used > 0:
+            with self._lock:
+                self._samples[recipient_type].append((int(energy_used), int(net_used)))
+
+    def observe_finalized(
+        self, db: Session, tx_hash: str, energy_used: int, net_used: int, success: bool = True
+    ) -> None:
+        """Record a finalized receipt if it belongs to one of our withdrawals (failed receipts are skipped)."""
+        if not success:
+            # A reverted transfer's usage (e.g. the whole fee_limit when out of energy) is not a sample
+            return
+        row = db.query(models.WithdrawalJob.recipient_type).join(
+            models.WithdrawalRequest, models.WithdrawalJob.withdrawal_request_id == models.WithdrawalRequest.id
+        ).filter(models.WithdrawalRequest.ref_tx_id == tx_hash).first()
+        if row and row[0]:
+            self.observe(row[0], energy_used, net_used)
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Seed the samples from stored receipts of past withdrawals (once)."""
+        if self._loaded:
+            return
+        for recipient_type in RECIPIENT_TYPES:
+            rows = db.query(
+                models.FinalizedTransaction.energy_used, models.FinalizedTransaction.net_used
+            ).join(
+                models.WithdrawalRequest, models.WithdrawalRequest.ref_tx_id == models.FinalizedTransaction.tx_hash
+            ).join(
+                models.WithdrawalJob, models.WithdrawalJob.withdrawal_request_id == models.WithdrawalRequest.id
+            ).filter(
+                models.WithdrawalJob.recipient_type == recipient_type,
+                models.FinalizedTransaction.success == True
+            ).order_by(models.FinalizedTransaction.id.desc()).limit(self._samples[recipient_type].maxlen).all()
+            for energy_used, net_used in reversed(rows):
+                self.observe(recipient_type, energy_used, net_used)
+        self._loaded = True
+
+    def _usage(self, recipient_type: str) -> Tuple[int, int, int]:
+        """(high-percentile energy, median energy, median bandwidth) for a recipient type."""
+        with self._lock:
+            samples = list(self._samples[recipient_type])
+        if len(samples) < MIN_SAMPLES:
+            return DEFAULT_ENERGY[recipient_type], DEFAULT_ENERGY[recipient_type], DEFAULT_NET
+        energy = [sample[0] for sample in samples]
+        return percentile(energy, 0.95), percentile(energy, 0.5), percentile([sample[1] for sample in samples], 0.5)
+
+    def fee_limit(self, recipient_type: str) -> int:
+        """fee_limit in SUN for one transfer to a recipient of this type."""
+        self._ensure_prices()
+        high_energy, _, _ = self._usage(recipient_type)
+        return min(self.max_fee_limit, math.ceil(high_energy * self.energy_price * self.margin))
+
+    def expected_burn(self, recipient_type: str) -> int:
+        """Expected TRX burn in SUN for one transfer, paying energy and bandwidth in TRX."""
+        self._ensure_prices()
+        _, energy, net = self._usage(recipient_type)
+        return energy * self.energy_price + net * self.bandwidth_price
+
+    def estimate_batch(self, recipient_types: List[str]) -> Dict[str, Any]:
+        """
+        Expected cost of sending transfers to the given recipient types.
+
+        Returns:
+            Transfer counts, expected burn and the TRX to reserve (sum of fee limits)
+        """
+        counts = {recipient_type: recipient_types.count(recipient_type) for recipient_type in RECIPIENT_TYPES}
+        burn = sum(self.expected_burn(t) * count for t, count in counts.items())
+        reserve = sum(self.fee_limit(t) * count for t, count in counts.items())
+        return {
+            "transfers": counts,
+            "expected_burn_trx": float(Decimal(burn) / SUN_PER_TRX),
+            "max_burn_trx": float(Decimal(reserve) / SUN_PER_TRX),
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        """Prices and per-recipient-type estimates for admin views."""
+        self._ensure_prices()
+        recipients = {}
+        for recipient_type in RECIPIENT_TYPES:
+            high_energy, energy, net = self._usage(recipient_type)
+            recipients[recipient_type] = {
+                "samples": len(self._samples[recipient_type]),
+                "energy_p95": high_energy,
+                "energy_median": energy,
+                "net_median": net,
+                "fee_limit_trx": self.fee_limit(recipient_type) / SUN_PER_TRX,
+                "expected_burn_trx": self.expected_burn(recipient_type) / SUN_PER_TRX,
+            }
+        return {
+            "energy_price_sun": self.energy_price,
+            "bandwidth_price_sun": self.bandwidth_price,
+            "prices_age_seconds": (
+                round(time.monotonic() - self.prices_updated_at, 1) if self.prices_updated_at is not None else None
+            ),
+            "recipients": recipients,
+        }
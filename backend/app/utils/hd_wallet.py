@@ -0,0 +1,280 @@
+"""
+HD (BIP32/BIP44) deposit address derivation.
+Derives per-user Tron deposit addresses from an account-level extended
+public key (m/44'/195'/account'), so the web tier never holds private keys.
+Private derivation exists only for offline tools such as the sweeper.
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Tuple
+
+import base58
+from coincurve import PrivateKey as CurvePrivateKey, PublicKey as CurvePublicKey
+from Crypto.Hash import RIPEMD160
+from tronpy.keys import PublicKey
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# SLIP-44 coin type for Tron
+TRON_COIN_TYPE = 195
+
+# First non-hardened index limit
+HARDENED_OFFSET = 0x80000000
+
+# secp256k1 group order
+CURVE_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# Derivation chain for receiving addresses (BIP44 "external" chain)
+EXTERNAL_CHAIN = 0
+
+
+class ExtendedPublicKey:
+    """A BIP32 extended public key supporting non-hardened child derivation."""
+
+    def __init__(self, public_key: bytes, chain_code: bytes, depth: int = 0,
+                 parent_fingerprint: bytes = b"\0" * 4, child_number: int = 0,
+                 version: bytes = bytes.fromhex("0488b21e")):
+        self.public_key = public_key  # 33-byte compressed point
+        self.chain_code = chain_code
+        self.depth = depth
+        self.parent_fingerprint = parent_fingerprint
+        self.child_number = child_number
+        self.version = version
+
+    @classmethod
+    def from_string(cls, xpub: str) -> "ExtendedPublicKey":
+        """
+        Parse a base58check-encoded extended public key.
+
+        Raises:
+            ValueError: If the string is not a valid extended public key
+        """
+        try:
+            raw = base58.b58decode_check(xpub.strip())
+        except Exception as e:
+            raise ValueError(f"Invalid extended public key: {e}") from e
+        if len(raw) != 78:
+            raise ValueError("Invalid extended public key length")
+        key = raw[45:78]
+        if key[0] not in (2, 3):
+            raise ValueError("Extended key does not contain a public key")
+        return cls(
+            public_key=key,
+            chain_code=raw[13:45],
+            depth=raw[4],
+            parent_fingerprint=raw[5:9],
+            child_number=int.from_bytes(raw[9:13], "big"),
+            version=raw[:4],
+        )
+
+    def to_string(self) -> str:
+        """Serialize as a base58check extended public key."""
+        return base58.b58encode_check(
+            self.version
+            + bytes([self.depth])
+            + self.parent_fingerprint
+            + self.child_number.to_bytes(4, "big")
+            + self.chain_code
+            + self.public_key
+        ).decode()
+
+    @property
+    def fingerprint(self) -> bytes:
+        return RIPEMD160.new(hashlib.sha256(self.public_key).digest()).digest()[:4]
+
+    def derive_child(self, index: int) -> "ExtendedPublicKey":
+        """
+        Derive the non-hardened child ``index`` (CKDpub).
+
+        Raises:
+            ValueError: For hardened indexes or the (astronomically rare)
+                invalid child; BIP32 says to skip to the next index
+        """
+        if not 0 <= index < HARDENED_OFFSET:
+            raise ValueError("Hardened children cannot be derived from a public key")
+        digest = hmac.new(self.chain_code, self.public_key + index.to_bytes(4, "big"), hashlib.sha512).digest()
+        tweak, chain_code = digest[:32], digest[32:]
+        if int.from_bytes(tweak, "big") >= CURVE_ORDER:
+            raise ValueError(f"Invalid child key at index {index}")
+        child = CurvePublicKey(self.public_key).add(tweak)
+        return ExtendedPublicKey(
+            public_key=child.format(compressed=True),
+            chain_code=chain_code,
+            depth=self.depth + 1,
+            parent_fingerprint=self.fingerprint,
+            child_number=index,
+            version=self.version,
+        )
+
+    def to_tron_address(self) -> str:
+        """Base58check Tron address of this key."""
+        uncompressed = CurvePublicKey(self.public_key).format(compressed=False)
+        return PublicKey(uncompressed[1:]).to_base58check_address()
+
+
+class ExtendedPrivateKey:
+    """A BIP32 extended private key supporting child derivation (CKDpriv)."""
+
+    def __init__(self, private_key: bytes, chain_code: bytes, depth: int = 0,
+                 parent_fingerprint: bytes = b"\0" * 4, child_number: int = 0):
+        self.private_key = private_key  # 32-byte secret
+        self.chain_code = chain_code
+        self.depth = depth
+        self.parent_fingerprint = parent_fingerprint
+        self.child_number = child_number
+
+    @classmethod
+    def from_string(cls, xprv: str) -> "ExtendedPrivateKey":
+        """
+        Parse a base58check-encoded extended private key.
+
+        Raises:
+            ValueError: If the string is not a valid extended private key
+        """
+        try:
+            raw = base58.b58decode_check(xprv.strip())
+        except Exception as e:
+            raise ValueError(f"Invalid extended private key: {e}") from e
+        if len(raw) != 78:
+            raise ValueError("Invalid extended private key length")
+        if raw[45] != 0:
+            raise ValueError("Extended key does not contain a private key")
+        return cls(
+            private_key=raw[46:78],
+            chain_code=raw[13:45],
+            depth=raw[4],
+            parent_fingerprint=raw[5:9],
+            child_number=int.from_bytes(raw[9:13], "big"),
+        )
+
+    def public(self) -> ExtendedPublicKey:
+        """The matching extended public key (xpub)."""
+        return ExtendedPublicKey(
+            public_key=CurvePrivateKey(self.private_key).public_key.format(compressed=True),
+            chain_code=self.chain_code,
+            depth=self.depth,
+            parent_fingerprint=self.parent_fingerprint,
+            child_number=self.child_number,
+        )
+
+    def derive_child(self, index: int) -> "ExtendedPrivateKey":
+        """
+        Derive the child ``index``; indexes from ``HARDENED_OFFSET`` are hardened.
+
+        Raises:
+            ValueError: For the (astronomically rare) invalid child
+        """
+        if index >= HARDENED_OFFSET:
+            data = b"\0" + self.private_key
+        else:
+            data = CurvePrivateKey(self.private_key).public_key.format(compressed=True)
+        digest = hmac.new(self.chain_code, data + index.to_bytes(4, "big"), hashlib.sha512).digest()
+        tweak = int.from_bytes(digest[:32], "big")
+        child = (tweak + int.from_bytes(self.private_key, "big")) % CURVE_ORDER
+        if tweak >= CURVE_ORDER or child == 0:
+            raise ValueError(f"Invalid child key at index {index}")
+        return ExtendedPrivateKey(
+            private_key=child.to_bytes(32, "big"),
+            chain_code=digest[32:],
+            depth=self.depth + 1,
+            parent_fingerprint=self.public().fingerprint,
+            child_number=index,
+        )
+
+
+@lru_cache(maxsize=8)
+def _external_chain(xpub: str) -> ExtendedPublicKey:
+    """Account xpub -> receiving chain node (m/44'/195'/account'/0), cached."""
+    return ExtendedPublicKey.from_string(xpub).derive_child(EXTERNAL_CHAIN)
+
+
+def derive_address(xpub: str, index: int) -> str:
+    """
+    Derive the receiving address ``index`` of an account-level xpub.
+
+    Args:
+        xpub: Extended public key of m/44'/195'/account'
+        index: Address index (m/44'/195'/account'/0/index)
+
+    Returns:
+        Base58check Tron address
+    """
+    return _external_chain(xpub).derive_child(index).to_tron_address()
+
+
+def derive_private_key(xprv: str, index: int) -> bytes:
+    """
+    Derive the private key of receiving address ``index`` of an account-level xprv.
+
+    Args:
+        xprv: Extended private key of m/44'/195'/account'
+        index: Address index (m/44'/195'/account'/0/index)
+
+    Returns:
+        32-byte private key
+    """
+    return ExtendedPrivateKey.from_string(xprv).derive_child(EXTERNAL_CHAIN).derive_child(index).private_key
+
+
+def _derive_batch(xpub: str, indexes: List[int]) -> List[Tuple[int, str]]:
+    """Derive addresses for a batch of indexes - runs in a worker process."""
+    chain = _external_chain(xpub)
+    return [(index, chain.derive_child(index).to_tron_address()) for index in indexes]
+
+
+def derive_addresses(
+    xpub: str,
+    indexes: List[int],
+    processes: int = 0,
+    batch_size: int = 2000
+) -> List[Tuple[int, str]]:
+    """
+    Derive many receiving addresses, in parallel worker processes when large.
+
+    Derivation is CPU-bound elliptic curve math, so large requests are split
+    into batches spread over a process pool.
+
+    Args:
+        xpub: Extended public key of m/44'/195'/account'
+        indexes: Address indexes to derive
+        processes: Worker processes (0 = CPU count)
+        batch_size: Indexes per worker task
+
+    Returns:
+        (index, address) pairs in the order of ``indexes``
+    """
+    if not indexes:
+        return []
+    # Validate before fanning out so a bad key fails fast in the caller
+    _external_chain(xpub)
+
+    batches = [indexes[i:i + batch_size] for i in range(0, len(indexes), batch_size)]
+    workers = min(processes or os.cpu_count() or 1, len(batches))
+    if workers == 1:
+        return [pair for batch in batches for pair in _derive_batch(xpub, batch)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [
+            pair
+            for result in executor.map(_derive_batch, [xpub] * len(batches), batches)
+            for pair in result
+        ]
+
+
+def deposit_xpub() -> str:
+    """
+    Return the configured account xpub.
+
+    Raises:
+        ValueError: If HD deposit addresses are not configured
+    """
+    if not settings.deposit_xpub:
+        raise ValueError("DEPOSIT_XPUB is not configured")
+    return settings.deposit_xpub
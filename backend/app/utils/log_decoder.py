@@ -0,0 +1,126 @@
+"""
+Fixed-offset decoding of TRC20 Transfer logs.
+A Transfer log always carries the sender and recipient in the last 20 bytes
+of topics 1 and 2 and the amount in the first data word, so a block's logs
+are decoded by gathering those hex slices and converting them with a single
+``bytes.fromhex`` call straight into a block record, instead of ABI-decoding
+and re-packing every log.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .block_store import BLOCK_HEADER, EVENT_RECORD, TransferEvent, iter_events
+
+logger = logging.getLogger(__name__)
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+# Raw log fields: tx id, topics and data, all hex without 0x
+RawLog = Tuple[str, Sequence[str], str]
+
+# Hex length of one event record
+EVENT_HEX_LENGTH = EVENT_RECORD.size * 2
+
+
+def _log_hex(tx_id: str, topics: Sequence[str], data: str) -> Optional[str]:
+    """Hex of one log in event record order, or None if its fields have the wrong shape."""
+    try:
+        data = data[:64]
+        part = (
+            tx_id.rjust(64, "0")
+            + topics[1][-40:]
+            + topics[2][-40:]
+            + (data if len(data) == 64 else data.rjust(64, "0"))
+        )
+    except (TypeError, AttributeError, IndexError):
+        return None
+    return part if len(part) == EVENT_HEX_LENGTH else None
+
+
+def encode_transfer_logs(logs: Iterable[RawLog]) -> bytes:
+    """
+    Convert the raw hex of Transfer logs into one block record.
+
+    The hex of each log is sliced in event record order (tx id, sender,
+    recipient, amount) and the whole batch is converted at once. If the
+    batch does not convert, the logs are converted one by one and malformed
+    logs (bad hex, wrong field lengths) are logged and left out, so one bad
+    log does not make the whole block fail.
+
+    Args:
+        logs: (tx id, topics, data) hex of Transfer logs
+
+    Returns:
+        Block record (see ``block_store.encode_events``)
+    """
+    logs = list(logs)
+    parts = [_log_hex(*log) for log in logs]
+    if None not in parts:
+        try:
+            record = bytes.fromhex("".join(parts))
+            # fromhex skips whitespace, which would shift the records
+            if len(record) == len(parts) * EVENT_RECORD.size:
+                return BLOCK_HEADER.pack(len(parts)) + record
+        except ValueError:
+            pass
+
+    records = []
+    for (tx_id, _, _), part in zip(logs, parts):
+        try:
+            record = bytes.fromhex(part) if part is not None else b""
+        except ValueError:
+            record = b""
+        if len(record) != EVENT_RECORD.size:
+            logger.warning(f"Skipping malformed Transfer log in transaction {tx_id}")
+            continue
+        records.append(record)
+    return BLOCK_HEADER.pack(len(records)) + b"".join(records)
+
+
+class TransferLogDecoder:
+    """Select and decode the Transfer logs of one token contract from block receipts."""
+
+    def __init__(self, contract_hex: str):
+        # 20-byte account id as hex, with or without the 0x41 prefix
+        self.contract_hex = contract_hex.lower()[-40:]
+
+    def select(self, tx_infos: List[Dict[str, Any]]) -> List[RawLog]:
+        """Raw hex of every Transfer log of the contract in successful transactions."""
+        contract_hex = self.contract_hex
+        logs = []
+        for info in tx_infos:
+            if info.get("receipt", {}).get("result", "SUCCESS") != "SUCCESS":
+                continue
+            tx_id = info.get("id")
+            for log in info.get("log", ()):
+                try:
+                    topics = log.get("topics", ())
+                    if (
+                        len(topics) < 3
+                        or topics[0] != TRANSFER_TOPIC
+                        or log.get("address", "")[-40:].lower() != contract_hex
+                        or len(topics[1]) < 40
+                        or len(topics[2]) < 40
+                    ):
+                        continue
+                except (TypeError, AttributeError):
+                    logger.warning(f"Skipping malformed log in transaction {tx_id}")
+                    continue
+                if not isinstance(tx_id, str):
+                    logger.warning("Skipping Transfer log without a transaction id")
+                    continue
+                logs.append((tx_id, topics, log.get("data") or ""))
+        return logs
+
+    def decode_record(self, tx_infos: List[Dict[str, Any]]) -> bytes:
+        """Decode a block's receipts (``get_block_transaction_info``) into a block record."""
+        return encode_transfer_logs(self.select(tx_infos))
+
+    def decode(self, tx_infos: List[Dict[str, Any]]) -> List[TransferEvent]:
+        """Decode a block's receipts into (tx_id, sender, recipient, raw amount) tuples."""
+        return [
+            (bytes(tx_id), bytes(sender), bytes(recipient), int.from_bytes(amount, "big"))
+            for tx_id, sender, recipient, amount in iter_events(memoryview(self.decode_record(tx_infos)))
+        ]
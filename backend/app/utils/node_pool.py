@@ -0,0 +1,361 @@
+"""
+Tron full node pool.
+Routes chain calls to the fastest healthy node, hedges idempotent reads
+and ejects nodes that keep failing.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError as FutureTimeoutError, wait
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from tronpy import Tron
+from tronpy.contract import Contract
+from tronpy.defaults import conf_for_name
+from tronpy.providers import HTTPProvider
+
+from ..core.config import settings
+from . import common
+from .resilience import DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+# Number of recent latency samples kept per node for percentile estimates
+LATENCY_WINDOW = 200
+
+# Smoothing factor for the exponentially weighted moving average latency
+EWMA_ALPHA = 0.3
+
+# Hedge delay used until a node has enough samples for a percentile
+DEFAULT_HEDGE_DELAY = 0.5
+MIN_SAMPLES_FOR_PERCENTILE = 20
+
+
+class TronNode:
+    """A single full node endpoint with its own client and health statistics."""
+
+    def __init__(self, endpoint_uri: str, client: Any):
+        self.endpoint_uri = endpoint_uri
+        self.client = client
+
+        self.ewma_latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.last_block: Optional[int] = None
+
+        self.total_requests = 0
+        self.total_failures = 0
+        self.hedged_wins = 0
+
+        self._samples: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._contracts: Dict[str, Contract] = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, now: Optional[float] = None) -> bool:
+        """Return True if the node is not currently ejected."""
+        return (now or time.monotonic()) >= self.ejected_until
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful call and its latency in seconds."""
+        with self._lock:
+            self.total_requests += 1
+            self.consecutive_failures = 0
+            self._samples.append(latency)
+            if self.ewma_latency is None:
+                self.ewma_latency = latency
+            else:
+                self.ewma_latency = EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma_latency
+
+    def record_failure(self, max_failures: int, eject_seconds: float) -> None:
+        """Record a failed call, ejecting the node after repeated failures."""
+        with self._lock:
+            self.total_requests += 1
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= max_failures and self.is_healthy():
+                self.ejected_until = time.monotonic() + eject_seconds
+                logger.warning(
+                    f"Ejecting Tron node {self.endpoint_uri} for {eject_seconds}s "
+                    f"after {self.consecutive_failures} consecutive failures"
+                )
+
+    def eject(self, eject_seconds: float, reason: str) -> None:
+        """Eject the node for a fixed period."""
+        with self._lock:
+            self.ejected_until = time.monotonic() + eject_seconds
+        logger.warning(f"Ejecting Tron node {self.endpoint_uri} for {eject_seconds}s: {reason}")
+
+    def readmit(self) -> None:
+        """Put an ejected node back into rotation."""
+        with self._lock:
+            if self.ejected_until:
+                logger.info(f"Tron node {self.endpoint_uri} is healthy again")
+            self.ejected_until = 0.0
+            self.consecutive_failures = 0
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Return the given latency percentile, or None without enough samples."""
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES_FOR_PERCENTILE:
+                return None
+            samples = list(self._samples)
+        return common.percentile(samples, percentile)
+
+    def contract(self, contract: Contract) -> Contract:
+        """Return a copy of ``contract`` bound to this node's client."""
+        address = str(contract.contract_address)
+        bound = self._contracts.get(address)
+        if bound is None:
+            bound = Contract(
+                addr=contract.contract_address,
+                name=contract.name,
+                abi=contract.abi,
+                client=self.client,
+            )
+            self._contracts[address] = bound
+        return bound
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the node statistics."""
+        p95 = self.latency_percentile(0.95)
+        return {
+            "endpoint": self.endpoint_uri,
+            "healthy": self.is_healthy(),
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "last_block": self.last_block,
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "hedged_wins": self.hedged_wins,
+        }
+
+
+class TronNodePool:
+    """
+    Pool of Tron full nodes with latency-aware routing.
+
+    Calls go to the healthy node with the lowest EWMA latency. Idempotent
+    reads are hedged: if the primary node has not answered within its p95
+    latency, the same call is sent to the next best node and whichever
+    answers first wins.
+    """
+
+    def __init__(
+        self,
+        nodes: List[TronNode],
+        hedge_percentile: float = 0.95,
+        max_failures: int = 3,
+        eject_seconds: float = 30,
+        max_block_lag: int = 20,
+        max_workers: int = 16,
+    ):
+        if not nodes:
+            raise ValueError("Tron node pool requires at least one node")
+
+        self.nodes = nodes
+        self.hedge_percentile = hedge_percentile
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.max_block_lag = max_block_lag
+        # Calls with a timeout (and hedged calls) run here so the caller
+        # can stop waiting; sized for every call plus one hedge each
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers * 2,
+            thread_name_prefix="tron-call",
+        )
+
+    @classmethod
+    def from_settings(cls) -> "TronNodePool":
+        """Build the pool from ``settings.tron_node_urls`` or the network default."""
+        if settings.tron_network == "fake":
+            # In-process simulated chain for load tests and benchmarks
+            from .fake_tron import FakeTronProvider, fake_injector, get_fake_chain
+
+            chain = get_fake_chain()
+            nodes = []
+            for index in range(max(1, settings.fake_tron_nodes)):
+                url = f"fake://node{index}"
+                nodes.append(TronNode(url, Tron(FakeTronProvider(chain, url, fake_injector(index)))))
+            return cls(
+                nodes,
+                hedge_percentile=settings.tron_hedge_percentile,
+                max_failures=settings.tron_node_max_failures,
+                eject_seconds=settings.tron_node_eject_seconds,
+                max_block_lag=settings.tron_node_max_block_lag,
+                max_workers=settings.tron_max_concurrent_calls,
+            )
+
+        urls = [url.strip() for url in settings.tron_node_urls.split(",") if url.strip()]
+        if not urls:
+            network = "mainnet" if settings.tron_network == "mainnet" else "shasta"
+            urls = [conf_for_name(network)["fullnode"]]
+
+        nodes = []
+        for url in urls:
+            provider = HTTPProvider(
+                url,
+                timeout=settings.tron_node_timeout,
+                api_key=settings.tron_api_key or None,
+            )
+            nodes.append(TronNode(url, Tron(provider)))
+
+        return cls(
+            nodes,
+            hedge_percentile=settings.tron_hedge_percentile,
+            max_failures=settings.tron_node_max_failures,
+            eject_seconds=settings.tron_node_eject_seconds,
+            max_block_lag=settings.tron_node_max_block_lag,
+            max_workers=settings.tron_max_concurrent_calls,
+        )
+
+    @property
+    def primary(self) -> TronNode:
+        """The node currently preferred for new calls."""
+        return self.ranked_nodes()[0]
+
+    def ranked_nodes(self) -> List[TronNode]:
+        """
+        Return nodes ordered by preference.
+
+        Healthy nodes come first, fastest first; nodes without samples yet
+        are tried early so they get measured. If every node is ejected the
+        pool fails open and returns them ordered by ejection expiry.
+        """
+        now = time.monotonic()
+        healthy = [node for node in self.nodes if node.is_healthy(now)]
+        if healthy:
+            return sorted(healthy, key=lambda node: node.ewma_latency or 0.0)
+        return sorted(self.nodes, key=lambda node: node.ejected_until)
+
+    def call(
+        self,
+        fn: Callable[[TronNode], Any],
+        idempotent: bool = False,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Run ``fn(node)`` against the best node.
+
+        Args:
+            fn: Callable receiving a TronNode and performing the chain call
+            idempotent: True for reads that may be hedged and retried on
+                another node; writes run exactly once on a single node
+            timeout: Seconds to wait for a result before giving up
+
+        Returns:
+            The value returned by ``fn``
+
+        Raises:
+            DeadlineExceededError: If no node answered within ``timeout``
+        """
+        nodes = self.ranked_nodes()
+        if idempotent and len(nodes) >= 2:
+            return self._hedged_call(nodes[0], nodes[1], fn, timeout)
+        if timeout is None:
+            return self._invoke(nodes[0], fn)
+
+        future = self._executor.submit(self._invoke, nodes[0], fn)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise DeadlineExceededError(
+                f"Tron node {nodes[0].endpoint_uri} did not answer within {timeout:.2f}s"
+            )
+
+    def _invoke(self, node: TronNode, fn: Callable[[TronNode], Any]) -> Any:
+        """Call ``fn`` on ``node`` and record the outcome."""
+        started = time.monotonic()
+        try:
+            result = fn(node)
+        except Exception:
+            node.record_failure(self.max_failures, self.eject_seconds)
+            raise
+        node.record_success(time.monotonic() - started)
+        return result
+
+    def _hedged_call(
+        self,
+        primary: TronNode,
+        secondary: TronNode,
+        fn: Callable[[TronNode], Any],
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Run on ``primary`` and hedge to ``secondary`` after the p95 latency."""
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+        hedge_delay = primary.latency_percentile(self.hedge_percentile) or DEFAULT_HEDGE_DELAY
+        if timeout is not None:
+            hedge_delay = min(hedge_delay, timeout)
+
+        primary_future = self._executor.submit(self._invoke, primary, fn)
+        done, _ = wait([primary_future], timeout=hedge_delay)
+        if done and primary_future.exception() is None:
+            return primary_future.result()
+
+        # Primary is slow or already failed - race it against the next node
+        secondary_future = self._executor.submit(self._invoke, secondary, fn)
+        owners = {primary_future: primary, secondary_future: secondary}
+        pending = {primary_future, secondary_future}
+        last_error: Optional[BaseException] = None
+
+        while pending:
+            remaining = None
+            if expires_at is not None:
+                remaining = max(0.0, expires_at - time.monotonic())
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceededError(
+                    f"No Tron node answered within {timeout:.2f}s"
+                )
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary_future:
+                        secondary.hedged_wins += 1
+                    return future.result()
+                last_error = future.exception()
+                logger.debug(f"Hedged call failed on {owners[future].endpoint_uri}: {last_error}")
+
+        raise last_error  # type: ignore[misc]
+
+    def check_health(self) -> None:
+        """
+        Probe every node with a latest-block request.
+
+        Failing nodes are ejected, recovered nodes are readmitted and nodes
+        lagging too far behind the highest observed block are ejected.
+        """
+        for node in self.nodes:
+            started = time.monotonic()
+            try:
+                node.last_block = int(node.client.get_latest_block_number())
+            except Exception as e:
+                node.record_failure(self.max_failures, self.eject_seconds)
+                logger.warning(f"Health check failed for Tron node {node.endpoint_uri}: {e}")
+                continue
+            node.record_success(time.monotonic() - started)
+            node.readmit()
+
+        heights = [node.last_block for node in self.nodes if node.last_block is not None]
+        if not heights:
+            return
+        best = max(heights)
+        for node in self.nodes:
+            if node.last_block is not None and best - node.last_block > self.max_block_lag:
+                node.eject(self.eject_seconds, f"{best - node.last_block} blocks behind")
+
+    async def run_health_checks(self, check_interval: int) -> None:
+        """Run ``check_health`` forever in a worker thread."""
+        logger.info(f"Starting Tron node health checks for {len(self.nodes)} node(s)")
+        while True:
+            try:
+                await asyncio.to_thread(self.check_health)
+            except Exception as e:
+                logger.error(f"Error in Tron node health check: {e}")
+            await asyncio.sleep(check_interval)
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Return per-node metrics for the admin system status."""
+        return [node.metrics() for node in self.nodes]
@@ -0,0 +1,204 @@
+"""
+Resilience primitives for blockchain calls.
+Provides a circuit breaker, a bulkhead and deadline propagation so a hung
+Tron node cannot exhaust the API worker threads.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Absolute monotonic time by which the current operation must finish
+_current_deadline: ContextVar[Optional[float]] = ContextVar("tron_deadline", default=None)
+
+
+class TronUnavailableError(Exception):
+    """Raised when a chain call is refused or abandoned to protect the API."""
+
+
+class CircuitOpenError(TronUnavailableError):
+    """Raised when the circuit breaker is open and calls fail fast."""
+
+
+class BulkheadFullError(TronUnavailableError):
+    """Raised when all chain call slots are busy."""
+
+
+class DeadlineExceededError(TronUnavailableError):
+    """Raised when a chain call does not finish before its deadline."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Bound everything inside the block by ``seconds``.
+
+    Nested deadlines never extend an outer one, so a multi-call operation
+    shares a single time budget across all of its chain calls.
+
+    Yields:
+        The absolute monotonic deadline in effect
+    """
+    expires_at = time.monotonic() + seconds
+    outer = _current_deadline.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+
+    token = _current_deadline.set(expires_at)
+    try:
+        yield expires_at
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Return seconds left before the current deadline.
+
+    Returns:
+        Remaining seconds, or None when no deadline is set
+
+    Raises:
+        DeadlineExceededError: If the deadline has already passed
+    """
+    expires_at = _current_deadline.get()
+    if expires_at is None:
+        return None
+    remaining = expires_at - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceededError("Deadline exceeded before chain call")
+    return remaining
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately. Once ``reset_timeout`` has passed a single probe
+    call is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.rejected_calls = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected_calls += 1
+        raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot for a call that never ran."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit when the threshold is hit."""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"Circuit '{self.name}' opened after {self.consecutive_failures} failures"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of the breaker state."""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected_calls": self.rejected_calls,
+        }
+
+
+class Bulkhead:
+    """
+    Caps the number of concurrent chain calls.
+
+    Callers wait at most ``max_wait`` seconds for a slot and are then
+    rejected, so chain calls can only occupy a bounded share of workers.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_wait: float = 0.1):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.in_use = 0
+        self.rejected_calls = 0
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Hold one slot for the duration of the block.
+
+        Raises:
+            BulkheadFullError: If no slot frees up within ``max_wait``
+        """
+        if not self._semaphore.acquire(timeout=self.max_wait):
+            with self._lock:
+                self.rejected_calls += 1
+            raise BulkheadFullError(f"Bulkhead '{self.name}' is full ({self.max_concurrent} calls)")
+        with self._lock:
+            self.in_use += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._semaphore.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of bulkhead usage."""
+        return {
+            "name": self.name,
+            "max_concurrent": self.max_concurrent,
+            "in_use": self.in_use,
+            "rejected_calls": self.rejected_calls,
+        }
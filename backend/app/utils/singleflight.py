@@ -0,0 +1,84 @@
+"""
+Request coalescing for identical concurrent calls.
+Concurrent callers asking for the same key share one in-flight call and
+its result instead of each hitting the Tron node.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _InFlightCall:
+    """A call currently being executed by a leader thread."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapse duplicate concurrent calls into one.
+
+    Keys are tuples whose first element names the operation; metrics are
+    aggregated per operation so the collapsed duplicate traffic is visible
+    without keeping one counter per transaction hash or address.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Tuple[Any, ...], fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers with the same ``key``.
+
+        Args:
+            key: Tuple of operation name followed by its arguments
+            fn: Zero-argument callable performing the call
+
+        Returns:
+            The result of the shared call; errors are re-raised to every caller
+        """
+        with self._lock:
+            stats = self._stats.setdefault(str(key[0]), {"calls": 0, "executed": 0, "shared": 0})
+            stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is None:
+                call = _InFlightCall()
+                self._calls[key] = call
+                stats["executed"] += 1
+                leader = True
+            else:
+                stats["shared"] += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-operation call, execution and collapsed counts."""
+        with self._lock:
+            return {
+                operation: dict(
+                    stats,
+                    in_flight=sum(1 for key in self._calls if str(key[0]) == operation),
+                )
+                for operation, stats in self._stats.items()
+            }
@@ -0,0 +1,312 @@
+"""
+Cost-batched consolidation of HD deposit addresses into the hot wallet.
+Balances accumulate per address from the recorded deposits; only addresses
+above a threshold are swept, once for all their deposits, in windows that
+pre-fund the transfer fees in bulk before sweeping with bounded concurrency.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from tronpy.keys import PrivateKey
+
+from ..core.config import settings
+from ..crud import crud_deposit_sweep
+from .. import models
+from .fees import RECIPIENT_EXISTING, SUN_PER_TRX, FeeEstimator
+
+logger = logging.getLogger(__name__)
+
+# Bandwidth of a plain TRX transfer (the fee pre-funding transaction)
+TRX_TRANSFER_NET = 270
+
+
+def _trx(sun: int) -> float:
+    return float(Decimal(sun) / SUN_PER_TRX)
+
+
+@dataclass
+class SweepCandidate:
+    """Unswept deposits accumulated on one HD deposit address."""
+
+    deposit_address_id: int
+    user_id: int
+    address: str
+    derivation_index: int
+    amount: Decimal
+    deposits: int
+    through_transaction_id: int
+
+
+@dataclass
+class SweepPlan:
+    """Addresses to sweep grouped into windows, plus the expected cost."""
+
+    threshold: Decimal
+    windows: List[List[SweepCandidate]] = field(default_factory=list)
+    deferred: List[SweepCandidate] = field(default_factory=list)
+    costs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def candidates(self) -> List[SweepCandidate]:
+        return [candidate for window in self.windows for candidate in window]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "threshold": float(self.threshold),
+            "addresses": len(self.candidates),
+            "deposits": sum(candidate.deposits for candidate in self.candidates),
+            "amount": float(sum((c.amount for c in self.candidates), Decimal('0'))),
+            "windows": [[candidate.address for candidate in window] for window in self.windows],
+            "deferred": {
+                "addresses": len(self.deferred),
+                "amount": float(sum((c.amount for c in self.deferred), Decimal('0'))),
+            },
+            "costs": self.costs,
+        }
+
+    def summary(self) -> str:
+        costs = self.costs
+        return (
+            f"{len(self.candidates)} addresses in {len(self.windows)} windows, "
+            f"{len(self.deferred)} below threshold; expected cost {costs.get('batched_trx', 0):.2f} TRX "
+            f"instead of {costs.get('individual_trx', 0):.2f} TRX per deposit "
+            f"(saves {costs.get('savings_trx', 0):.2f} TRX)"
+        )
+
+
+@dataclass
+class SweepReport:
+    """Outcome of executing a sweep plan."""
+
+    swept: List[int] = field(default_factory=list)
+    failed: List[int] = field(default_factory=list)
+    skipped: List[int] = field(default_factory=list)
+    amount: Decimal = Decimal('0')
+    funded_trx: Decimal = Decimal('0')
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "swept": len(self.swept),
+            "failed": len(self.failed),
+            "skipped": len(self.skipped),
+            "amount": float(self.amount),
+            "funded_trx": float(self.funded_trx),
+            "elapsed": round(self.elapsed, 3),
+        }
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.swept)} addresses swept ({self.amount} USDT), {len(self.failed)} failed, "
+            f"{len(self.skipped)} skipped; {self.funded_trx} TRX pre-funded ({self.elapsed:.1f}s)"
+        )
+
+
+class SweepPlanner:
+    """
+    Plan deposit sweeps from the unswept balances recorded per address.
+
+    The cost estimate compares sweeping every deposit on its own (a fee
+    funding transfer plus a USDT transfer each) with one sweep per address
+    for all its deposits. It assumes fees are paid by burning TRX; account
+    activation fees for never-funded addresses are not included.
+    """
+
+    def __init__(self, fee_estimator: FeeEstimator, threshold: Decimal, window_size: int = 50):
+        if window_size < 1:
+            raise ValueError("Sweep window size must be positive")
+        self.fee_estimator = fee_estimator
+        self.threshold = threshold
+        self.window_size = window_size
+
+    @classmethod
+    def from_settings(cls, fee_estimator: FeeEstimator) -> "SweepPlanner":
+        return cls(
+            fee_estimator,
+            threshold=Decimal(str(settings.sweep_threshold)),
+            window_size=settings.sweep_window_size
+        )
+
+    def plan(self, db: Session, limit: Optional[int] = None) -> SweepPlan:
+        """
+        Plan sweeps for every address at or above the threshold.
+
+        Args:
+            db: Database session
+            limit: Maximum number of addresses considered (largest first)
+
+        Returns:
+            Sweep plan with windows, deferred addresses and cost estimate
+        """
+        plan = SweepPlan(threshold=self.threshold)
+        ready = []
+        for address, amount, deposits, through_id in crud_deposit_sweep.get_unswept(db, limit=limit):
+            candidate = SweepCandidate(
+                deposit_address_id=int(address.id),  # type: ignore
+                user_id=int(address.user_id),  # type: ignore
+                address=str(address.address),
+                derivation_index=int(address.derivation_index),  # type: ignore
+                amount=amount,
+                deposits=deposits,
+                through_transaction_id=through_id
+            )
+            (ready if amount >= self.threshold else plan.deferred).append(candidate)
+
+        plan.windows = [ready[i:i + self.window_size] for i in range(0, len(ready), self.window_size)]
+        plan.costs = self.estimate(plan)
+        return plan
+
+    def estimate(self, plan: SweepPlan) -> Dict[str, Any]:
+        """Expected TRX cost of the plan versus sweeping each deposit individually."""
+        # The hot wallet already holds USDT, so every sweep is an existing-holder transfer
+        sweep_burn = self.fee_estimator.expected_burn(RECIPIENT_EXISTING)
+        funding_burn = TRX_TRANSFER_NET * self.fee_estimator.bandwidth_price
+        per_sweep = sweep_burn + funding_burn
+
+        deposits = sum(candidate.deposits for candidate in plan.candidates)
+        individual = deposits * per_sweep
+        batched = len(plan.candidates) * per_sweep
+        fee_limit = self.fee_estimator.fee_limit(RECIPIENT_EXISTING)
+        return {
+            "per_sweep_trx": _trx(per_sweep),
+            "individual_trx": _trx(individual),
+            "batched_trx": _trx(batched),
+            "savings_trx": _trx(individual - batched),
+            "savings_pct": round(100.0 * (individual - batched) / individual, 1) if individual else 0.0,
+            "transactions_saved": 2 * (deposits - len(plan.candidates)),
+            "prefund_trx_per_window": [_trx(len(window) * fee_limit) for window in plan.windows],
+        }
+
+
+class SweepExecutor:
+    """
+    Execute a sweep plan window by window.
+
+    Each window reads the on-chain balances, tops up every address's TRX
+    to one transfer's fee_limit from the company wallet, waits for the
+    funding to land and then sweeps the whole on-chain USDT balance to the
+    destination. Broadcasts within a window run ``concurrency`` at a time.
+    """
+
+    def __init__(
+        self,
+        tron_service: Any,
+        signer: Callable[[int], PrivateKey],
+        destination: str,
+        threshold: Decimal,
+        concurrency: int = 4,
+        funding_wait: float = 6.0
+    ):
+        self.tron_service = tron_service
+        self.signer = signer
+        self.destination = destination
+        self.threshold = threshold
+        self.concurrency = max(1, concurrency)
+        self.funding_wait = funding_wait
+
+    def _map(self, fn: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(items))) as executor:
+            return list(executor.map(fn, items))
+
+    def _balance(self, candidate: SweepCandidate) -> Optional[Dict[str, Decimal]]:
+        try:
+            return self.tron_service.fetch_account_balance(candidate.address)
+        except Exception as e:
+            logger.error(f"Could not read balance of {candidate.address}: {e}")
+            return None
+
+    def _sweep(self, job: Tuple[SweepCandidate, Decimal, int]) -> Tuple[Optional[str], Optional[str]]:
+        candidate, amount, fee_limit = job
+        try:
+            key = self.signer(candidate.derivation_index)
+        except Exception as e:
+            return None, f"Key derivation failed: {e}"
+        if key.public_key.to_base58check_address() != candidate.address:
+            return None, "Derived key does not match the deposit address"
+        tx_id = self.tron_service.send_usdt_from(key, self.destination, amount, fee_limit)
+        return tx_id, None if tx_id else "USDT transfer was not broadcast"
+
+    def _record(
+        self,
+        db: Session,
+        report: SweepReport,
+        candidate: SweepCandidate,
+        amount: Decimal,
+        funded: Decimal,
+        funding_tx_id: Optional[str],
+        tx_id: Optional[str],
+        error: Optional[str]
+    ) -> None:
+        crud_deposit_sweep.create(db, {
+            "deposit_address_id": candidate.deposit_address_id,
+            "address": candidate.address,
+            "amount": amount,
+            "through_transaction_id": candidate.through_transaction_id,
+            "funded_trx": funded,
+            "funding_tx_id": funding_tx_id,
+            "ref_tx_id": tx_id,
+            "status": models.TransactionStatus.COMPLETED if tx_id else models.TransactionStatus.FAILED,
+            "error": error,
+        })
+        report.funded_trx += funded
+        if tx_id:
+            report.swept.append(candidate.deposit_address_id)
+            report.amount += amount
+        else:
+            report.failed.append(candidate.deposit_address_id)
+
+    def execute(self, db: Session, plan: SweepPlan) -> SweepReport:
+        """
+        Fund and sweep every window of a plan.
+
+        Args:
+            db: Database session
+            plan: Plan produced by ``SweepPlanner.plan``
+
+        Returns:
+            Report of swept, failed and skipped addresses
+        """
+        started = time.monotonic()
+        report = SweepReport()
+        fee_limit = self.tron_service.fee_estimator.fee_limit(RECIPIENT_EXISTING)
+        needed_trx = Decimal(fee_limit) / SUN_PER_TRX
+
+        for number, window in enumerate(plan.windows, start=1):
+            ready: List[Tuple[SweepCandidate, Decimal, Decimal]] = []
+            for candidate, balance in zip(window, self._map(self._balance, window)):
+                # Sweep what is actually on-chain, not the recorded sum
+                if balance is None or balance["USDT"] < self.threshold:
+                    report.skipped.append(candidate.deposit_address_id)
+                    continue
+                ready.append((candidate, balance["USDT"], max(needed_trx - balance["TRX"], Decimal('0'))))
+
+            # Pre-fund the whole window before any sweep, so one wait covers it
+            funding = self._map(
+                lambda item: self.tron_service.send_trx(item[0].address, item[2]) if item[2] > 0 else "",
+                ready
+            )
+            to_sweep = []
+            for (candidate, amount, top_up), funding_tx_id in zip(ready, funding):
+                if funding_tx_id is None:
+                    self._record(db, report, candidate, amount, Decimal('0'), None, None, "TRX funding was not broadcast")
+                else:
+                    to_sweep.append((candidate, amount, top_up, funding_tx_id or None))
+            if any(top_up > 0 for _, _, top_up, _ in to_sweep):
+                time.sleep(self.funding_wait)
+
+            results = self._map(self._sweep, [(candidate, amount, fee_limit) for candidate, amount, _, _ in to_sweep])
+            for (candidate, amount, top_up, funding_tx_id), (tx_id, error) in zip(to_sweep, results):
+                self._record(db, report, candidate, amount, top_up, funding_tx_id, tx_id, error)
+            logger.info(f"Sweep window {number}/{len(plan.windows)}: {len(to_sweep)} addresses swept or attempted")
+
+        report.elapsed = time.monotonic() - started
+        logger.info(f"Deposit sweep: {report.summary()}")
+        return report
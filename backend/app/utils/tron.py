@@ -5,16 +5,27 @@ Handles USDT TRC20 deposits, withdrawals, and balance monitoring.
 
 import asyncio
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from decimal import Decimal
 from datetime import datetime, timedelta
+import threading
 import time
+from concurrent.futures import Future
 
-from tronpy import Tron
-from tronpy.exceptions import TransactionError, ApiError, ValidationError
+from tronpy.exceptions import (
+    TransactionError, ApiError, ValidationError, BadAddress, TransactionNotFound, AddressNotFound
+)
 from tronpy.keys import PrivateKey
 
 from ..core.config import settings
+from .node_pool import TronNode, TronNodePool
+from .resilience import Bulkhead, BulkheadFullError, CircuitBreaker, TronUnavailableError, deadline, remaining_time
+from .singleflight import SingleFlight
+from .trongrid import TronGridClient
+from .address import is_valid_address
+from .batch_sender import BatchSender, BatchSendResult, TransferItem
+from .contracts import load_contract
+from .fees import FeeEstimator
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -25,26 +36,102 @@ USDT_CONTRACT_ADDRESS = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
 # Minimum confirmations required for deposits
 MIN_CONFIRMATIONS = 12
 
+# Errors caused by the request itself rather than node health; these do not
+# count towards the circuit breaker
+CALLER_ERRORS = (ValidationError, TransactionError, BadAddress, TransactionNotFound, AddressNotFound)
+
+
+class BroadcastUnknownError(Exception):
+    """
+    Raised when a signed transaction may or may not have reached the network.
+
+    The broadcast timed out or its connection failed after signing, so the
+    transfer must be reconciled by ``txid`` instead of being retried.
+    """
+
+    def __init__(self, txid: str, message: str):
+        super().__init__(message)
+        self.txid = txid
+
+
+class BlockHeightCache:
+    """
+    Latest block height shared by every status check in this worker.
+    
+    The height is refreshed in the background (or fed by the deposit
+    scanner) and only served while it is younger than ``max_staleness``.
+    """
+    
+    def __init__(self, max_staleness: float):
+        self.max_staleness = max_staleness
+        self.height: Optional[int] = None
+        self.updated_at = 0.0
+        self._lock = threading.Lock()
+    
+    def update(self, height: int) -> None:
+        """Record a freshly observed block height."""
+        with self._lock:
+            if self.height is None or height >= self.height:
+                self.height = height
+            self.updated_at = time.monotonic()
+    
+    def get(self) -> Optional[int]:
+        """Return the cached height, or None if it is missing or stale."""
+        with self._lock:
+            if self.height is None or time.monotonic() - self.updated_at > self.max_staleness:
+                return None
+            return self.height
+    
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last update, or None if never updated."""
+        if self.height is None:
+            return None
+        return time.monotonic() - self.updated_at
+
 
 class TronService:
     """Service for Tron blockchain operations."""
     
     def __init__(self):
         """Initialize Tron service with network configuration."""
-        if settings.tron_network == "mainnet":
-            self.client = Tron()
-        else:
-            # For testnet (Shasta)
-            self.client = Tron(network='shasta')
+        # Node pool (mainnet or Shasta testnet defaults unless nodes are configured)
+        self.node_pool = TronNodePool.from_settings()
+        self.client = self.node_pool.primary.client
+        
+        # Fail fast while nodes are unhealthy and cap concurrent chain calls
+        self.circuit_breaker = CircuitBreaker(
+            "tron",
+            failure_threshold=settings.tron_circuit_failure_threshold,
+            reset_timeout=settings.tron_circuit_reset_seconds
+        )
+        self.bulkhead = Bulkhead(
+            "tron",
+            max_concurrent=settings.tron_max_concurrent_calls,
+            max_wait=settings.tron_bulkhead_wait_seconds
+        )
+        
+        # Latest block height shared across status checks
+        self.block_height = BlockHeightCache(settings.block_height_max_staleness)
+        
+        # Identical concurrent reads share one node call
+        self.single_flight = SingleFlight()
+        
+        # TRC20 transfer history comes from the TronGrid HTTP API
+        self.grid_client = TronGridClient.from_settings()
         
         # Setup USDT contract
-        if settings.tron_network == "mainnet":
-            self.usdt_contract = self.client.get_contract(USDT_CONTRACT_ADDRESS)
+        if settings.tron_network in ("mainnet", "fake"):
+            # ABI comes from the disk cache after the first start
+            self.usdt_contract = load_contract(self.client, USDT_CONTRACT_ADDRESS, settings.contract_abi_cache_dir)
         else:
             # For testnet, you need to deploy or use a test USDT contract
             # This is a placeholder - replace with actual testnet contract
             self.usdt_contract = None
         
+        # fee_limit sized from chain prices and observed receipts
+        self.fee_estimator = FeeEstimator.from_settings(self)
+        
         # Company wallet setup
         if settings.company_wallet_private_key:
             try:
@@ -59,6 +146,44 @@ class TronService:
             self.company_wallet = None
             self.company_address = settings.company_wallet_address
     
+    def _call(
+        self,
+        fn: Callable[[TronNode], Any],
+        timeout: float,
+        idempotent: bool = False
+    ) -> Any:
+        """
+        Run a chain call behind the circuit breaker, bulkhead and deadline.
+        
+        Args:
+            fn: Callable receiving a TronNode and performing the chain call
+            timeout: Per-operation deadline in seconds; an enclosing
+                ``deadline()`` block can only shorten it
+            idempotent: True for reads that may be hedged across nodes
+            
+        Returns:
+            The value returned by ``fn``
+            
+        Raises:
+            TronUnavailableError: If the call is rejected or times out
+        """
+        self.circuit_breaker.before_call()
+        try:
+            with self.bulkhead.slot(), deadline(timeout):
+                result = self.node_pool.call(fn, idempotent=idempotent, timeout=remaining_time())
+        except BulkheadFullError:
+            # Rejected locally - says nothing about node health
+            self.circuit_breaker.release()
+            raise
+        except CALLER_ERRORS:
+            self.circuit_breaker.record_success()
+            raise
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+        return result
+    
     def get_account_balance(self, address: str) -> Dict[str, Decimal]:
         """
         Get TRX and USDT balance for an address.
@@ -67,31 +192,59 @@ class TronService:
             address: Tron wallet address
             
         Returns:
-            Dict containing TRX and USDT balances
+            Dict containing TRX and USDT balances (zero on failure)
         """
         try:
-            # Get TRX balance
-            trx_balance = self.client.get_account_balance(address)
-            trx_balance_decimal = Decimal(str(trx_balance)) / Decimal('1000000')  # TRX has 6 decimals
-            
-            # Get USDT balance
-            usdt_balance_decimal = Decimal('0')
-            if self.usdt_contract:
-                try:
-                    usdt_balance = self.usdt_contract.functions.balanceOf(address)
-                    usdt_balance_decimal = Decimal(str(usdt_balance)) / Decimal('1000000')  # USDT has 6 decimals
-                except Exception as e:
-                    logger.warning(f"Failed to get USDT balance for {address}: {e}")
-            
-            return {
-                "TRX": trx_balance_decimal,
-                "USDT": usdt_balance_decimal
-            }
-            
+            return self.fetch_account_balance(address)
         except Exception as e:
             logger.error(f"Failed to get balance for {address}: {e}")
             return {"TRX": Decimal('0'), "USDT": Decimal('0')}
     
+    def fetch_account_balance(self, address: str) -> Dict[str, Decimal]:
+        """
+        Fetch TRX and USDT balance for an address, raising on failure.
+        
+        Concurrent requests for the same address share one lookup.
+        
+        Args:
+            address: Tron wallet address
+            
+        Returns:
+            Dict containing TRX and USDT balances
+        """
+        return self.single_flight.do(
+            ("get_account_balance", address),
+            lambda: self._fetch_account_balance(address)
+        )
+    
+    def _fetch_account_balance(self, address: str) -> Dict[str, Decimal]:
+        """Fetch TRX and USDT balance for an address from the node."""
+        # Get TRX balance (tronpy already converts SUN to TRX)
+        try:
+            trx_balance = self._call(
+                lambda node: node.client.get_account_balance(address),
+                timeout=settings.tron_read_timeout,
+                idempotent=True
+            )
+        except AddressNotFound:
+            # Account not activated on-chain yet
+            trx_balance = Decimal('0')
+        
+        # Get USDT balance
+        usdt_balance_decimal = Decimal('0')
+        if self.usdt_contract:
+            usdt_balance = self._call(
+                lambda node: node.contract(self.usdt_contract).functions.balanceOf(address),
+                timeout=settings.tron_read_timeout,
+                idempotent=True
+            )
+            usdt_balance_decimal = Decimal(str(usdt_balance)) / Decimal('1000000')  # USDT has 6 decimals
+        
+        return {
+            "TRX": Decimal(str(trx_balance)),
+            "USDT": usdt_balance_decimal
+        }
+    
     def send_usdt(
         self, 
         to_address: str, 
@@ -107,26 +260,50 @@ class TronService:
             memo: Optional transaction memo
             
         Returns:
-            Transaction hash if successful, None otherwise
+            Transaction hash if successful, None if nothing was broadcast
+            
+        Raises:
+            BroadcastUnknownError: If the broadcast timed out or lost its
+                connection after signing; the transfer may still land
         """
         if not self.company_wallet or not self.usdt_contract:
             logger.error("Company wallet or USDT contract not initialized")
             return None
         
+        # Signed txid, and whether the caller stopped waiting before broadcast
+        state: Dict[str, Any] = {"txid": None, "abandoned": False}
+        state_lock = threading.Lock()
+        
         try:
             # Convert amount to contract units (6 decimals for USDT)
             amount_units = int(amount * Decimal('1000000'))
+            fee_limit = self.fee_estimator.fee_limit(self.fee_estimator.recipient_type(to_address))
             
-            # Build transaction
-            txn = (
-                self.usdt_contract.functions.transfer(to_address, amount_units)
-                .with_owner(self.company_address)
-                .fee_limit(100_000_000)  # 100 TRX fee limit
-            )
+            def build_and_broadcast(node):
+                # Build, sign and broadcast on the same node
+                txn = (
+                    node.contract(self.usdt_contract).functions.transfer(to_address, amount_units)
+                    .with_owner(self.company_address)
+                    .fee_limit(fee_limit)
+                )
+                txn = txn.build().sign(self.company_wallet)
+                with state_lock:
+                    # A call the caller gave up on must not broadcast an unknown txid
+                    if state["abandoned"]:
+                        raise TronUnavailableError("Send abandoned before broadcast")
+                    state["txid"] = txn.txid
+                return txn.broadcast()
             
-            # Sign and broadcast transaction
-            txn = txn.build().sign(self.company_wallet)
-            result = txn.broadcast()
+            try:
+                result = self._call(build_and_broadcast, timeout=settings.tron_broadcast_timeout)
+            except (TronUnavailableError, OSError) as e:
+                with state_lock:
+                    state["abandoned"] = True
+                    txid = state["txid"]
+                if txid:
+                    logger.warning(f"USDT transfer {txid} outcome unknown: {e}")
+                    raise BroadcastUnknownError(txid, f"Broadcast outcome unknown: {e}") from e
+                raise
             
             if result and 'txid' in result:
                 tx_hash = result['txid']
@@ -136,10 +313,114 @@ class TronService:
                 logger.error(f"USDT transfer failed: {result}")
                 return None
                 
+        except BroadcastUnknownError:
+            raise
         except Exception as e:
             logger.error(f"Failed to send USDT: {e}")
             return None
     
+    def send_trx(self, to_address: str, amount: Decimal) -> Optional[str]:
+        """
+        Send TRX from the company wallet (e.g. to pre-fund transfer fees).
+        
+        Args:
+            to_address: Destination Tron address
+            amount: Amount of TRX to send
+            
+        Returns:
+            Transaction hash if successful, None otherwise
+        """
+        if not self.company_wallet:
+            logger.error("Company wallet not initialized")
+            return None
+        
+        try:
+            amount_sun = int(amount * Decimal('1000000'))
+            
+            def build_and_broadcast(node):
+                txn = node.client.trx.transfer(self.company_address, to_address, amount_sun).build()
+                return txn.sign(self.company_wallet).broadcast()
+            
+            result = self._call(build_and_broadcast, timeout=settings.tron_broadcast_timeout)
+            if result and 'txid' in result:
+                return result['txid']
+            logger.error(f"TRX transfer failed: {result}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to send TRX: {e}")
+            return None
+    
+    def send_usdt_from(
+        self,
+        private_key: PrivateKey,
+        to_address: str,
+        amount: Decimal,
+        fee_limit: int
+    ) -> Optional[str]:
+        """
+        Send USDT from an address other than the company wallet (e.g. a deposit address).
+        
+        Args:
+            private_key: Key of the sending address, which pays the fees
+            to_address: Destination Tron address
+            amount: Amount of USDT to send
+            fee_limit: fee_limit in SUN
+            
+        Returns:
+            Transaction hash if successful, None otherwise
+        """
+        if not self.usdt_contract:
+            logger.error("USDT contract not initialized")
+            return None
+        
+        owner = private_key.public_key.to_base58check_address()
+        try:
+            amount_units = int(amount * Decimal('1000000'))
+            
+            def build_and_broadcast(node):
+                txn = (
+                    node.contract(self.usdt_contract).functions.transfer(to_address, amount_units)
+                    .with_owner(owner)
+                    .fee_limit(fee_limit)
+                )
+                return txn.build().sign(private_key).broadcast()
+            
+            result = self._call(build_and_broadcast, timeout=settings.tron_broadcast_timeout)
+            if result and 'txid' in result:
+                return result['txid']
+            logger.error(f"USDT transfer from {owner} failed: {result}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to send USDT from {owner}: {e}")
+            return None
+    
+    def send_usdt_batch(
+        self,
+        transfers: List[TransferItem],
+        concurrency: int = 4
+    ) -> BatchSendResult:
+        """
+        Send many USDT transfers as one batch.
+        
+        All transactions share one reference block and are signed locally;
+        only the broadcasts reach the node, ``concurrency`` at a time. Each
+        transfer's fee_limit comes from the fee estimator.
+        
+        Args:
+            transfers: Transfers to send
+            concurrency: Maximum concurrent broadcasts
+            
+        Returns:
+            Per-transfer txids and errors
+        """
+        sender = BatchSender(
+            self,
+            concurrency=concurrency,
+            sign_processes=settings.tron_sign_processes,
+            fee_estimator=self.fee_estimator
+        )
+        return sender.send(transfers)
+    
     def get_usdt_transactions(
         self, 
         address: str, 
@@ -162,56 +443,155 @@ class TronService:
             return []
         
         try:
-            # Get TRC20 transfers for USDT contract
-            # This is a simplified implementation - in production you might want to use
-            # TronGrid API or TronScan API for more detailed transaction history
-            
-            transactions = []
-            
-            # Note: tronpy doesn't have built-in TRC20 transaction history
-            # You would typically use TronGrid API for this:
-            # GET https://api.trongrid.io/v1/accounts/{address}/transactions/trc20
-            
-            # For now, return empty list - implement with TronGrid API in production
-            logger.info(f"Fetching USDT transactions for {address} (limit: {limit})")
-            
+            transactions, _ = self.grid_client.get_trc20_transfers(
+                address,
+                USDT_CONTRACT_ADDRESS,
+                min_timestamp=start_timestamp or 0,
+                limit=limit
+            )
             return transactions
             
         except Exception as e:
             logger.error(f"Failed to get USDT transactions for {address}: {e}")
             return []
     
-    def check_transaction_status(self, tx_hash: str) -> Dict[str, Any]:
+    def get_latest_block_number(self) -> int:
+        """
+        Get the latest block number, served from the shared cache when fresh.
+        
+        Returns:
+            Latest block number
+        """
+        height = self.block_height.get()
+        if height is not None:
+            return height
+        return self.refresh_block_height()
+    
+    def refresh_block_height(self) -> int:
+        """
+        Fetch the latest block number from the node and update the cache.
+        
+        Returns:
+            Latest block number
+        """
+        def fetch() -> int:
+            height = int(self._call(
+                lambda node: node.client.get_latest_block_number(),
+                timeout=settings.tron_read_timeout,
+                idempotent=True
+            ))
+            self.block_height.update(height)
+            return height
+        
+        return self.single_flight.do(("get_latest_block_number",), fetch)
+    
+    def get_block_transaction_info(self, block_number: int) -> List[Dict[str, Any]]:
+        """
+        Get receipts (including event logs) of every transaction in a block.
+        
+        Args:
+            block_number: Block number
+            
+        Returns:
+            List of transaction info dictionaries (empty for an empty block)
+        """
+        result = self._call(
+            lambda node: node.client.provider.make_request(
+                "wallet/gettransactioninfobyblocknum", {"num": block_number}
+            ),
+            timeout=settings.tron_read_timeout,
+            idempotent=True
+        )
+        # Nodes answer an empty block with {} instead of []
+        return result if isinstance(result, list) else []
+    
+    def get_block_header(self, block_number: int) -> Dict[str, Any]:
+        """
+        Get the ID and parent ID of a block.
+        
+        Args:
+            block_number: Block number
+            
+        Returns:
+            Dictionary with number, hash, parent_hash and timestamp
+        """
+        def fetch(node: TronNode) -> Dict[str, Any]:
+            provider = node.client.provider
+            # Header-only lookup; nodes without wallet/getblock return the full block
+            block = provider.make_request("wallet/getblock", {"id_or_num": str(block_number), "detail": False})
+            if "blockID" not in block:
+                block = provider.make_request("wallet/getblockbynum", {"num": block_number})
+            return block
+        
+        block = self._call(fetch, timeout=settings.tron_read_timeout, idempotent=True)
+        raw_data = block["block_header"]["raw_data"]
+        return {
+            "number": int(raw_data.get("number", block_number)),
+            "hash": block["blockID"],
+            "parent_hash": raw_data["parentHash"],
+            "timestamp": int(raw_data.get("timestamp", 0)),
+        }
+    
+    def check_transaction_status(
+        self,
+        tx_hash: str,
+        current_block: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Check transaction status and confirmations.
         
         Args:
             tx_hash: Transaction hash
+            current_block: Block height to count confirmations against; pass
+                the same value for every hash in a batch so results agree
             
         Returns:
             Dictionary with transaction status information
         """
+        return self.single_flight.do(
+            ("check_transaction_status", tx_hash, current_block),
+            lambda: self._fetch_transaction_status(tx_hash, current_block)
+        )
+    
+    def _fetch_transaction_status(
+        self,
+        tx_hash: str,
+        current_block: Optional[int]
+    ) -> Dict[str, Any]:
+        """Look up a transaction on the node and compute its confirmations."""
         try:
-            # Get transaction info
-            tx_info = self.client.get_transaction(tx_hash)
-            
-            if not tx_info:
-                return {
-                    "exists": False,
-                    "confirmed": False,
-                    "confirmations": 0,
-                    "success": False
-                }
+            # Both lookups share one read deadline
+            with deadline(settings.tron_read_timeout):
+                # Get transaction receipt info (includes block number)
+                try:
+                    tx_info = self._call(
+                        lambda node: node.client.get_transaction_info(tx_hash),
+                        timeout=settings.tron_read_timeout,
+                        idempotent=True
+                    )
+                except TransactionNotFound:
+                    tx_info = None
+                
+                if not tx_info:
+                    return {
+                        "exists": False,
+                        "confirmed": False,
+                        "confirmations": 0,
+                        "success": False
+                    }
+                
+                # Check if transaction is confirmed
+                if current_block is None:
+                    current_block = self.get_latest_block_number()
             
-            # Check if transaction is confirmed
-            current_block = self.client.get_latest_block_number()
             tx_block = tx_info.get('blockNumber', 0)
             
-            confirmations = current_block - tx_block if tx_block > 0 else 0
+            confirmations = max(0, current_block - tx_block) if tx_block > 0 else 0
             is_confirmed = confirmations >= MIN_CONFIRMATIONS
             
             # Check transaction result
-            is_success = tx_info.get('receipt', {}).get('result') == 'SUCCESS'
+            receipt = tx_info.get('receipt', {})
+            is_success = receipt.get('result') == 'SUCCESS'
             
             return {
                 "exists": True,
@@ -220,8 +600,8 @@ class TronService:
                 "success": is_success,
                 "block_number": tx_block,
                 "timestamp": tx_info.get('blockTimeStamp', 0),
-                "energy_used": tx_info.get('receipt', {}).get('energy_used', 0),
-                "net_used": tx_info.get('receipt', {}).get('net_used', 0)
+                "energy_used": receipt.get('energy_usage_total', 0),
+                "net_used": receipt.get('net_usage', 0)
             }
             
         except Exception as e:
@@ -265,18 +645,7 @@ class TronService:
         Returns:
             True if address is valid, False otherwise
         """
-        try:
-            # Basic validation - Tron addresses start with 'T' and are 34 characters
-            if not address.startswith('T') or len(address) != 34:
-                return False
-            
-            # Try to decode the address
-            from tronpy.keys import to_hex_address
-            to_hex_address(address)
-            return True
-            
-        except Exception:
-            return False
+        return is_valid_address(address)
     
     async def monitor_deposits(
         self, 
@@ -321,12 +690,77 @@ class TronService:
                 await asyncio.sleep(check_interval)
 
 
-# Global Tron service instance (지연 초기화)
+# Global Tron service instance (시작 시 백그라운드에서 초기화)
 tron_service = None
+_service_future: Optional[Future] = None
+_service_lock = threading.Lock()
+
+def get_tron_service() -> TronService:
+    """
+    Tron 서비스 인스턴스를 반환합니다.
+    
+    초기화는 한 스레드만 수행하고, 그동안 도착한 요청은 같은 준비 Future를 기다립니다.
+    """
+    global tron_service, _service_future
+    if tron_service is not None:
+        return tron_service
+    
+    with _service_lock:
+        if tron_service is not None:
+            return tron_service
+        future = _service_future
+        leader = future is None
+        if leader:
+            future = _service_future = Future()
+    
+    if not leader:
+        return future.result(timeout=settings.tron_warmup_timeout)  # type: ignore
+    
+    try:
+        service = TronService()
+    except BaseException as e:
+        with _service_lock:
+            # 다음 호출에서 다시 시도할 수 있도록 초기화
+            _service_future = None
+        future.set_exception(e)  # type: ignore
+        raise
+    tron_service = service
+    future.set_result(service)  # type: ignore
+    return service
+
 
-def get_tron_service():
-    """Tron 서비스 인스턴스를 반환합니다 (지연 초기화)."""
-    global tron_service
-    if tron_service is None:
-        tron_service = TronService()
-    return tron_service
+async def warm_up_tron_service(retry_interval: float = 5.0) -> None:
+    """시작 시 Tron 서비스를 미리 초기화하여 첫 요청의 지연을 없앱니다."""
+    while True:
+        try:
+            started = time.monotonic()
+            await asyncio.to_thread(get_tron_service)
+            logger.info(f"Tron service ready ({time.monotonic() - started:.2f}s)")
+            return
+        except Exception as e:
+            logger.error(f"Tron service warm-up failed, retrying: {e}")
+            await asyncio.sleep(retry_interval)
+
+
+async def run_node_health_checks(check_interval: int) -> None:
+    """Tron 노드 풀 헬스 체크를 백그라운드에서 실행합니다."""
+    while True:
+        try:
+            service = await asyncio.to_thread(get_tron_service)
+            break
+        except Exception as e:
+            logger.error(f"Tron service unavailable, retrying node health checks: {e}")
+            await asyncio.sleep(check_interval)
+    await service.node_pool.run_health_checks(check_interval)
+
+
+async def run_block_height_refresher(refresh_interval: float) -> None:
+    """최신 블록 높이 캐시를 주기적으로 갱신합니다."""
+    logger.info(f"Starting block height refresher (every {refresh_interval}s)")
+    while True:
+        try:
+            service = await asyncio.to_thread(get_tron_service)
+            await asyncio.to_thread(service.refresh_block_height)
+        except Exception as e:
+            logger.error(f"Error refreshing block height: {e}")
+        await asyncio.sleep(refresh_interval)
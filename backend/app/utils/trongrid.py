@@ -0,0 +1,142 @@
+"""
+TronGrid HTTP API client.
+Pages through TRC20 transfer history with TronGrid fingerprint cursors.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 네트워크별 기본 TronGrid 엔드포인트
+TRONGRID_URLS = {
+    "mainnet": "https://api.trongrid.io",
+    "shasta": "https://api.shasta.trongrid.io",
+    "testnet": "https://api.shasta.trongrid.io",
+    "nile": "https://nile.trongrid.io",
+}
+
+# TronGrid page size upper bound
+MAX_PAGE_SIZE = 200
+
+
+class TronGridError(Exception):
+    """Raised when TronGrid returns an error or an unexpected payload."""
+
+
+class TronGridClient:
+    """
+    Minimal TronGrid client for TRC20 transfer history.
+
+    Transfers are requested oldest first so a page fingerprint plus the
+    newest timestamp seen is enough to resume indexing after a restart.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        timeout: float = 10.0,
+        page_size: int = MAX_PAGE_SIZE,
+        transport: Optional[httpx.BaseTransport] = None
+    ):
+        headers = {"Accept": "application/json"}
+        if api_key:
+            headers["TRON-PRO-API-KEY"] = api_key
+        self.base_url = base_url.rstrip("/")
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        # One pooled client so pages reuse the same keep-alive connection
+        self._client = httpx.Client(base_url=self.base_url, headers=headers, timeout=timeout, transport=transport)
+
+    @classmethod
+    def from_settings(cls) -> "TronGridClient":
+        """Build a client for the configured network."""
+        transport = None
+        if settings.tron_network == "fake":
+            from .fake_tron import fake_injector, get_fake_chain, trongrid_transport
+            transport = trongrid_transport(get_fake_chain(), fake_injector(settings.fake_tron_nodes))
+        base_url = settings.tron_grid_url or TRONGRID_URLS.get(settings.tron_network, TRONGRID_URLS["mainnet"])
+        return cls(
+            base_url,
+            api_key=settings.tron_api_key,
+            timeout=settings.tron_node_timeout,
+            page_size=settings.deposit_indexer_page_size,
+            transport=transport
+        )
+
+    def close(self) -> None:
+        """Close pooled HTTP connections."""
+        self._client.close()
+
+    def get_trc20_transfers(
+        self,
+        address: str,
+        contract_address: str,
+        min_timestamp: int = 0,
+        fingerprint: Optional[str] = None,
+        limit: Optional[int] = None,
+        only_to: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch one page of confirmed TRC20 transfers for an address.
+
+        Args:
+            address: Account address
+            contract_address: TRC20 contract to filter on
+            min_timestamp: Lower timestamp bound, inclusive (Unix ms)
+            fingerprint: Fingerprint of the page to fetch, from the previous page
+            limit: Page size (defaults to the client page size)
+            only_to: Only return incoming transfers
+
+        Returns:
+            Tuple of (normalized transfers, fingerprint of the next page or None)
+
+        Raises:
+            TronGridError: If the request fails or the response is malformed
+        """
+        params: Dict[str, Any] = {
+            "limit": min(limit or self.page_size, MAX_PAGE_SIZE),
+            "contract_address": contract_address,
+            "only_confirmed": "true",
+            "order_by": "block_timestamp,asc",
+        }
+        if only_to:
+            params["only_to"] = "true"
+        if min_timestamp:
+            params["min_timestamp"] = min_timestamp
+        if fingerprint:
+            params["fingerprint"] = fingerprint
+
+        try:
+            response = self._client.get(f"/v1/accounts/{address}/transactions/trc20", params=params)
+            response.raise_for_status()
+            payload = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise TronGridError(f"TronGrid request failed for {address}: {e}") from e
+
+        if not payload.get("success", False):
+            raise TronGridError(f"TronGrid returned an error for {address}: {payload.get('error')}")
+
+        transfers = [self._normalize(item) for item in payload.get("data", [])]
+        next_fingerprint = (payload.get("meta") or {}).get("fingerprint")
+        return transfers, next_fingerprint
+
+    @staticmethod
+    def _normalize(item: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a TronGrid transfer record into the service's transfer format."""
+        token_info = item.get("token_info") or {}
+        decimals = int(token_info.get("decimals", 6))
+        return {
+            "tx_id": item["transaction_id"],
+            "from": item.get("from"),
+            "to": item.get("to"),
+            "amount": Decimal(item.get("value", "0")).scaleb(-decimals),
+            "timestamp": int(item.get("block_timestamp", 0)),
+            "contract_address": token_info.get("address"),
+            "type": item.get("type", "Transfer"),
+        }
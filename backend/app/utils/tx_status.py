@@ -0,0 +1,107 @@
+"""
+Transaction status lookup with a finalized-transaction cache.
+Finalized receipts are served from an in-process LRU backed by the
+database; only unfinalized hashes are sent to the Tron node.
+"""
+
+import logging
+from typing import Any, Dict
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..crud import crud_finalized_transaction, crud_withdrawal_job
+from .. import models
+from .cache import LRUCache
+from .tron import MIN_CONFIRMATIONS, get_tron_service
+
+logger = logging.getLogger(__name__)
+
+# Finalized receipts never change, so entries are never invalidated
+finalized_status_cache = LRUCache(settings.tx_status_cache_size)
+
+
+def _finalized_status(finalized: models.FinalizedTransaction) -> Dict[str, Any]:
+    """Convert a stored receipt into the status dictionary format."""
+    return {
+        "exists": True,
+        "confirmed": True,
+        "finalized": True,
+        "success": bool(finalized.success),  # type: ignore
+        "block_number": int(finalized.block_number),  # type: ignore
+        "timestamp": int(finalized.block_timestamp),  # type: ignore
+        "energy_used": int(finalized.energy_used),  # type: ignore
+        "net_used": int(finalized.net_used),  # type: ignore
+    }
+
+
+def _with_confirmations(status_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Add a confirmation count using the shared block height, if known."""
+    result = dict(status_info)
+    height = get_tron_service().block_height.height
+    if height is not None:
+        result["confirmations"] = max(MIN_CONFIRMATIONS, height - result["block_number"])
+    else:
+        result["confirmations"] = MIN_CONFIRMATIONS
+    return result
+
+
+def get_transaction_status(db: Session, tx_hash: str) -> Dict[str, Any]:
+    """
+    Get transaction status, consulting the finalized cache first.
+
+    Args:
+        db: Database session
+        tx_hash: Transaction hash
+
+    Returns:
+        Dictionary with transaction status information
+    """
+    cached = finalized_status_cache.get(tx_hash)
+    if cached is not None:
+        return _with_confirmations(cached)
+
+    finalized = crud_finalized_transaction.get_by_hash(db, tx_hash)
+    if finalized:
+        status_info = _finalized_status(finalized)
+        finalized_status_cache.set(tx_hash, status_info)
+        return _with_confirmations(status_info)
+
+    # Copy - the result may be shared with concurrent callers
+    status_info = dict(get_tron_service().check_transaction_status(tx_hash))
+    if not (status_info.get("exists") and status_info.get("confirmed")):
+        status_info["finalized"] = False
+        return status_info
+
+    # Confirmed with a final receipt - persist so the node is never asked again
+    try:
+        finalized = crud_finalized_transaction.create(db, {
+            "tx_hash": tx_hash,
+            "block_number": status_info["block_number"],
+            "block_timestamp": status_info.get("timestamp", 0),
+            "success": status_info["success"],
+            "energy_used": status_info.get("energy_used", 0),
+            "net_used": status_info.get("net_used", 0),
+        })
+        finalized_status_cache.set(tx_hash, _finalized_status(finalized))
+    except Exception as e:
+        logger.error(f"Failed to store finalized transaction {tx_hash}: {e}")
+    else:
+        # Learn what our own withdrawals actually cost
+        try:
+            get_tron_service().fee_estimator.observe_finalized(
+                db, tx_hash, status_info.get("energy_used", 0), status_info.get("net_used", 0),
+                success=bool(status_info["success"])
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record fee usage of {tx_hash}: {e}")
+        # A withdrawal settled at broadcast may still have failed on-chain (e.g. out of energy)
+        if not status_info["success"]:
+            try:
+                if crud_withdrawal_job.record_reverted(db, tx_hash):
+                    logger.error(f"Withdrawal {tx_hash} failed on-chain; funds restored and frozen for review")
+            except Exception as e:
+                logger.error(f"Failed to reopen failed withdrawal {tx_hash}: {e}")
+
+    status_info["finalized"] = True
+    return status_info
@@ -0,0 +1,243 @@
+"""
+Sliding-window velocity limits for withdrawals and internal transfers.
+Amounts are counted per (user, asset, operation) in fixed time buckets,
+written in the same commit as the operation itself and read back as the
+handful of buckets a window covers, with an in-process cache in front.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.db import SessionLocal
+from .. import models
+from .common import naive_utc
+
+logger = logging.getLogger(__name__)
+
+OP_WITHDRAWAL = "withdrawal"
+OP_TRANSFER = "transfer"
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+CounterKey = Tuple[int, str, str]
+
+
+class VelocityLimiter:
+    """
+    Hourly and daily amount limits per user, asset and operation.
+
+    A window covers every bucket that overlaps it, so usage is rounded up
+    to whole buckets (never under-counted within one process). Cached
+    buckets are updated as operations are recorded and reloaded after
+    ``cache_ttl`` seconds, which bounds how long operations recorded by
+    other processes can go unseen. A check and the later record are not
+    atomic: concurrent requests of one user can overshoot a limit by at
+    most the requests in flight.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Dict[timedelta, Decimal]],
+        bucket: timedelta = timedelta(minutes=5),
+        cache_ttl: float = 30.0,
+        cache_size: int = 10_000
+    ):
+        self.limits = {
+            operation: {window: limit for window, limit in windows.items() if limit > 0}
+            for operation, windows in limits.items()
+        }
+        self.bucket = bucket
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.longest_window = max(
+            (window for windows in self.limits.values() for window in windows), default=DAY
+        )
+        self._cache: "OrderedDict[CounterKey, Tuple[float, Dict[datetime, Decimal]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "VelocityLimiter":
+        def amount(value: float) -> Decimal:
+            return Decimal(str(value))
+
+        return cls(
+            limits={
+                OP_WITHDRAWAL: {
+                    HOUR: amount(settings.withdrawal_hourly_limit),
+                    DAY: amount(settings.withdrawal_daily_limit),
+                },
+                OP_TRANSFER: {
+                    HOUR: amount(settings.transfer_hourly_limit),
+                    DAY: amount(settings.transfer_daily_limit),
+                },
+            },
+            bucket=timedelta(minutes=settings.velocity_bucket_minutes),
+            cache_ttl=settings.velocity_cache_ttl
+        )
+
+    def bucket_start(self, moment: datetime) -> datetime:
+        """Start of the bucket containing a (naive UTC) moment."""
+        size = int(self.bucket.total_seconds())
+        epoch = int(moment.replace(tzinfo=timezone.utc).timestamp())
+        return datetime.utcfromtimestamp(epoch - epoch % size)
+
+    def _load(self, db: Session, key: CounterKey, now: datetime) -> Dict[datetime, Decimal]:
+        user_id, asset, operation = key
+        rows = db.query(models.VelocityCounter.bucket_start, models.VelocityCounter.amount).filter(
+            and_(
+                models.VelocityCounter.user_id == user_id,
+                models.VelocityCounter.asset == asset,
+                models.VelocityCounter.operation == operation,
+                models.VelocityCounter.bucket_start >= self.bucket_start(now - self.longest_window)
+            )
+        ).all()
+        return {naive_utc(bucket_start): Decimal(str(amount)) for bucket_start, amount in rows}
+
+    def _buckets(self, db: Session, key: CounterKey, now: datetime) -> Dict[datetime, Decimal]:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and time.monotonic() - cached[0] < self.cache_ttl:
+                self._cache.move_to_end(key)
+                return dict(cached[1])
+
+        buckets = self._load(db, key, now)
+        with self._lock:
+            self._cache[key] = (time.monotonic(), buckets)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(buckets)
+
+    def usage(
+        self,
+        db: Session,
+        user_id: int,
+        asset: str,
+        operation: str,
+        window: timedelta,
+        now: Optional[datetime] = None
+    ) -> Decimal:
+        """Amount used in the window ending now (whole buckets)."""
+        now = now or datetime.utcnow()
+        oldest = self.bucket_start(now - window)
+        buckets = self._buckets(db, (user_id, asset, operation), now)
+        return sum((amount for start, amount in buckets.items() if start >= oldest), Decimal('0'))
+
+    def check(
+        self,
+        db: Session,
+        user_id: int,
+        asset: str,
+        operation: str,
+        amount: Decimal
+    ) -> Optional[str]:
+        """
+        Check an operation against the user's limits.
+
+        Returns:
+            Error message if the amount would exceed a limit, None otherwise
+        """
+        windows = self.limits.get(operation)
+        if not windows:
+            return None
+        now = datetime.utcnow()
+        for window, limit in sorted(windows.items()):
+            used = self.usage(db, user_id, asset, operation, window, now)
+            if used + amount > limit:
+                period = "hourly" if window == HOUR else "daily" if window == DAY else f"{window}"
+                return (
+                    f"{operation.capitalize()} {period} limit of {limit} {asset} exceeded "
+                    f"(used {used}, remaining {max(limit - used, Decimal('0'))})"
+                )
+        return None
+
+    def record(self, db: Session, user_id: int, asset: str, operation: str, amount: Decimal) -> None:
+        """
+        Add an operation to its bucket without committing.
+
+        Call before the commit that persists the operation, so the counter
+        and the balance change land together.
+        """
+        now = datetime.utcnow()
+        bucket_start = self.bucket_start(now)
+        values = dict(
+            user_id=user_id, asset=asset, operation=operation,
+            bucket_start=bucket_start, amount=amount, count=1
+        )
+        table = models.VelocityCounter.__table__
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = insert(table).values(**values)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=["user_id", "asset", "operation", "bucket_start"],
+                set_={"amount": table.c.amount + statement.excluded.amount, "count": table.c.count + 1}
+            ))
+        else:
+            updated = db.query(models.VelocityCounter).filter(
+                and_(
+                    models.VelocityCounter.user_id == user_id,
+                    models.VelocityCounter.asset == asset,
+                    models.VelocityCounter.operation == operation,
+                    models.VelocityCounter.bucket_start == bucket_start
+                )
+            ).update({
+                'amount': models.VelocityCounter.amount + amount,
+                'count': models.VelocityCounter.count + 1
+            }, synchronize_session=False)
+            if not updated:
+                db.add(models.VelocityCounter(**values))
+
+        with self._lock:
+            cached = self._cache.get((user_id, asset, operation))
+            if cached:
+                cached[1][bucket_start] = cached[1].get(bucket_start, Decimal('0')) + amount
+
+    def prune(self, db: Session) -> int:
+        """Delete buckets older than the longest window; returns the number deleted."""
+        cutoff = self.bucket_start(datetime.utcnow() - self.longest_window)
+        deleted = db.query(models.VelocityCounter).filter(
+            models.VelocityCounter.bucket_start < cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+velocity_limiter = VelocityLimiter.from_settings()
+
+
+def _prune_counters() -> int:
+    db = SessionLocal()
+    try:
+        return velocity_limiter.prune(db)
+    finally:
+        db.close()
+
+
+async def run_velocity_pruner(interval: int) -> None:
+    """만료된 한도 카운터 버킷을 주기적으로 삭제합니다."""
+    logger.info(f"Starting velocity counter pruner (every {interval}s)")
+    while True:
+        try:
+            deleted = await asyncio.to_thread(_prune_counters)
+            if deleted:
+                logger.info(f"Pruned {deleted} velocity counter buckets")
+        except Exception as e:
+            logger.error(f"Error pruning velocity counters: {e}")
+        await asyncio.sleep(interval)
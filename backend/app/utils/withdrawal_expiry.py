@@ -0,0 +1,106 @@
+"""
+Expiry of stale withdrawal requests.
+Cancels pending requests nobody processed within the configured age and
+releases their frozen funds, batch by batch, so they stop holding balances
+and inflating the pending queue.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.db import SessionLocal
+from ..crud import crud_withdrawal_request
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WithdrawalExpiryReport:
+    """Requests expired by one run and the funds released per user and asset."""
+
+    request_ids: List[int] = field(default_factory=list)
+    released: Dict[int, Dict[str, Decimal]] = field(default_factory=dict)
+    batches: int = 0
+    elapsed: float = 0.0
+
+    def add(self, request_id: int, user_id: int, asset: str, amount: Decimal) -> None:
+        self.request_ids.append(request_id)
+        assets = self.released.setdefault(user_id, {})
+        assets[asset] = assets.get(asset, Decimal('0')) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "expired": len(self.request_ids),
+            "request_ids": self.request_ids,
+            "users": [
+                {"user_id": user_id, "released": {asset: float(amount) for asset, amount in assets.items()}}
+                for user_id, assets in sorted(self.released.items())
+            ],
+            "batches": self.batches,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.request_ids)} requests expired for {len(self.released)} users "
+            f"in {self.batches} batches ({self.elapsed:.1f}s)"
+        )
+
+
+def expire_stale_withdrawals(db: Session, max_age: timedelta, batch_size: int = 500) -> WithdrawalExpiryReport:
+    """
+    Expire every pending withdrawal request older than ``max_age``.
+
+    Args:
+        db: Database session
+        max_age: Age after which a pending request is cancelled
+        batch_size: Requests expired per database transaction
+
+    Returns:
+        Report of the expired requests and the funds released per user
+    """
+    started = time.monotonic()
+    created_before = datetime.utcnow() - max_age
+    report = WithdrawalExpiryReport()
+    while True:
+        expired = crud_withdrawal_request.expire_stale(db, created_before, limit=batch_size)
+        if not expired:
+            break
+        report.batches += 1
+        for request_id, user_id, asset, amount in expired:
+            report.add(request_id, user_id, asset, amount)
+        if len(expired) < batch_size:
+            break
+
+    report.elapsed = time.monotonic() - started
+    if report.request_ids:
+        logger.info(f"Withdrawal expiry: {report.summary()}")
+    return report
+
+
+def _expire_with_new_session(max_age: timedelta) -> WithdrawalExpiryReport:
+    db = SessionLocal()
+    try:
+        return expire_stale_withdrawals(db, max_age, settings.withdrawal_expiry_batch_size)
+    finally:
+        db.close()
+
+
+async def run_withdrawal_expiry(interval: int) -> None:
+    """오래 처리되지 않은 출금 요청을 주기적으로 만료합니다."""
+    max_age = timedelta(hours=settings.withdrawal_expiry_hours)
+    logger.info(f"Starting withdrawal expiry (every {interval}s, requests older than {max_age})")
+    while True:
+        try:
+            await asyncio.to_thread(_expire_with_new_session, max_age)
+        except Exception as e:
+            logger.error(f"Error in withdrawal expiry: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,217 @@
+"""
+Scheduling for the pending withdrawal queue.
+Orders pending requests by a configurable policy instead of newest first,
+hands them out to reviewing admins with row locks that skip rows already
+taken, and reports queue depth and time-in-queue percentiles.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, case, or_
+from sqlalchemy.orm import Query, Session
+
+from ..core.config import settings
+from ..crud import crud_withdrawal_job
+from .. import models
+from .common import naive_utc, percentile
+
+# Policy criteria, applied in the configured order; ties always go oldest first
+POLICY_SLA = "sla"                  # requests waiting longer than the SLA first
+POLICY_USER_TIER = "user_tier"      # higher user priority tier first
+POLICY_AMOUNT_TIER = "amount_tier"  # smaller amount tier first
+POLICY_AMOUNT_DESC = "amount_desc"  # larger amounts first
+POLICY_CRITERIA = (POLICY_SLA, POLICY_USER_TIER, POLICY_AMOUNT_TIER, POLICY_AMOUNT_DESC)
+
+# Number of most recently processed requests used for wait-time percentiles
+RECENT_PROCESSED = 500
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    return {
+        "p50": round(percentile(values, 0.5), 1),
+        "p90": round(percentile(values, 0.9), 1),
+        "p99": round(percentile(values, 0.99), 1),
+        "max": round(max(values), 1),
+    }
+
+
+class WithdrawalScheduler:
+    """
+    Priority scheduler over pending ``WithdrawalRequest`` rows.
+
+    Admins claim the next requests in policy order; a claim is a lease
+    (``claimed_by``/``claimed_until``) taken under ``FOR UPDATE SKIP LOCKED``,
+    so concurrent claimers never receive the same request and an abandoned
+    claim returns to the queue when its lease ends.
+    """
+
+    def __init__(
+        self,
+        policy: Sequence[str] = (POLICY_SLA, POLICY_USER_TIER, POLICY_AMOUNT_TIER),
+        sla: timedelta = timedelta(minutes=60),
+        amount_tiers: Sequence[float] = (100.0, 1000.0),
+        lease: timedelta = timedelta(minutes=5),
+        job_stale: timedelta = timedelta(minutes=10)
+    ):
+        unknown = [criterion for criterion in policy if criterion not in POLICY_CRITERIA]
+        if unknown:
+            raise ValueError(f"Unknown withdrawal queue policy criteria: {', '.join(unknown)}")
+        self.policy = list(policy)
+        self.sla = sla
+        self.amount_tiers = sorted(amount_tiers)
+        self.lease = lease
+        self.job_stale = job_stale
+
+    @classmethod
+    def from_settings(cls) -> "WithdrawalScheduler":
+        return cls(
+            policy=[criterion.strip() for criterion in settings.withdrawal_queue_policy.split(",") if criterion.strip()],
+            sla=timedelta(minutes=settings.withdrawal_queue_sla_minutes),
+            amount_tiers=settings.withdrawal_amount_tiers,
+            lease=timedelta(seconds=settings.withdrawal_claim_lease_seconds),
+            job_stale=timedelta(seconds=settings.withdrawal_job_stale_seconds)
+        )
+
+    def amount_tier(self, amount: Any) -> int:
+        """Index of the amount tier an amount falls into (0 = smallest)."""
+        return sum(1 for boundary in self.amount_tiers if float(amount) >= boundary)
+
+    def order_by(self, now: datetime) -> List[Any]:
+        """ORDER BY clauses implementing the policy, oldest first on ties."""
+        request = models.WithdrawalRequest
+        clauses: List[Any] = []
+        for criterion in self.policy:
+            if criterion == POLICY_SLA:
+                clauses.append(case((request.created_at <= now - self.sla, 0), else_=1))
+            elif criterion == POLICY_USER_TIER:
+                clauses.append(models.User.priority_tier.desc())
+            elif criterion == POLICY_AMOUNT_TIER and self.amount_tiers:
+                clauses.append(case(
+                    *[(request.amount < boundary, tier) for tier, boundary in enumerate(self.amount_tiers)],
+                    else_=len(self.amount_tiers)
+                ))
+            elif criterion == POLICY_AMOUNT_DESC:
+                clauses.append(request.amount.desc())
+        return clauses + [request.created_at.asc(), request.id.asc()]
+
+    def _pending(self, db: Session) -> Query:
+        return db.query(models.WithdrawalRequest).join(
+            models.User, models.WithdrawalRequest.user_id == models.User.id
+        ).filter(models.WithdrawalRequest.status == models.TransactionStatus.PENDING)
+
+    def pending(self, db: Session, skip: int = 0, limit: int = 50) -> List[models.WithdrawalRequest]:
+        """Pending requests in scheduling order (claimed ones included)."""
+        now = datetime.utcnow()
+        return self._pending(db).order_by(*self.order_by(now)).offset(skip).limit(limit).all()
+
+    def claim(self, db: Session, admin_user_id: int, limit: int) -> List[models.WithdrawalRequest]:
+        """
+        Claim the next pending requests for an admin to review.
+
+        Requests claimed by another admin whose lease has not ended are
+        passed over, as are rows locked by a concurrent claim. Requests the
+        admin already holds are returned again with a renewed lease.
+
+        Args:
+            db: Database session
+            admin_user_id: Admin taking the requests
+            limit: Maximum number of requests to claim
+
+        Returns:
+            Claimed requests in scheduling order
+        """
+        now = datetime.utcnow()
+        request = models.WithdrawalRequest
+        claimable = and_(
+            request.status == models.TransactionStatus.PENDING,
+            or_(request.claimed_until.is_(None), request.claimed_until <= now, request.claimed_by == admin_user_id)
+        )
+        try:
+            rows = self._pending(db).filter(claimable).order_by(
+                *self.order_by(now)
+            ).limit(limit).with_for_update(skip_locked=True, of=request).all()
+
+            # The guard repeats the filter for databases without row locks (SQLite)
+            if rows:
+                db.query(request).filter(
+                    and_(request.id.in_([row.id for row in rows]), claimable)
+                ).update({
+                    'claimed_by': admin_user_id,
+                    'claimed_until': now + self.lease
+                }, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for row in rows:
+            db.refresh(row)
+        return [row for row in rows if row.claimed_by == admin_user_id]
+
+    def release(self, db: Session, request_ids: List[int], admin_user_id: int) -> int:
+        """Return an admin's pending claimed requests to the queue; returns how many were released."""
+        released = db.query(models.WithdrawalRequest).filter(
+            and_(
+                models.WithdrawalRequest.id.in_(request_ids),
+                models.WithdrawalRequest.status == models.TransactionStatus.PENDING,
+                models.WithdrawalRequest.claimed_by == admin_user_id
+            )
+        ).update({'claimed_by': None, 'claimed_until': None}, synchronize_session=False)
+        db.commit()
+        return released
+
+    def metrics(self, db: Session) -> Dict[str, Any]:
+        """
+        Queue depth and time-in-queue percentiles (seconds).
+
+        ``waiting`` is the age of requests still pending; ``processed`` is
+        the time from request to admin decision over recent requests.
+        ``jobs`` counts withdrawal jobs per status, ``reverted`` the failed
+        jobs whose broadcast transfer failed on-chain and ``stale_running``
+        lists jobs RUNNING for longer than ``job_stale`` (the worker likely
+        died; check on-chain before resolving them by hand).
+        """
+        now = datetime.utcnow()
+        request = models.WithdrawalRequest
+        pending = db.query(request.created_at, request.amount, request.claimed_until).filter(
+            request.status == models.TransactionStatus.PENDING
+        ).all()
+
+        ages, by_tier = [], [0] * (len(self.amount_tiers) + 1)
+        claimed = overdue = 0
+        for created_at, amount, claimed_until in pending:
+            age = (now - naive_utc(created_at)).total_seconds() if created_at else 0.0
+            ages.append(age)
+            overdue += age >= self.sla.total_seconds()
+            by_tier[self.amount_tier(amount)] += 1
+            claimed += bool(claimed_until and naive_utc(claimed_until) > now)
+
+        processed = db.query(request.created_at, request.processed_at).filter(
+            request.processed_at.isnot(None)
+        ).order_by(request.processed_at.desc()).limit(RECENT_PROCESSED).all()
+        waits = [
+            (naive_utc(processed_at) - naive_utc(created_at)).total_seconds()
+            for created_at, processed_at in processed if created_at
+        ]
+
+        return {
+            "depth": len(pending),
+            "claimed": claimed,
+            "overdue": overdue,
+            "sla_seconds": int(self.sla.total_seconds()),
+            "depth_by_amount_tier": by_tier,
+            "amount_tiers": self.amount_tiers,
+            "waiting_seconds": _percentiles(ages),
+            "processed_wait_seconds": _percentiles(waits),
+            "policy": self.policy,
+            "jobs": crud_withdrawal_job.count_by_status(db),
+            # Settled at broadcast but failed on-chain; funds frozen for review
+            "reverted": crud_withdrawal_job.count_reverted(db),
+            "stale_running": crud_withdrawal_job.get_stale_running(db, now - self.job_stale),
+        }
+
+
+withdrawal_scheduler = WithdrawalScheduler.from_settings()
@@ -0,0 +1,167 @@
+"""
+Withdrawal worker.
+Executes approved withdrawals from the withdrawal job outbox, so approval
+requests return immediately and broadcasting happens off the request path.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.db import SessionLocal
+from ..crud import crud_withdrawal_job
+from .. import models
+from .batch_sender import BatchSendResult, TransferItem
+from .company_wallet import company_balance
+from .tron import TronService, get_tron_service
+from .tx_status import get_transaction_status
+
+logger = logging.getLogger(__name__)
+
+# Broadcast withdrawals are checked on-chain for this long; a transaction
+# still not found by then has expired without being included
+RECONCILE_WINDOW = timedelta(hours=24)
+
+# Set when new jobs are enqueued so the worker does not wait for its next poll
+_jobs_enqueued = threading.Event()
+
+
+def notify_withdrawal_worker() -> None:
+    """Wake the withdrawal worker after enqueuing jobs."""
+    _jobs_enqueued.set()
+
+
+class WithdrawalWorker:
+    """
+    Claim queued withdrawal jobs and broadcast them as batches.
+
+    Each batch is built and signed together and broadcast with bounded
+    concurrency; outcomes are written back in one database transaction.
+    A job is broadcast at most once: a claimed job is never returned to the
+    queue, and failures are left for manual review because a send that
+    reported an error may still have reached the network.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        tron_service: Optional[TronService] = None,
+        concurrency: int = 4,
+        batch_size: int = 100
+    ):
+        self.session_factory = session_factory
+        self._tron_service = tron_service
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+
+    @property
+    def tron_service(self) -> TronService:
+        if self._tron_service is None:
+            self._tron_service = get_tron_service()
+        return self._tron_service
+
+    def run_once(self) -> int:
+        """
+        Claim up to ``batch_size`` queued jobs and send them as one batch.
+
+        Returns:
+            Number of jobs claimed
+        """
+        db = self.session_factory()
+        try:
+            job_ids = crud_withdrawal_job.claim(db, self.batch_size)
+            if not job_ids:
+                return 0
+            rows = db.query(models.WithdrawalJob.id, models.WithdrawalRequest).join(
+                models.WithdrawalRequest, models.WithdrawalJob.withdrawal_request_id == models.WithdrawalRequest.id
+            ).filter(models.WithdrawalJob.id.in_(job_ids)).order_by(models.WithdrawalJob.id).all()
+            transfers = [
+                TransferItem(job_id, str(request.destination_address), Decimal(str(request.amount)))
+                for job_id, request in rows
+            ]
+            assets = {job_id: str(request.asset) for job_id, request in rows}
+
+            self.tron_service.fee_estimator.ensure_loaded(db)
+            try:
+                result = self.tron_service.send_usdt_batch(transfers, concurrency=self.concurrency)
+            except Exception as e:
+                result = BatchSendResult.all_failed(transfers, str(e) or type(e).__name__)
+
+            for outcome in result.succeeded:
+                company_balance.record_outflow(assets[outcome.key], outcome.amount)
+            for outcome in result.failed:
+                logger.error(f"Withdrawal job {outcome.key} failed: {outcome.error}")
+
+            crud_withdrawal_job.record_results(
+                db,
+                txids={outcome.key: outcome.txid for outcome in result.succeeded},
+                errors={outcome.key: outcome.error or "Broadcast failed" for outcome in result.failed},
+                fee_details={
+                    outcome.key: {'recipient_type': outcome.recipient_type, 'fee_limit': outcome.fee_limit}
+                    for outcome in result.succeeded
+                }
+            )
+            logger.info(f"Withdrawal batch: {result.summary()}")
+            return len(job_ids)
+        finally:
+            db.close()
+
+    def reconcile_once(self) -> int:
+        """
+        Check recently broadcast withdrawals until their receipts are final.
+
+        Withdrawals are settled at broadcast; finalizing the receipt reopens
+        the ones whose transfer failed on-chain (see ``get_transaction_status``).
+
+        Returns:
+            Number of withdrawals checked
+        """
+        db = self.session_factory()
+        try:
+            tx_hashes = crud_withdrawal_job.get_unfinalized(
+                db, datetime.utcnow() - RECONCILE_WINDOW, limit=self.batch_size
+            )
+            for tx_hash in tx_hashes:
+                get_transaction_status(db, tx_hash)
+            return len(tx_hashes)
+        finally:
+            db.close()
+
+
+async def run_withdrawal_worker(poll_interval: float) -> None:
+    """출금 작업 대기열을 백그라운드에서 처리합니다."""
+    worker = WithdrawalWorker(
+        concurrency=settings.withdrawal_worker_concurrency,
+        batch_size=settings.withdrawal_batch_size
+    )
+    logger.info(f"Starting withdrawal worker (every {poll_interval}s, batches of {worker.batch_size})")
+    last_reconcile = 0.0
+    while True:
+        _jobs_enqueued.clear()
+        try:
+            claimed = await asyncio.to_thread(worker.run_once)
+        except Exception as e:
+            logger.error(f"Error in withdrawal worker: {e}")
+            claimed = 0
+        # 브로드캐스트 후 온체인에서 실패한 출금을 주기적으로 확인
+        if time.monotonic() - last_reconcile >= settings.withdrawal_reconcile_interval:
+            last_reconcile = time.monotonic()
+            try:
+                await asyncio.to_thread(worker.reconcile_once)
+            except Exception as e:
+                logger.error(f"Error reconciling withdrawals: {e}")
+        # 대기열이 남아 있으면 바로 다음 배치를 처리
+        if claimed >= worker.batch_size:
+            continue
+        # 새 작업이 등록되면 대기를 중단
+        waited = 0.0
+        while waited < poll_interval and not _jobs_enqueued.is_set():
+            await asyncio.sleep(0.2)
+            waited += 0.2
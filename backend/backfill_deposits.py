@@ -0,0 +1,97 @@
+"""
+과거 입금 백필 스크립트.
+다운타임 이후 또는 새 자산 추가 시 지정한 블록 구간의 입금을 병렬로 스캔하여 반영합니다.
+
+사용 예:
+    python backfill_deposits.py --start 60000000 --end 60012000
+    python backfill_deposits.py --resume
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from app.core.config import settings
+from app.core.db import SessionLocal, init_db
+from app.utils.backfill import DepositBackfill
+from app.utils.block_scanner import BlockScanner, DepositAddressSet
+from app.utils.block_store import BlockStore, BlockStoreLockedError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    """명령줄 인자를 파싱합니다."""
+    parser = argparse.ArgumentParser(description="과거 블록 구간의 USDT 입금을 백필합니다.")
+    parser.add_argument("--start", type=int, help="시작 블록 번호")
+    parser.add_argument("--end", type=int, help="종료 블록 번호 (기본값과 상한: 현재 확정 블록)")
+    parser.add_argument("--resume", action="store_true", help="이전 백필이 멈춘 블록 다음부터 이어서 실행")
+    parser.add_argument("--workers", type=int, default=settings.backfill_workers, help="동시 작업 수")
+    parser.add_argument("--chunk-size", type=int, default=settings.backfill_chunk_size, help="작업 단위 블록 수")
+    return parser.parse_args()
+
+
+def main() -> int:
+    """백필을 실행하고 결과를 출력합니다."""
+    args = parse_args()
+    init_db()
+
+    # 실행 중인 스캐너와 세그먼트 파일을 공유하지 않도록 별도 디렉터리 사용
+    block_store = None
+    if settings.block_store_dir:
+        try:
+            block_store = BlockStore(
+                os.path.join(settings.block_store_dir, "backfill"),
+                max_bytes=settings.block_store_max_mb * 1024 * 1024,
+                segment_bytes=settings.block_store_segment_mb * 1024 * 1024,
+                index_blocks=settings.block_store_index_blocks
+            )
+        except BlockStoreLockedError:
+            logger.warning("⚠️ 다른 백필이 블록 캐시를 사용 중이라 캐시 없이 실행합니다")
+    scanner = BlockScanner(
+        DepositAddressSet(use_bloom=settings.deposit_scanner_use_bloom),
+        block_store=block_store
+    )
+    # 노드 호출 벌크헤드보다 많은 작업자는 거부만 늘립니다
+    workers = max(1, min(args.workers, settings.tron_max_concurrent_calls))
+    backfill = DepositBackfill(scanner, SessionLocal, workers=workers, chunk_size=args.chunk_size)
+
+    start = args.start
+    if args.resume:
+        last_block = backfill.resume_point()
+        if last_block is None:
+            logger.error("❌ 이어서 실행할 백필 기록이 없습니다. --start를 지정하세요.")
+            return 1
+        start = last_block + 1
+    if start is None:
+        logger.error("❌ --start 또는 --resume 중 하나를 지정하세요.")
+        return 1
+
+    # 확정되지 않은 블록의 입금은 완료로 반영하지 않음 (재구성 가능)
+    confirmed = scanner.tron_service.get_latest_block_number() - scanner.confirmations
+    end = confirmed if args.end is None else min(args.end, confirmed)
+    if args.end is not None and end < args.end:
+        logger.warning(f"--end {args.end}은 아직 확정되지 않아 블록 {end}까지만 백필합니다")
+    if end < start:
+        logger.info("백필할 블록이 없습니다.")
+        return 0
+
+    logger.info(f"블록 {start}-{end} 백필을 시작합니다 (작업자 {workers}개, 단위 {args.chunk_size}블록)")
+
+    def report_progress(report):
+        logger.info(f"진행: {report.summary()}")
+
+    try:
+        report = backfill.run(start, end, progress=report_progress)
+    except Exception as e:
+        logger.error(f"❌ 백필 실패: {str(e)} (--resume으로 이어서 실행할 수 있습니다)")
+        return 1
+
+    logger.info(f"✅ 백필 완료: {report.summary()} - {report.elapsed:.1f}초")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
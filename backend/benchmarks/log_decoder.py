@@ -0,0 +1,171 @@
+"""
+TRC20 Transfer 로그 디코더 벤치마크.
+고정 오프셋 디코더(TransferLogDecoder)와 tronpy ABI 디코더를 같은 블록 영수증으로 비교합니다.
+두 디코더의 결과가 같은지 먼저 확인한 뒤 블록당/로그당 처리 시간을 출력합니다.
+
+블록 영수증은 --record로 노드에서 기록해 두고 --file로 재사용하며, 파일이 없으면
+실제 블록과 비슷한 합성 블록을 생성합니다.
+
+사용 예:
+    python -m benchmarks.log_decoder --record 50 --file blocks.jsonl
+    python -m benchmarks.log_decoder --file blocks.jsonl --repeat 5
+    python -m benchmarks.log_decoder --blocks 200 --logs-per-block 400
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from tronpy.contract import Contract
+
+from app.utils.address import to_base58_address
+from app.utils.block_scanner import raw_address
+from app.utils.contracts import TRC20_ABI
+from app.utils.log_decoder import TRANSFER_TOPIC, TransferLogDecoder
+from app.utils.tron import USDT_CONTRACT_ADDRESS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Block = List[Dict[str, Any]]
+Event = Tuple[str, str, str, int]
+
+
+def parse_args():
+    """명령줄 인자를 파싱합니다."""
+    parser = argparse.ArgumentParser(description="TRC20 Transfer 로그 디코더를 tronpy 디코더와 비교합니다.")
+    parser.add_argument("--file", help="기록된 블록 영수증 파일 (JSON Lines, 한 줄에 한 블록)")
+    parser.add_argument("--record", type=int, default=0, help="최근 확정 블록 N개를 노드에서 받아 --file에 기록")
+    parser.add_argument("--blocks", type=int, default=100, help="합성 블록 수 (--file이 없을 때)")
+    parser.add_argument("--logs-per-block", type=int, default=300, help="합성 블록당 USDT Transfer 로그 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 결과 사용)")
+    return parser.parse_args()
+
+
+def record_blocks(path: str, count: int) -> None:
+    """최근 확정 블록의 영수증을 파일에 기록합니다."""
+    from app.utils.tron import MIN_CONFIRMATIONS, get_tron_service
+
+    service = get_tron_service()
+    head = service.get_latest_block_number() - MIN_CONFIRMATIONS
+    with open(path, "w") as f:
+        for block_number in range(head - count + 1, head + 1):
+            f.write(json.dumps(service.get_block_transaction_info(block_number)) + "\n")
+    logger.info(f"블록 {head - count + 1}-{head}을 {path}에 기록했습니다")
+
+
+def load_blocks(path: str) -> List[Block]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_blocks(count: int, logs_per_block: int, seed: int = 1) -> List[Block]:
+    """주소가 반복되는 (거래소/핫월렛) 실제 분포를 흉내 낸 합성 블록을 생성합니다."""
+    rng = random.Random(seed)
+    contract_hex = "41" + raw_address(USDT_CONTRACT_ADDRESS).hex()
+    hot = [rng.getrandbits(160).to_bytes(20, "big").hex() for _ in range(50)]
+    blocks = []
+    for _ in range(count):
+        infos = []
+        for _ in range(logs_per_block):
+            sender = rng.choice(hot) if rng.random() < 0.6 else rng.getrandbits(160).to_bytes(20, "big").hex()
+            recipient = rng.choice(hot) if rng.random() < 0.3 else rng.getrandbits(160).to_bytes(20, "big").hex()
+            infos.append({
+                "id": rng.getrandbits(256).to_bytes(32, "big").hex(),
+                "receipt": {"result": "SUCCESS"},
+                "log": [{
+                    "address": contract_hex,
+                    "topics": [TRANSFER_TOPIC, "0" * 24 + sender, "0" * 24 + recipient],
+                    "data": f"{rng.randrange(1, 10 ** 12):064x}",
+                }],
+            })
+        blocks.append(infos)
+    return blocks
+
+
+def decode_fixed_offset(decoder: TransferLogDecoder, blocks: List[Block]) -> List[Event]:
+    """고정 오프셋 디코딩 + 캐시된 base58 변환."""
+    events = []
+    for tx_infos in blocks:
+        for tx_id, sender, recipient, amount in decoder.decode(tx_infos):
+            events.append((tx_id.hex(), to_base58_address(sender), to_base58_address(recipient), amount))
+    return events
+
+
+def decode_tronpy(contract: Contract, contract_hex: str, blocks: List[Block]) -> List[Event]:
+    """tronpy ContractEvent.get_event_data로 로그마다 ABI 디코딩."""
+    transfer = contract.events.Transfer
+    events = []
+    for tx_infos in blocks:
+        for info in tx_infos:
+            if info.get("receipt", {}).get("result", "SUCCESS") != "SUCCESS":
+                continue
+            for log in info.get("log", ()):
+                topics = log.get("topics", ())
+                if len(topics) < 3 or topics[0] != TRANSFER_TOPIC or log.get("address", "")[-40:].lower() != contract_hex:
+                    continue
+                args = transfer.get_event_data(log)["args"]
+                events.append((info["id"], args["from"], args["to"], args["value"]))
+    return events
+
+
+def best_time(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    """두 디코더를 검증하고 시간을 비교합니다."""
+    args = parse_args()
+    if args.record:
+        if not args.file:
+            logger.error("❌ --record에는 --file이 필요합니다.")
+            return 1
+        record_blocks(args.file, args.record)
+
+    blocks = load_blocks(args.file) if args.file else synthetic_blocks(args.blocks, args.logs_per_block)
+    contract_hex = raw_address(USDT_CONTRACT_ADDRESS).hex()
+    decoder = TransferLogDecoder(contract_hex)
+    contract = Contract(addr=USDT_CONTRACT_ADDRESS, abi=TRC20_ABI)
+
+    fast = decode_fixed_offset(decoder, blocks)
+    reference = decode_tronpy(contract, contract_hex, blocks)
+    if fast != reference:
+        logger.error(f"❌ 디코딩 결과가 다릅니다 ({len(fast)} / {len(reference)} 이벤트)")
+        return 1
+    if not fast:
+        logger.error("❌ 블록에 USDT Transfer 로그가 없습니다.")
+        return 1
+
+    to_base58_address.cache_clear()
+    record_only = best_time(lambda: [decoder.decode_record(tx_infos) for tx_infos in blocks], args.repeat)
+    with_addresses = best_time(lambda: decode_fixed_offset(decoder, blocks), args.repeat)
+    tronpy_time = best_time(lambda: decode_tronpy(contract, contract_hex, blocks), args.repeat)
+
+    logs = len(fast)
+    for name, seconds in (
+        ("fixed-offset record", record_only),
+        ("fixed-offset + base58", with_addresses),
+        ("tronpy ABI", tronpy_time),
+    ):
+        logger.info(
+            f"{name:>22}: {seconds * 1000:9.1f}ms  {seconds / len(blocks) * 1000:7.3f}ms/block  "
+            f"{logs / seconds:12,.0f} logs/s"
+        )
+    logger.info(
+        f"✅ {len(blocks)}블록 {logs}개 로그: 블록 레코드 {tronpy_time / record_only:.1f}배, "
+        f"base58 포함 {tronpy_time / with_addresses:.1f}배 빠름"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+HD 입금 주소 사전 생성 스크립트.
+입금 주소가 없는 모든 사용자에 대해 DEPOSIT_XPUB에서 주소를 병렬로 파생하여 저장합니다.
+개인키는 필요하지 않습니다.
+
+사용 예:
+    python provision_deposit_addresses.py --batch-size 20000 --processes 8
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from app.core.config import settings
+from app.core.db import SessionLocal, init_db
+from app.crud import crud_deposit_address
+from app.utils.hd_wallet import derive_addresses, deposit_xpub
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    """명령줄 인자를 파싱합니다."""
+    parser = argparse.ArgumentParser(description="사용자별 HD 입금 주소를 사전 생성합니다.")
+    parser.add_argument("--batch-size", type=int, default=10000, help="한 번에 처리할 사용자 수")
+    parser.add_argument("--processes", type=int, default=settings.hd_derivation_processes, help="파생 프로세스 수 (0이면 CPU 수)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    """입금 주소가 없는 사용자에게 주소를 생성합니다."""
+    args = parse_args()
+    try:
+        xpub = deposit_xpub()
+    except ValueError as e:
+        logger.error(f"❌ {str(e)}")
+        return 1
+
+    init_db()
+    db = SessionLocal()
+    started = time.monotonic()
+    created = 0
+    conflicts = 0
+    last_user_id = 0
+    try:
+        while True:
+            user_ids = crud_deposit_address.get_users_without_address(db, last_user_id, args.batch_size)
+            if not user_ids:
+                break
+
+            # 주소 인덱스 = 사용자 ID
+            derived = derive_addresses(xpub, user_ids, processes=args.processes)
+            stored = crud_deposit_address.create_hd_addresses(
+                db, [(index, index, address) for index, address in derived]
+            )
+            created += stored
+            if stored < len(user_ids):
+                # 동시에 주소를 받은 사용자 (이미 주소가 있으므로 다시 처리하지 않음)
+                conflicts += len(user_ids) - stored
+                logger.warning(f"⚠️ {len(user_ids) - stored}개 주소는 다른 요청이 먼저 저장했습니다")
+            # 배치가 저장된 뒤에만 커서를 이동
+            last_user_id = user_ids[-1]
+            logger.info(f"진행: 사용자 ID {last_user_id}까지 처리, {created}개 주소 생성")
+    except Exception as e:
+        logger.error(f"❌ 주소 생성 실패: {str(e)}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+    logger.info(f"✅ {created}개 입금 주소를 생성했습니다 (충돌 {conflicts}개, {time.monotonic() - started:.1f}초)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
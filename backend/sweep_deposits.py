@@ -0,0 +1,112 @@
+"""
+HD 입금 주소 스윕 스크립트.
+미스윕 입금 합계가 임계값 이상인 입금 주소만 골라 윈도우 단위로 수수료(TRX)를 일괄 충전한 뒤
+USDT를 핫월렛으로 모읍니다. 기본은 dry-run으로, 계획과 예상 절감 비용만 출력합니다.
+계정 개인키(m/44'/195'/0' xprv)는 SWEEP_XPRV 환경 변수로 이 스크립트에만 전달하세요.
+
+사용 예:
+    python sweep_deposits.py --threshold 100
+    SWEEP_XPRV=xprv... python sweep_deposits.py --execute --window-size 20 --concurrency 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from decimal import Decimal
+
+from tronpy.keys import PrivateKey
+
+from app.core.config import settings
+from app.core.db import SessionLocal, init_db
+from app.utils.fees import FeeEstimator
+from app.utils.hd_wallet import ExtendedPrivateKey, derive_address, derive_private_key, deposit_xpub
+from app.utils.sweep import SweepExecutor, SweepPlanner
+from app.utils.tron import get_tron_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    """명령줄 인자를 파싱합니다."""
+    parser = argparse.ArgumentParser(description="HD 입금 주소의 USDT를 핫월렛으로 스윕합니다.")
+    parser.add_argument("--threshold", type=float, default=settings.sweep_threshold, help="스윕할 최소 미스윕 금액 (USDT)")
+    parser.add_argument("--window-size", type=int, default=settings.sweep_window_size, help="윈도우당 주소 수")
+    parser.add_argument("--concurrency", type=int, default=settings.sweep_concurrency, help="동시 브로드캐스트 수")
+    parser.add_argument("--limit", type=int, default=None, help="이번 실행에서 고려할 최대 주소 수 (금액 큰 순)")
+    parser.add_argument("--execute", action="store_true", help="실제로 충전하고 스윕 (지정하지 않으면 dry-run)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    """스윕 계획을 세우고 dry-run 결과를 출력하거나 실행합니다."""
+    args = parse_args()
+    init_db()
+    db = SessionLocal()
+    try:
+        try:
+            tron_service = get_tron_service()
+            fee_estimator = tron_service.fee_estimator
+        except Exception as e:
+            if args.execute:
+                logger.error(f"❌ Tron 서비스를 초기화할 수 없습니다: {str(e)}")
+                return 1
+            # dry-run은 기본 에너지/대역폭 가격으로 추정
+            logger.warning(f"Tron 서비스 없이 기본 수수료 가격으로 추정합니다: {str(e)}")
+            tron_service, fee_estimator = None, FeeEstimator.from_settings(None)
+        fee_estimator.ensure_loaded(db)
+
+        threshold = Decimal(str(args.threshold))
+        planner = SweepPlanner(fee_estimator, threshold=threshold, window_size=args.window_size)
+        plan = planner.plan(db, limit=args.limit)
+        logger.info(f"스윕 계획: {plan.summary()}")
+        if not args.execute:
+            print(json.dumps(plan.to_dict(), indent=2, ensure_ascii=False))
+            logger.info("dry-run입니다. 실행하려면 --execute를 지정하세요.")
+            return 0
+        if not plan.windows:
+            logger.info("스윕할 주소가 없습니다.")
+            return 0
+
+        xprv = os.environ.get("SWEEP_XPRV", "")
+        if not xprv:
+            logger.error("❌ SWEEP_XPRV 환경 변수가 설정되지 않았습니다.")
+            return 1
+        try:
+            # 설정된 xpub과 같은 계정 키인지 먼저 확인
+            xpub = ExtendedPrivateKey.from_string(xprv).public().to_string()
+            if settings.deposit_xpub and derive_address(xpub, 0) != derive_address(deposit_xpub(), 0):
+                logger.error("❌ SWEEP_XPRV가 DEPOSIT_XPUB과 다른 계정 키입니다.")
+                return 1
+        except ValueError as e:
+            logger.error(f"❌ {str(e)}")
+            return 1
+
+        destination = settings.sweep_destination or tron_service.company_address  # type: ignore
+        if not destination:
+            logger.error("❌ 스윕 받을 주소가 없습니다 (SWEEP_DESTINATION 또는 회사 지갑 설정).")
+            return 1
+        executor = SweepExecutor(
+            tron_service,
+            signer=lambda index: PrivateKey(derive_private_key(xprv, index)),
+            destination=destination,
+            threshold=threshold,
+            concurrency=args.concurrency,
+            funding_wait=settings.sweep_funding_wait
+        )
+        report = executor.execute(db, plan)
+    except Exception as e:
+        logger.error(f"❌ 스윕 실패: {str(e)}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+    logger.info(f"✅ 스윕 완료: {report.summary()}")
+    return 0 if not report.failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
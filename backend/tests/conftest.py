@@ -69,3 +69,11 @@ def auth_headers(client, db):
     
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def db_session(db):
+    """테스트 데이터베이스 세션을 생성합니다."""
+    session = TestingSessionLocal()
+    yield session
+    session.close()
@@ -0,0 +1,50 @@
+"""
+트론 주소 검증기를 위한 테스트 케이스입니다.
+"""
+
+from fastapi.testclient import TestClient
+from tronpy.keys import PrivateKey, to_raw_address
+
+from app.utils.address import is_valid_address, to_base58_address
+
+USDT_CONTRACT = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+def test_valid_addresses_match_tronpy():
+    """tronpy가 생성한 주소를 유효하다고 판단하고 같은 형태로 인코딩하는지 테스트합니다."""
+    for seed in range(1, 20):
+        address = PrivateKey(bytes([seed] * 32)).public_key.to_base58check_address()
+        assert is_valid_address(address)
+        assert to_base58_address(to_raw_address(address)) == address
+    assert is_valid_address(USDT_CONTRACT)
+
+
+def test_invalid_addresses_are_rejected():
+    """길이, 문자, 접두사, 체크섬이 잘못된 주소를 거부하는지 테스트합니다."""
+    # 마지막 문자를 바꿔 체크섬 오류 유도
+    broken_checksum = USDT_CONTRACT[:-1] + ("u" if USDT_CONTRACT[-1] != "u" else "v")
+    for address in [
+        "",
+        USDT_CONTRACT[:-1],
+        USDT_CONTRACT + "x",
+        "T" + "0" * 33,  # 0은 base58 문자가 아님
+        broken_checksum,
+        "1BoatSLRHtKNngkdXEeobR76b53LETtpyT",  # 비트코인 주소 (0x41 접두사 아님)
+        None,
+    ]:
+        assert not is_valid_address(address)
+
+
+def test_batch_validation_endpoint(client: TestClient, auth_headers):
+    """일괄 주소 검증 엔드포인트가 입력 순서대로 결과를 반환하는지 테스트합니다."""
+    addresses = [USDT_CONTRACT, "Tinvalid", USDT_CONTRACT]
+    response = client.post(
+        "/api/v1/wallet/address/validate/batch",
+        json={"addresses": addresses},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [result["is_valid"] for result in data["results"]] == [True, False, True]
+    assert data["valid_count"] == 2
+    assert data["invalid_count"] == 1
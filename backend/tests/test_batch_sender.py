@@ -0,0 +1,177 @@
+"""
+USDT 배치 송금기를 위한 테스트 케이스입니다.
+"""
+
+import hashlib
+import threading
+import time
+from decimal import Decimal
+
+from tronpy.contract import Contract
+from tronpy.keys import PrivateKey, Signature
+
+from app.utils.batch_sender import BatchSender, TransferItem, encode_raw_data, transaction_id
+from app.utils.contracts import TRC20_ABI
+from app.utils.tron import USDT_CONTRACT_ADDRESS
+
+COMPANY_KEY = PrivateKey(bytes([7] * 32))
+REF_BLOCK_ID = "0000000003a1b2c3" + "ab" * 24
+FAILING_ADDRESS = PrivateKey(bytes([9] * 32)).public_key.to_base58check_address()
+
+
+def recipient(seed):
+    return PrivateKey(bytes([seed] * 32)).public_key.to_base58check_address()
+
+
+def read_fields(data):
+    """protobuf 메시지를 (필드 번호, 값) 목록으로 해석합니다 (검증용)."""
+    fields, pos = [], 0
+
+    def varint():
+        nonlocal pos
+        value, shift = 0, 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                return value
+
+    while pos < len(data):
+        key = varint()
+        if key & 7 == 0:
+            fields.append((key >> 3, varint()))
+        else:
+            length = varint()
+            fields.append((key >> 3, data[pos:pos + length]))
+            pos += length
+    return fields
+
+
+class FakeProvider:
+    def __init__(self, service):
+        self.service = service
+
+    def make_request(self, method, payload=None):
+        return self.service.handle(method, payload)
+
+
+class FakeNode:
+    def __init__(self, service):
+        self.client = self
+        self.provider = FakeProvider(service)
+        self.service = service
+
+    def get_latest_solid_block_id(self):
+        self.service.ref_block_calls += 1
+        return REF_BLOCK_ID
+
+
+class FakeTronService:
+    """노드 요청을 메모리에서 처리하고 서명을 검증하는 가짜 트론 서비스입니다."""
+
+    def __init__(self):
+        self.company_wallet = COMPANY_KEY
+        self.company_address = COMPANY_KEY.public_key.to_base58check_address()
+        self.usdt_contract = Contract(addr=USDT_CONTRACT_ADDRESS, abi=TRC20_ABI)
+        self.ref_block_calls = 0
+        self.broadcasts = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _call(self, fn, timeout, idempotent=False):
+        return fn(FakeNode(self))
+
+    def handle(self, method, payload):
+        if method == "wallet/getsignweight":
+            return {"transaction": {"transaction": {"txID": transaction_id(payload["raw_data"])}}}
+        assert method == "wallet/broadcasttransaction"
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+            self.broadcasts.append(payload)
+
+        assert payload["txID"] == transaction_id(payload["raw_data"])
+        signer = Signature.fromhex(payload["signature"][0]).recover_public_key_from_msg_hash(
+            bytes.fromhex(payload["txID"])
+        )
+        assert signer == COMPANY_KEY.public_key
+        recipient_hex = payload["raw_data"]["contract"][0]["parameter"]["value"]["data"][32:72]
+        if recipient_hex == PrivateKey(bytes([9] * 32)).public_key.to_hex_address()[2:]:
+            return {"code": "CONTRACT_VALIDATE_ERROR", "message": b"balance is not sufficient".hex()}
+        return {"result": True, "txid": payload["txID"]}
+
+
+def test_raw_data_encoding_follows_protocol():
+    """트랜잭션 raw_data가 프로토콜 필드 번호대로 인코딩되는지 테스트합니다."""
+    service = FakeTronService()
+    raw_data = BatchSender(service)._raw_data(TransferItem(1, recipient(2), Decimal("1.5")), REF_BLOCK_ID, 1_700_000_000_000)
+    encoded = encode_raw_data(raw_data)
+
+    fields = dict(read_fields(encoded))
+    assert fields[1] == bytes.fromhex(REF_BLOCK_ID[12:16])
+    assert fields[4] == bytes.fromhex(REF_BLOCK_ID[16:32])
+    assert fields[14] == 1_700_000_000_000
+    assert fields[18] == 100_000_000
+    contract = dict(read_fields(fields[11]))
+    assert contract[1] == 31
+    parameter = dict(read_fields(contract[2]))
+    assert parameter[1] == b"type.googleapis.com/protocol.TriggerSmartContract"
+    trigger = dict(read_fields(parameter[2]))
+    assert trigger[1].hex() == COMPANY_KEY.public_key.to_hex_address()
+    assert int.from_bytes(trigger[4][36:68], "big") == 1_500_000
+    assert transaction_id(raw_data) == hashlib.sha256(encoded).hexdigest()
+
+
+def test_batch_shares_ref_block_and_reports_per_item():
+    """배치 전체가 참조 블록 하나를 쓰고 항목별 결과를 돌려주는지 테스트합니다."""
+    service = FakeTronService()
+    items = [TransferItem(i, recipient(i + 10), Decimal("2")) for i in range(12)]
+    items.append(TransferItem("bad", "Tnotanaddress", Decimal("1")))
+    items.append(TransferItem("rejected", FAILING_ADDRESS, Decimal("1")))
+
+    result = BatchSender(service, concurrency=3).send(items)
+
+    assert service.ref_block_calls == 1
+    assert service.max_active <= 3
+    assert len(service.broadcasts) == 13
+    assert [outcome.key for outcome in result.outcomes] == [item.key for item in items]
+    assert len(result.succeeded) == 12
+    assert len({outcome.txid for outcome in result.succeeded}) == 12
+    failures = {outcome.key: outcome.error for outcome in result.failed}
+    assert failures["bad"] == "Invalid destination address"
+    assert failures["rejected"] == "CONTRACT_VALIDATE_ERROR: balance is not sufficient"
+
+
+def test_encoding_mismatch_aborts_batch():
+    """노드와 트랜잭션 ID가 다르면 아무것도 브로드캐스트하지 않는지 테스트합니다."""
+    service = FakeTronService()
+    original = service.handle
+
+    def mismatching(method, payload):
+        if method == "wallet/getsignweight":
+            return {"transaction": {"transaction": {"txID": "00" * 32}}}
+        return original(method, payload)
+
+    service.handle = mismatching
+    result = BatchSender(service).send([TransferItem(1, recipient(3), Decimal("1"))])
+
+    assert not service.broadcasts
+    assert result.failed[0].error.startswith("Batch not sent")
+
+
+def test_identical_items_get_distinct_txids():
+    """같은 주소와 금액의 항목이 한 배치에 있어도 서로 다른 트랜잭션이 되는지 테스트합니다."""
+    service = FakeTronService()
+    items = [TransferItem(key, recipient(4), Decimal("5")) for key in ("first", "second")]
+
+    result = BatchSender(service).send(items)
+
+    assert len(result.succeeded) == 2
+    assert result.outcomes[0].txid != result.outcomes[1].txid
+    assert len({payload["txID"] for payload in service.broadcasts}) == 2
@@ -0,0 +1,249 @@
+"""
+블록 스캔 입금 감지기를 위한 테스트 케이스입니다.
+"""
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from tronpy.keys import PrivateKey
+
+from app import models
+from app.crud import crud_transaction
+from app.utils.backfill import DepositBackfill, split_range
+from app.utils.block_scanner import TRANSFER_TOPIC, BlockScanner, DepositAddressSet, raw_address
+from app.utils.block_store import BlockStore
+from app.utils.tron import USDT_CONTRACT_ADDRESS
+
+SENDER = PrivateKey(bytes([1] * 32)).public_key.to_base58check_address()
+
+
+def transfer_log(to_address, amount, contract=USDT_CONTRACT_ADDRESS):
+    """TRC20 Transfer 이벤트 로그를 생성합니다."""
+    return {
+        "address": raw_address(contract).hex(),
+        "topics": [
+            TRANSFER_TOPIC,
+            "0" * 24 + raw_address(SENDER).hex(),
+            "0" * 24 + raw_address(to_address).hex(),
+        ],
+        "data": f"{amount:064x}",
+    }
+
+
+class FakeTronService:
+    """블록 영수증을 메모리에서 제공하는 가짜 트론 서비스입니다."""
+
+    def __init__(self, head, blocks):
+        self.head = head
+        self.blocks = blocks
+        self.fetched = []
+        self.forks = {}  # 블록 번호 -> 재구성 후 블록 해시
+
+    def get_latest_block_number(self):
+        return self.head
+
+    def block_hash(self, block_number):
+        return self.forks.get(block_number, f"{block_number:064x}")
+
+    def get_block_header(self, block_number):
+        return {
+            "number": block_number,
+            "hash": self.block_hash(block_number),
+            "parent_hash": self.block_hash(block_number - 1),
+            "timestamp": 0,
+        }
+
+    def get_block_transaction_info(self, block_number):
+        self.fetched.append(block_number)
+        return self.blocks.get(block_number, [])
+
+
+@pytest.fixture
+def deposit_address(db_session):
+    """입금 주소가 등록된 사용자를 생성하고 (사용자 ID, 주소)를 반환합니다."""
+    address = PrivateKey(bytes([2] * 32)).public_key.to_base58check_address()
+    user = models.User(email="scanner@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(models.DepositAddress(user_id=user.id, address=address))
+    db_session.commit()
+    return user.id, address
+
+
+@pytest.mark.parametrize("use_bloom", [False, True])
+def test_scanner_credits_matching_transfers_after_confirmation(db_session, deposit_address, use_bloom):
+    """입금 주소로 온 USDT 전송만 대기 상태로 기록하고 확정 후 일괄 반영하는지 테스트합니다."""
+    user_id, address = deposit_address
+    other = PrivateKey(bytes([3] * 32)).public_key.to_base58check_address()
+    blocks = {
+        101: [{"id": "aa" * 32, "receipt": {"result": "SUCCESS"}, "log": [
+            transfer_log(address, 5_000_000),
+            transfer_log(other, 9_000_000),
+        ]}],
+        102: [
+            {"id": "bb" * 32, "receipt": {"result": "REVERT"}, "log": [transfer_log(address, 1)]},
+            {"id": "cc" * 32, "log": [transfer_log(address, 7_000_000, contract=other)]},
+        ],
+        103: [{"id": "dd" * 32, "log": [transfer_log(address, 2_500_000)]}],
+    }
+    tron_service = FakeTronService(head=100, blocks=blocks)
+    scanner = BlockScanner(
+        DepositAddressSet(use_bloom=use_bloom),
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        tron_service=tron_service,
+        confirmations=12
+    )
+
+    # 첫 실행은 현재 헤드부터 시작
+    assert scanner.run_once() == 0
+    assert tron_service.fetched == [100]
+
+    tron_service.head = 103
+    assert scanner.run_once() == 0
+    assert tron_service.fetched == [100, 101, 102, 103]
+    deposits = db_session.query(models.Transaction).order_by(models.Transaction.block_number).all()
+    assert [deposit.block_number for deposit in deposits] == [101, 103]
+    assert {deposit.status for deposit in deposits} == {models.TransactionStatus.PENDING}
+    assert db_session.query(models.Balance).count() == 0
+
+    tron_service.head = 103 + 12
+    assert scanner.run_once() == 2
+    balance = db_session.query(models.Balance).filter_by(user_id=user_id, asset="USDT").one()
+    assert balance.amount == Decimal("7.5")
+    db_session.expire_all()
+    assert {deposit.status for deposit in deposits} == {models.TransactionStatus.COMPLETED}
+
+
+def test_scanner_rolls_back_deposits_orphaned_by_reorg(db_session, deposit_address):
+    """체인 재구성으로 사라진 블록의 대기 입금을 취소하고 새 블록을 다시 스캔하는지 테스트합니다."""
+    user_id, address = deposit_address
+    blocks = {
+        101: [{"id": "aa" * 32, "log": [transfer_log(address, 1_000_000)]}],
+        102: [{"id": "bb" * 32, "log": [transfer_log(address, 2_000_000)]}],
+    }
+    tron_service = FakeTronService(head=100, blocks=blocks)
+    scanner = BlockScanner(
+        DepositAddressSet(),
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        tron_service=tron_service,
+        confirmations=12
+    )
+    scanner.run_once()
+    tron_service.head = 102
+    scanner.run_once()
+
+    # 블록 102가 다른 내용의 블록으로 교체됨
+    tron_service.forks[102] = "f" * 64
+    blocks[102] = [{"id": "cc" * 32, "log": [transfer_log(address, 4_000_000)]}]
+    tron_service.head = 103
+    scanner.run_once()
+    orphaned = db_session.query(models.Transaction).filter_by(ref_tx_id="bb" * 32).one()
+    assert orphaned.status == models.TransactionStatus.CANCELLED
+
+    scanner.run_once()
+    tron_service.head = 103 + 12
+    assert scanner.run_once() == 2
+    balance = db_session.query(models.Balance).filter_by(user_id=user_id, asset="USDT").one()
+    assert balance.amount == Decimal(5)
+
+
+def test_scanner_skips_blocks_without_deposit_addresses(db_session):
+    """입금 주소가 하나도 없으면 블록을 가져오지 않고 체크포인트만 헤드로 옮기는지 테스트합니다."""
+    tron_service = FakeTronService(head=500, blocks={})
+    scanner = BlockScanner(
+        DepositAddressSet(),
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        tron_service=tron_service
+    )
+    scanner.run_once()
+    tron_service.head = 650
+    scanner.run_once()
+
+    assert tron_service.fetched == []
+    assert db_session.query(models.ChainCursor).filter_by(name=scanner.cursor_name).one().block_number == 650
+
+
+def test_backfill_merges_chunks_in_order_and_is_idempotent(db_session, deposit_address):
+    """병렬 백필이 블록 순서대로 반영되고 재실행해도 중복 반영하지 않는지 테스트합니다."""
+    user_id, address = deposit_address
+    blocks = {
+        number: [{"id": f"{number:064x}", "log": [transfer_log(address, 1_000_000)]}]
+        for number in range(200, 220, 3)
+    }
+    scanner = BlockScanner(DepositAddressSet(), tron_service=FakeTronService(head=0, blocks=blocks))
+    backfill = DepositBackfill(
+        scanner,
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        workers=3,
+        chunk_size=2
+    )
+    assert split_range(200, 204, 2) == [(200, 201), (202, 203), (204, 204)]
+
+    progress = []
+    report = backfill.run(200, 219, progress=lambda r: progress.append(r.blocks_done))
+    assert report.blocks_done == 20
+    assert report.deposits_credited == len(blocks)
+    assert progress == sorted(progress)
+
+    deposits = db_session.query(models.Transaction).order_by(models.Transaction.id).all()
+    assert [deposit.block_number for deposit in deposits] == sorted(blocks)
+    assert backfill.resume_point() == 219
+
+    assert backfill.run(200, 219).deposits_credited == 0
+    balance = db_session.query(models.Balance).filter_by(user_id=user_id, asset="USDT").one()
+    assert balance.amount == Decimal(len(blocks))
+
+
+def test_same_deposit_is_credited_once_under_races(db_session, deposit_address):
+    """한 트랜잭션의 여러 전송은 각각 반영하고 동시에 기록된 같은 입금은 한 번만 반영하는지 테스트합니다."""
+    user_id, address = deposit_address
+    scanner = BlockScanner(DepositAddressSet(), tron_service=FakeTronService(head=0, blocks={}))
+    scanner.refresh_addresses(db_session)
+    tx_infos = [{"id": "ab" * 32, "log": [transfer_log(address, 1_000_000), transfer_log(address, 2_000_000)]}]
+    deposits = scanner.extract_deposits(10, tx_infos)
+
+    # 다른 작업자가 중복 확인 이후 첫 번째 전송을 먼저 기록한 상황
+    other = sessionmaker(bind=db_session.get_bind())()
+    crud_transaction.credit_deposits(other, deposits[:1])
+    other.close()
+    original_query = db_session.query
+
+    class MissedCheck:
+        def filter(self, *args):
+            return self
+
+        def all(self):
+            return []
+
+    db_session.query = lambda *entities: (
+        MissedCheck() if entities[0] is models.Transaction.ref_tx_id else original_query(*entities)
+    )
+    created = crud_transaction.credit_deposits(db_session, deposits)
+    db_session.query = original_query
+
+    assert [(t.log_index, t.amount) for t in created] == [(1, Decimal("2"))]
+    rows = db_session.query(models.Transaction).filter_by(ref_tx_id="ab" * 32).all()
+    assert sorted(row.log_index for row in rows) == [0, 1]
+    balance = db_session.query(models.Balance).filter_by(user_id=user_id, asset="USDT").one()
+    assert balance.amount == Decimal("3")
+    assert crud_transaction.credit_deposits(db_session, deposits) == []
+
+
+def test_scanner_replays_cached_blocks_without_fetching(tmp_path, db_session, deposit_address):
+    """캐시된 블록은 노드에 다시 요청하지 않고 디스크에서 재생하는지 테스트합니다."""
+    user_id, address = deposit_address
+    blocks = {500: [{"id": "ee" * 32, "log": [transfer_log(address, 3_000_000)]}]}
+    address_set = DepositAddressSet()
+    address_set.refresh(db_session, full=True)
+    store = BlockStore(str(tmp_path), max_bytes=10 ** 6)
+
+    first = FakeTronService(head=0, blocks=blocks)
+    expected = BlockScanner(address_set, tron_service=first, block_store=store).scan_block(500)
+    assert first.fetched == [500]
+
+    second = FakeTronService(head=0, blocks={})
+    assert BlockScanner(address_set, tron_service=second, block_store=store).scan_block(500) == expected
+    assert second.fetched == []
+    assert expected[0]["user_id"] == user_id and expected[0]["amount"] == Decimal(3)
+    store.close()
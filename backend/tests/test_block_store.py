@@ -0,0 +1,87 @@
+"""
+로컬 블록 이벤트 캐시를 위한 테스트 케이스입니다.
+"""
+
+import os
+
+import pytest
+
+from app.utils.block_store import BlockStore, BlockStoreLockedError, encode_events, iter_events
+
+
+def make_events(count, seed):
+    """테스트용 Transfer 이벤트를 생성합니다."""
+    return [
+        (bytes([seed, i]) * 16, bytes([1]) * 20, bytes([seed]) * 20, 10 ** 6 * (i + 1))
+        for i in range(count)
+    ]
+
+
+def decode(record):
+    """블록 레코드를 비교 가능한 튜플 목록으로 변환합니다."""
+    return [
+        (bytes(tx_id), bytes(sender), bytes(recipient), int.from_bytes(amount, "big"))
+        for tx_id, sender, recipient, amount in iter_events(record)
+    ]
+
+
+def test_block_store_round_trip_and_reopen(tmp_path):
+    """저장한 블록을 그대로 읽고 다시 열어도 유지되는지 테스트합니다."""
+    store = BlockStore(str(tmp_path), max_bytes=10 ** 6)
+    store.put(1000, encode_events(make_events(3, 1)))
+    store.put(1002, encode_events([]))
+
+    assert decode(store.get(1000)) == make_events(3, 1)
+    assert decode(store.get(1002)) == []
+    assert store.get(1001) is None
+    assert store.get(999) is None
+    store.close()
+
+    reopened = BlockStore(str(tmp_path), max_bytes=10 ** 6)
+    assert decode(reopened.get(1000)) == make_events(3, 1)
+
+    reopened.invalidate_from(1001)
+    assert reopened.get(1002) is None
+    assert reopened.get(1000) is not None
+    reopened.close()
+
+
+def test_block_store_evicts_oldest_segments(tmp_path):
+    """크기 제한을 넘으면 오래된 세그먼트부터 삭제하는지 테스트합니다."""
+    record_size = len(encode_events(make_events(4, 0)))
+    store = BlockStore(str(tmp_path), max_bytes=record_size * 4, segment_bytes=record_size * 2)
+
+    for block_number in range(1, 11):
+        store.put(block_number, encode_events(make_events(4, block_number)))
+
+    assert store.size_bytes() <= record_size * 4
+    assert store.get(1) is None
+    assert decode(store.get(10)) == make_events(4, 10)
+    store.close()
+
+
+def test_block_store_index_is_bounded(tmp_path):
+    """인덱스는 최근 블록 수만큼의 고정 크기이고 오래된 블록 자리를 재사용하는지 테스트합니다."""
+    store = BlockStore(str(tmp_path), max_bytes=10 ** 6, index_blocks=8)
+    index_size = os.path.getsize(tmp_path / "index.bin")
+
+    for block_number in range(1_000_000, 1_000_020):
+        store.put(block_number, encode_events(make_events(1, block_number % 256)))
+
+    assert os.path.getsize(tmp_path / "index.bin") == index_size
+    assert store.get(1_000_011) is None
+    assert decode(store.get(1_000_019)) == make_events(1, 1_000_019 % 256)
+    # 인덱스 범위보다 오래된 블록은 저장하지 않음
+    store.put(1_000_000, encode_events([]))
+    assert store.get(1_000_000) is None
+    store.close()
+
+
+def test_block_store_directory_is_locked(tmp_path):
+    """이미 사용 중인 디렉터리는 다시 열 수 없고 닫으면 다시 열리는지 테스트합니다."""
+    store = BlockStore(str(tmp_path), max_bytes=10 ** 6)
+    with pytest.raises(BlockStoreLockedError):
+        BlockStore(str(tmp_path), max_bytes=10 ** 6)
+
+    store.close()
+    BlockStore(str(tmp_path), max_bytes=10 ** 6).close()
@@ -0,0 +1,94 @@
+"""
+회사 지갑 잔액 스냅샷과 출금 예약을 위한 테스트 케이스입니다.
+"""
+
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+from app.utils import company_wallet
+from app.utils.company_wallet import CompanyBalanceSnapshot
+
+
+class FakeTronService:
+    """조회 횟수를 세고 설정된 잔액을 돌려주는 가짜 트론 서비스입니다."""
+
+    company_address = "TCompanyWallet"
+
+    def __init__(self, usdt="100"):
+        self.balances = {"TRX": Decimal("50"), "USDT": Decimal(usdt)}
+        self.reads = 0
+
+    def fetch_account_balance(self, address):
+        self.reads += 1
+        return dict(self.balances)
+
+
+@pytest.fixture
+def tron(monkeypatch):
+    service = FakeTronService()
+    monkeypatch.setattr(company_wallet, "get_tron_service", lambda: service)
+    return service
+
+
+def test_concurrent_reservations_never_exceed_snapshot(tron):
+    """동시에 예약해도 스냅샷 잔액을 넘겨 예약되지 않는지 테스트합니다."""
+    snapshot = CompanyBalanceSnapshot(max_age=60, settle_seconds=10)
+    snapshot.refresh()
+    results = []
+    start = threading.Barrier(20)
+
+    def reserve():
+        start.wait()
+        results.append(snapshot.reserve("USDT", Decimal("7")))
+
+    threads = [threading.Thread(target=reserve) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    granted = [reservation_id for reservation_id in results if reservation_id is not None]
+    assert len(granted) == 14
+    assert len(set(granted)) == 14
+    assert snapshot.available("USDT") == Decimal("2")
+    assert tron.reads == 1
+
+
+def test_release_restores_and_commit_settles_after_refresh(tron):
+    """예약 해제 시 가용액이 돌아오고 브로드캐스트된 예약은 정산 시간 이후 갱신에서 사라지는지 테스트합니다."""
+    snapshot = CompanyBalanceSnapshot(max_age=60, settle_seconds=0)
+    first = snapshot.reserve("USDT", Decimal("60"))
+    assert snapshot.reserve("USDT", Decimal("60")) is None
+
+    snapshot.release(first)
+    assert snapshot.available("USDT") == Decimal("100")
+    second = snapshot.reserve("USDT", Decimal("60"))
+    assert second is not None
+
+    # 브로드캐스트 후에는 체인 잔액에 반영될 때까지 계속 차감
+    snapshot.commit(second)
+    snapshot.record_outflow("USDT", Decimal("5"))
+    assert snapshot.pending_outflow("USDT") == Decimal("65")
+    tron.balances["USDT"] = Decimal("35")
+    snapshot.refresh()
+    assert snapshot.pending_outflow("USDT") == Decimal("0")
+    assert snapshot.available("USDT") == Decimal("35")
+
+
+def test_stale_snapshot_is_refreshed(tron):
+    """스냅샷이 없거나 최대 수명을 넘기면 예약 전에 다시 조회하는지 테스트합니다."""
+    snapshot = CompanyBalanceSnapshot(max_age=30, settle_seconds=10)
+    assert snapshot.available("USDT") == Decimal("100")
+    assert tron.reads == 1
+
+    snapshot.reserve("USDT", Decimal("1"))
+    assert tron.reads == 1
+
+    tron.balances["USDT"] = Decimal("3")
+    snapshot.refreshed_at = time.monotonic() - 31
+    assert snapshot.reserve("USDT", Decimal("5")) is None
+    assert tron.reads == 2
+    assert snapshot.available("USDT") == Decimal("2")
@@ -0,0 +1,117 @@
+"""
+TronGrid 입금 인덱서를 위한 테스트 케이스입니다.
+녹화된 TronGrid 응답 페이지를 재생하는 로컬 HTTP 서버를 사용합니다.
+"""
+
+import json
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.utils.deposit_indexer import DepositIndexer
+from app.utils.trongrid import TronGridClient
+
+FIXTURE = json.loads(
+    (Path(__file__).parent / "fixtures" / "trongrid_trc20_pages.json").read_text()
+)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """녹화된 페이지를 fingerprint 기준으로 재생하는 핸들러입니다."""
+
+    def do_GET(self):
+        query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        self.server.requests.append(query)
+        fingerprint = query.get("fingerprint", "")
+
+        if fingerprint in self.server.failing_fingerprints:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        page = dict(FIXTURE["pages"][fingerprint])
+        min_timestamp = int(query.get("min_timestamp", 0))
+        page["data"] = [item for item in page["data"] if item["block_timestamp"] >= min_timestamp]
+
+        body = json.dumps(page).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def trongrid_server():
+    """녹화된 TronGrid 페이지를 재생하는 로컬 서버를 실행합니다."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+    server.requests = []
+    server.failing_fingerprints = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def deposit_user(db_session):
+    """입금 주소가 등록된 사용자를 생성합니다."""
+    user = models.User(email="depositor@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(models.DepositAddress(user_id=user.id, address=FIXTURE["address"]))
+    db_session.commit()
+    return user
+
+
+def make_indexer(server, db_session):
+    """로컬 서버를 바라보는 인덱서를 생성합니다."""
+    host, port = server.server_address
+    client = TronGridClient(f"http://{host}:{port}", page_size=2)
+    return DepositIndexer(
+        client,
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        contract_address=FIXTURE["contract_address"]
+    )
+
+
+def test_indexer_credits_all_pages_once(trongrid_server, db_session, deposit_user):
+    """모든 페이지를 따라가며 중복 없이 입금을 반영하는지 테스트합니다."""
+    indexer = make_indexer(trongrid_server, db_session)
+
+    assert indexer.run_once() == 4
+    assert indexer.run_once() == 0
+
+    balance = db_session.query(models.Balance).filter_by(user_id=deposit_user.id, asset="USDT").one()
+    assert balance.amount == Decimal("133.75")
+    assert db_session.query(models.Transaction).filter_by(type=models.TransactionType.DEPOSIT).count() == 4
+
+
+def test_indexer_resumes_from_persisted_cursor(trongrid_server, db_session, deposit_user):
+    """실패 후 새 인덱서가 저장된 커서에서 이어서 인덱싱하는지 테스트합니다."""
+    trongrid_server.failing_fingerprints.add("fp-page-3")
+    make_indexer(trongrid_server, db_session).run_once()
+    assert db_session.query(models.Transaction).count() == 3
+
+    cursor = db_session.query(models.ChainCursor).one()
+    assert cursor.fingerprint == "fp-page-3"
+
+    # 재시작: 이미 받은 페이지는 다시 요청하지 않아야 함
+    trongrid_server.failing_fingerprints.clear()
+    trongrid_server.requests.clear()
+    assert make_indexer(trongrid_server, db_session).run_once() == 1
+    assert [request.get("fingerprint") for request in trongrid_server.requests] == ["fp-page-3"]
+
+    db_session.refresh(cursor)
+    assert cursor.fingerprint is None
+    assert cursor.min_timestamp == 1700000009000
@@ -0,0 +1,168 @@
+"""
+프로세스 내 가상 트론 체인(TRON_NETWORK=fake)을 위한 테스트 케이스입니다.
+"""
+
+import time
+from decimal import Decimal
+
+import pytest
+from tronpy.keys import PrivateKey
+
+from app.core.config import settings
+from app.utils import fake_tron, tron
+
+COMPANY_KEY = PrivateKey(bytes(range(1, 33)))
+RECIPIENT = PrivateKey(bytes(range(2, 34))).public_key.to_base58check_address()
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_network(monkeypatch, tmp_path):
+    """수동 시계로 블록을 만드는 가상 체인 위에 실제 TronService를 구성합니다."""
+    clock = ManualClock()
+    chain = fake_tron.FakeTronChain(block_interval=3.0, clock=clock)
+    chain.add_contract(tron.USDT_CONTRACT_ADDRESS)
+    chain.mint(COMPANY_KEY.public_key.to_base58check_address(), trx=1000 * 10 ** 6, tokens=500 * 10 ** 6)
+    monkeypatch.setattr(fake_tron, "_chain", chain)
+    monkeypatch.setattr(settings, "tron_network", "fake")
+    monkeypatch.setattr(settings, "company_wallet_private_key", COMPANY_KEY.hex())
+    monkeypatch.setattr(settings, "contract_abi_cache_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "block_height_max_staleness", 0.0)
+    return chain, clock, tron.TronService()
+
+
+def test_transfer_is_mined_confirmed_and_indexed(fake_network):
+    """브로드캐스트한 USDT 전송이 다음 블록에 포함되고 확인 수와 TronGrid 기록에 반영되는지 테스트합니다."""
+    chain, clock, service = fake_network
+
+    txid = service.send_usdt(RECIPIENT, Decimal("12.5"))
+    assert txid and service.check_transaction_status(txid)["exists"] is False
+
+    clock.now += 3
+    receipts = service.get_block_transaction_info(chain.head)
+    assert [r["id"] for r in receipts] == [txid]
+    assert service.fetch_account_balance(RECIPIENT)["USDT"] == Decimal("12.5")
+    company = service.fetch_account_balance(service.company_address)
+    assert company["USDT"] == Decimal("487.5") and company["TRX"] < Decimal("1000")
+    # 확정 전에는 솔리디티 노드와 TronGrid에 보이지 않음
+    assert service.get_usdt_transactions(RECIPIENT) == []
+
+    clock.now += 3 * tron.MIN_CONFIRMATIONS
+    status = service.check_transaction_status(txid)
+    assert status["success"] and status["confirmed"]
+    assert [t["tx_id"] for t in service.get_usdt_transactions(RECIPIENT)] == [txid]
+    header = service.get_block_header(chain.head)
+    assert header["parent_hash"] == service.get_block_header(chain.head - 1)["hash"]
+
+    # 잔액보다 큰 전송은 블록에 포함되지만 실패로 기록됨
+    failed = service.send_usdt(RECIPIENT, Decimal("1000"))
+    clock.now += 3
+    assert chain.handle("wallet/gettransactioninfobyid", {"value": failed})["receipt"]["result"] == "REVERT"
+
+
+def test_chain_is_deterministic_and_faults_are_injected():
+    """같은 시드와 시계면 같은 체인이 만들어지고 지연/오류가 시드대로 주입되는지 테스트합니다."""
+    def build():
+        clock = ManualClock()
+        clock.now = 1_700_000_000.0
+        chain = fake_tron.FakeTronChain(block_interval=3.0, seed=7, transfers_per_block=5, clock=clock)
+        chain.add_contract(tron.USDT_CONTRACT_ADDRESS)
+        clock.now += 30
+        return chain
+
+    first, second = build(), build()
+    assert first.head == second.head == 10
+    assert first.handle("wallet/getnowblock", {}) == second.handle("wallet/getnowblock", {})
+    assert len(first.handle("wallet/gettransactioninfobyblocknum", {"num": 4})) == 5
+    assert first.broadcast({"txID": "00" * 32, "raw_data": {"expiration": 0}})["code"] == "TRANSACTION_EXPIRATION_ERROR"
+
+    def outcomes(error_rate):
+        provider = fake_tron.FakeTronProvider(first, inject=fake_tron.FailureInjector(latency=0.002, error_rate=error_rate, seed=3))
+        results = []
+        for _ in range(20):
+            try:
+                provider.make_request("wallet/getnodeinfo")
+                results.append(True)
+            except ConnectionError:
+                results.append(False)
+        return results
+
+    started = time.perf_counter()
+    flaky = outcomes(0.3)
+    assert time.perf_counter() - started >= 20 * 0.002
+    assert flaky == outcomes(0.3) and 0 < flaky.count(False) < 20
+    assert all(outcomes(0.0))
+
+
+def test_timed_out_send_reports_txid_in_flight(fake_network, monkeypatch):
+    """브로드캐스트가 데드라인을 넘기면 실패 대신 txid와 함께 결과 미확정을 알리는지 테스트합니다."""
+    chain, clock, service = fake_network
+    broadcast = chain.broadcast
+
+    def slow_broadcast(tx):
+        time.sleep(0.3)
+        return broadcast(tx)
+
+    monkeypatch.setattr(chain, "broadcast", slow_broadcast)
+    monkeypatch.setattr(settings, "tron_broadcast_timeout", 0.1)
+
+    with pytest.raises(tron.BroadcastUnknownError) as error:
+        service.send_usdt(RECIPIENT, Decimal("3"))
+
+    # 늦게 도착한 브로드캐스트도 같은 txid로 블록에 포함되어 대조 가능
+    time.sleep(0.4)
+    clock.now += 3
+    assert [r["id"] for r in service.get_block_transaction_info(chain.head)] == [error.value.txid]
+
+
+def test_block_height_is_cached_until_stale(fake_network, monkeypatch):
+    """블록 높이는 최대 수명 동안 캐시에서 응답하고 오래되면 노드에서 다시 읽는지 테스트합니다."""
+    chain, clock, service = fake_network
+    handle = chain.handle
+    reads = []
+
+    def counting_handle(method, params):
+        if method == "wallet/getnodeinfo":
+            reads.append(method)
+        return handle(method, params)
+
+    class StaleClock:
+        """캐시 수명 판단에 쓰는 단조 시계를 수동으로 진행합니다."""
+
+        def __init__(self):
+            self.now = time.monotonic()
+
+        def monotonic(self):
+            return self.now
+
+        def __getattr__(self, name):
+            return getattr(time, name)
+
+    monotonic = StaleClock()
+    monkeypatch.setattr(chain, "handle", counting_handle)
+    monkeypatch.setattr(tron, "time", monotonic)
+    service.block_height = tron.BlockHeightCache(max_staleness=5.0)
+
+    first = service.get_latest_block_number()
+    assert first == chain.head and len(reads) == 1
+
+    # 수명 안에서는 체인이 진행해도 캐시된 높이를 그대로 사용
+    clock.now += 6
+    monotonic.now += 4
+    assert service.get_latest_block_number() == first and len(reads) == 1
+
+    # 수명이 지나면 노드에서 새 높이를 읽음
+    monotonic.now += 2
+    assert service.get_latest_block_number() == first + 2 and len(reads) == 2
+    assert service.block_height.age == 0
+
+    # 높이는 뒤로 가지 않음
+    service.block_height.update(first)
+    assert service.block_height.get() == first + 2
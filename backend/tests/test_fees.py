@@ -0,0 +1,113 @@
+"""
+출금 수수료 추정기를 위한 테스트 케이스입니다.
+"""
+
+from decimal import Decimal
+
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.utils.fees import DEFAULT_ENERGY, RECIPIENT_EXISTING, RECIPIENT_NEW, FeeEstimator
+
+HOLDER = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+NEW_ADDRESS = "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+
+
+class FakeFunctions:
+    def __init__(self, service):
+        self.service = service
+
+    def balanceOf(self, address):
+        self.service.balance_calls += 1
+        return 5_000_000 if address == HOLDER else 0
+
+
+class FakeContract:
+    def __init__(self, service):
+        self.functions = FakeFunctions(service)
+
+
+class FakeNode:
+    def __init__(self, service):
+        self.client = self
+        self.service = service
+
+    def get_chain_parameters(self):
+        self.service.parameter_calls += 1
+        return [{"key": "getEnergyFee", "value": 210}, {"key": "getTransactionFee", "value": 1000}]
+
+    def contract(self, contract):
+        return FakeContract(self.service)
+
+
+class FakeTronService:
+    """체인 파라미터와 USDT 잔액을 제공하는 가짜 트론 서비스입니다."""
+
+    def __init__(self):
+        self.usdt_contract = object()
+        self.parameter_calls = 0
+        self.balance_calls = 0
+
+    def _call(self, fn, timeout, idempotent=False):
+        return fn(FakeNode(self))
+
+
+def test_fee_limit_uses_chain_price_and_observations():
+    """체인 가격과 관측된 에너지 사용량으로 fee_limit을 정하는지 테스트합니다."""
+    service = FakeTronService()
+    estimator = FeeEstimator(service, margin=1.2, refresh_interval=600)
+
+    # 관측 전에는 기본 에너지 사용량 사용
+    assert estimator.fee_limit(RECIPIENT_EXISTING) == int(DEFAULT_ENERGY[RECIPIENT_EXISTING] * 210 * 1.2)
+    for energy in (30_000, 31_000, 32_000, 31_500, 30_500):
+        estimator.observe(RECIPIENT_EXISTING, energy, 345)
+
+    assert estimator.fee_limit(RECIPIENT_EXISTING) == int(32_000 * 210 * 1.2)
+    assert estimator.expected_burn(RECIPIENT_EXISTING) == 31_000 * 210 + 345 * 1000
+    assert estimator.fee_limit(RECIPIENT_NEW) > estimator.fee_limit(RECIPIENT_EXISTING)
+    # 가격은 갱신 주기 동안 캐시
+    assert service.parameter_calls == 1
+
+
+def test_recipients_are_classified_by_usdt_balance():
+    """USDT 보유 여부로 수신자 유형을 구분하고 배치 비용을 합산하는지 테스트합니다."""
+    estimator = FeeEstimator(FakeTronService())
+    types = estimator.classify([HOLDER, NEW_ADDRESS, HOLDER])
+    assert types == [RECIPIENT_EXISTING, RECIPIENT_NEW, RECIPIENT_EXISTING]
+    # 같은 주소는 캐시 유지 시간 동안 다시 조회하지 않음
+    assert estimator.recipient_type(HOLDER) == RECIPIENT_EXISTING
+    assert estimator.tron_service.balance_calls == 2
+    estimator.recipient_cache_ttl = 0
+    estimator.classify([HOLDER])
+    assert estimator.tron_service.balance_calls == 3
+
+    estimate = estimator.estimate_batch(types)
+    assert estimate["transfers"] == {RECIPIENT_EXISTING: 2, RECIPIENT_NEW: 1}
+    assert 0 < estimate["expected_burn_trx"] < estimate["max_burn_trx"]
+
+
+def test_observations_are_loaded_from_finalized_withdrawals(db_session):
+    """확정된 출금 영수증을 수신자 유형별 관측값으로 불러오는지 테스트합니다."""
+    user = models.User(email="fees@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.flush()
+    for i in range(6):
+        request = models.WithdrawalRequest(
+            user_id=user.id, amount=Decimal("1"), destination_address=NEW_ADDRESS,
+            status=models.TransactionStatus.COMPLETED, ref_tx_id=f"{i:064x}"
+        )
+        db_session.add(request)
+        db_session.flush()
+        db_session.add(models.WithdrawalJob(
+            withdrawal_request_id=request.id, status=models.WithdrawalJobStatus.SUCCEEDED,
+            attempts=1, recipient_type=RECIPIENT_NEW
+        ))
+        db_session.add(models.FinalizedTransaction(
+            tx_hash=f"{i:064x}", block_number=100 + i, success=True, energy_used=64_000, net_used=345
+        ))
+    db_session.commit()
+
+    estimator = FeeEstimator(FakeTronService())
+    estimator.ensure_loaded(sessionmaker(bind=db_session.get_bind())())
+    assert estimator.metrics()["recipients"][RECIPIENT_NEW]["samples"] == 6
+    assert estimator.fee_limit(RECIPIENT_NEW) == int(64_000 * 210 * 1.2)
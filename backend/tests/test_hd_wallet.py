@@ -0,0 +1,93 @@
+"""
+HD 입금 주소 파생을 위한 테스트 케이스입니다.
+"""
+
+import hashlib
+import hmac
+
+from coincurve import PrivateKey as CurvePrivateKey
+from fastapi.testclient import TestClient
+from tronpy.keys import PrivateKey
+
+from app import models
+from app.core.config import settings
+from app.crud import crud_deposit_address
+from app.utils.hd_wallet import HARDENED_OFFSET, ExtendedPrivateKey, ExtendedPublicKey, derive_address, derive_addresses
+
+# BIP32 테스트 벡터 1: m/0H/1/2H 와 m/0H/1/2H/2
+VECTOR_PARENT = "xpub6D4BDPcP2GT577Vvch3R8wDkScZWzQzMMUm3PWbmWvVJrZwQY4VUNgqFJPMM3No2dFDFGTsxxpG5uJh7n7epu4trkrX7x7DogT5Uv6fcLW5"
+VECTOR_CHILD = "xpub6FHa3pjLCk84BayeJxFW2SP4XRrFd1JYnxeLeU8EqN3vDfZmbqBqaGJAyiLjTAwm6ZLRQUMv1ZACTj37sR62cfN7fe5JnJ7dh8zL4fiyLHV"
+
+ACCOUNT_KEY = bytes(range(1, 33))
+ACCOUNT_CHAIN_CODE = bytes(range(100, 132))
+ACCOUNT_XPUB = ExtendedPublicKey(
+    CurvePrivateKey(ACCOUNT_KEY).public_key.format(compressed=True),
+    ACCOUNT_CHAIN_CODE,
+    depth=3,
+).to_string()
+
+
+def private_child(key, chain_code, index):
+    """개인키 기준 비강화 자식 키를 파생합니다 (검증용)."""
+    public_key = CurvePrivateKey(key).public_key.format(compressed=True)
+    digest = hmac.new(chain_code, public_key + index.to_bytes(4, "big"), hashlib.sha512).digest()
+    return CurvePrivateKey(key).add(digest[:32]).secret, digest[32:]
+
+
+def test_public_derivation_matches_bip32_vector():
+    """공개키 파생이 BIP32 테스트 벡터와 일치하는지 테스트합니다."""
+    child = ExtendedPublicKey.from_string(VECTOR_PARENT).derive_child(2)
+    assert child.to_string() == VECTOR_CHILD
+
+
+def test_private_derivation_matches_bip32_vector():
+    """개인키 파생(강화 포함)이 BIP32 테스트 벡터와 일치하는지 테스트합니다."""
+    digest = hmac.new(b"Bitcoin seed", bytes.fromhex("000102030405060708090a0b0c0d0e0f"), hashlib.sha512).digest()
+    master = ExtendedPrivateKey(digest[:32], digest[32:])
+    parent = master.derive_child(HARDENED_OFFSET).derive_child(1).derive_child(HARDENED_OFFSET + 2)
+    assert parent.public().to_string() == VECTOR_PARENT
+    assert parent.derive_child(2).public().to_string() == VECTOR_CHILD
+
+
+def test_derived_address_matches_private_key_address():
+    """xpub에서 파생한 주소가 같은 경로의 개인키 주소와 일치하는지 테스트합니다."""
+    chain_key, chain_code = private_child(ACCOUNT_KEY, ACCOUNT_CHAIN_CODE, 0)
+    for index in (0, 1, 42):
+        key, _ = private_child(chain_key, chain_code, index)
+        assert derive_address(ACCOUNT_XPUB, index) == PrivateKey(key).public_key.to_base58check_address()
+
+
+def test_parallel_derivation_matches_sequential():
+    """프로세스 풀 일괄 파생 결과가 순차 파생과 같은지 테스트합니다."""
+    indexes = [5, 1, 9, 2, 7, 3]
+    parallel = derive_addresses(ACCOUNT_XPUB, indexes, processes=2, batch_size=2)
+    assert parallel == [(index, derive_address(ACCOUNT_XPUB, index)) for index in indexes]
+
+
+def test_deposit_address_endpoint_returns_user_address(client: TestClient, auth_headers, monkeypatch):
+    """HD 주소 설정 시 사용자별 고유 입금 주소를 반환하는지 테스트합니다."""
+    monkeypatch.setattr(settings, "deposit_xpub", ACCOUNT_XPUB)
+
+    first = client.get("/api/v1/wallet/deposit/address", headers=auth_headers)
+    assert first.status_code == 200
+    user_id = client.get("/api/v1/auth/me", headers=auth_headers).json()["id"]
+    assert first.json()["address"] == derive_address(ACCOUNT_XPUB, user_id)
+    assert first.json()["memo"] is None
+
+    second = client.get("/api/v1/wallet/deposit/address", headers=auth_headers)
+    assert second.json()["address"] == first.json()["address"]
+
+
+def test_batch_keeps_addresses_stored_concurrently(db_session):
+    """배치 중 일부 주소가 먼저 저장되어 있어도 나머지 주소는 저장되는지 테스트합니다."""
+    users = [models.User(email=f"user{i}@example.com", password_hash="x") for i in range(4)]
+    db_session.add_all(users)
+    db_session.commit()
+    user_ids = [int(user.id) for user in users]
+    batch = [(user_id, user_id, address) for user_id, address in derive_addresses(ACCOUNT_XPUB, user_ids, processes=1)]
+    # 사용자가 주소 API를 먼저 호출한 경우
+    crud_deposit_address.create_hd_addresses(db_session, batch[1:2])
+
+    assert crud_deposit_address.create_hd_addresses(db_session, batch) == 3
+    assert crud_deposit_address.get_users_without_address(db_session) == []
+    assert db_session.query(models.DepositAddress).count() == 4
@@ -0,0 +1,93 @@
+"""
+고정 오프셋 TRC20 Transfer 로그 디코더를 위한 테스트 케이스입니다.
+"""
+
+from tronpy.contract import Contract
+from tronpy.keys import PrivateKey
+
+from app.utils.address import to_base58_address
+from app.utils.block_scanner import raw_address
+from app.utils.block_store import encode_events
+from app.utils.contracts import TRC20_ABI
+from app.utils.log_decoder import TRANSFER_TOPIC, TransferLogDecoder
+from app.utils.tron import USDT_CONTRACT_ADDRESS
+
+CONTRACT_HEX = raw_address(USDT_CONTRACT_ADDRESS).hex()
+
+
+def account(seed):
+    return raw_address(PrivateKey(bytes([seed] * 32)).public_key.to_base58check_address()).hex()
+
+
+def log(sender, recipient, data, address="41" + CONTRACT_HEX, topic=TRANSFER_TOPIC):
+    return {"address": address, "topics": [topic, "0" * 24 + sender, "0" * 24 + recipient], "data": data}
+
+
+def receipts():
+    """성공/실패 영수증, 다른 컨트랙트, 다른 이벤트, 짧거나 긴 data를 섞은 블록입니다."""
+    return [
+        {"id": "01" * 32, "receipt": {"result": "SUCCESS"}, "log": [
+            log(account(1), account(2), f"{5_000_000:064x}"),
+            log(account(2), account(3), f"{7:064x}", address=account(9)),
+            log(account(3), account(4), f"{(1 << 255) + 3:064x}"),
+        ]},
+        {"id": "02" * 32, "receipt": {"result": "REVERT"}, "log": [log(account(1), account(5), f"{9:064x}")]},
+        {"id": "03" * 32, "log": [
+            log(account(4), account(1), "ff"),
+            log(account(5), account(6), ""),
+            log(account(6), account(7), f"{11:064x}", topic="8c" * 32),
+            log(account(7), account(1), f"{12:064x}" + "0" * 64),
+        ]},
+        {"id": "04" * 32, "receipt": {"result": "SUCCESS"}},
+    ]
+
+
+def test_decoder_matches_tronpy_abi_decoding():
+    """고정 오프셋 디코딩 결과가 tronpy ABI 디코딩과 같은지 테스트합니다."""
+    transfer = Contract(addr=USDT_CONTRACT_ADDRESS, abi=TRC20_ABI).events.Transfer
+    expected = []
+    for info in receipts():
+        if info.get("receipt", {}).get("result", "SUCCESS") != "SUCCESS":
+            continue
+        for entry in info.get("log", ()):
+            if entry["address"][-40:] == CONTRACT_HEX and entry["topics"][0] == TRANSFER_TOPIC:
+                args = transfer.get_event_data({**entry, "data": entry["data"].rjust(64, "0")})["args"]
+                expected.append((info["id"], args["from"], args["to"], args["value"]))
+
+    events = TransferLogDecoder(CONTRACT_HEX).decode(receipts())
+
+    assert [
+        (tx_id.hex(), to_base58_address(sender), to_base58_address(recipient), amount)
+        for tx_id, sender, recipient, amount in events
+    ] == expected
+    assert [event[3] for event in events] == [5_000_000, (1 << 255) + 3, 255, 0, 12]
+
+
+def test_record_matches_block_store_encoding():
+    """디코딩한 블록 레코드가 블록 저장소 인코딩과 같은지 테스트합니다."""
+    decoder = TransferLogDecoder("41" + CONTRACT_HEX.upper())
+
+    record = decoder.decode_record(receipts())
+
+    assert record == encode_events(decoder.decode(receipts()))
+    assert decoder.decode_record([]) == encode_events([])
+    assert to_base58_address(bytes.fromhex(account(1))) == PrivateKey(bytes([1] * 32)).public_key.to_base58check_address()
+
+
+def test_malformed_logs_are_skipped():
+    """잘못된 hex나 길이의 로그는 건너뛰고 나머지 로그는 디코딩하는지 테스트합니다."""
+    decoder = TransferLogDecoder(CONTRACT_HEX)
+    blocks = receipts()
+    blocks[0]["log"].insert(1, log(account(1), account(2), "zz" * 32))
+    blocks[3]["log"] = [
+        log(account(2), account(1), f"{1:064x}"),
+        log(account(2), account(1), " " + f"{2:063x}"),
+        log(account(2), "xy" * 20, f"{3:064x}"),
+    ]
+    blocks.append({"id": "05" * 40, "log": [log(account(3), account(1), f"{4:064x}")]})
+    blocks.append({"log": [log(account(3), account(1), f"{5:064x}")]})
+    blocks.append({"id": "06" * 32, "log": [{"address": "41" + CONTRACT_HEX, "topics": [TRANSFER_TOPIC, 1, 2]}]})
+
+    events = decoder.decode(blocks)
+
+    assert [event[3] for event in events] == [5_000_000, (1 << 255) + 3, 255, 0, 12, 1]
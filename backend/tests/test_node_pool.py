@@ -0,0 +1,105 @@
+"""
+트론 풀노드 풀의 라우팅, 헤지 요청, 제외/복귀를 위한 테스트 케이스입니다.
+"""
+
+import time
+
+import pytest
+
+from app.utils.node_pool import MIN_SAMPLES_FOR_PERCENTILE, TronNode, TronNodePool
+
+
+class StubClient:
+    """최신 블록 번호만 응답하는 가짜 트론 클라이언트입니다."""
+
+    def __init__(self, block=100, fail=False):
+        self.block = block
+        self.fail = fail
+
+    def get_latest_block_number(self):
+        if self.fail:
+            raise ConnectionError("node down")
+        return self.block
+
+
+def make_pool(**kwargs):
+    """빠른 노드 a와 느린 노드 b로 구성된 풀을 생성합니다."""
+    fast, slow = TronNode("stub://a", StubClient()), TronNode("stub://b", StubClient())
+    for _ in range(MIN_SAMPLES_FOR_PERCENTILE):
+        fast.record_success(0.01)
+    slow.record_success(0.05)
+    return TronNodePool([slow, fast], **kwargs), fast, slow
+
+
+def test_fastest_node_is_preferred():
+    """EWMA 지연이 가장 낮은 정상 노드로 호출하고 측정 전 노드를 먼저 시도하는지 테스트합니다."""
+    pool, fast, slow = make_pool()
+
+    assert pool.primary is fast
+    assert pool.call(lambda node: node.endpoint_uri) == "stub://a"
+
+    fresh = TronNode("stub://c", StubClient())
+    pool.nodes.append(fresh)
+    assert pool.primary is fresh
+
+
+def test_slow_read_is_hedged_and_first_answer_wins():
+    """주 노드가 p95 지연 안에 응답하지 않으면 다음 노드로 헤지하고 먼저 온 응답을 쓰는지 테스트합니다."""
+    pool, fast, slow = make_pool()
+
+    def read(node):
+        if node is fast:
+            time.sleep(0.5)
+        return node.endpoint_uri
+
+    started = time.monotonic()
+    assert pool.call(read, idempotent=True) == "stub://b"
+    assert time.monotonic() - started < 0.4
+    assert slow.hedged_wins == 1
+
+    # 주 노드가 제때 응답하면 헤지하지 않음
+    assert pool.call(lambda node: node.endpoint_uri, idempotent=True) == "stub://a"
+    assert slow.hedged_wins == 1
+
+
+def test_writes_are_never_hedged():
+    """멱등이 아닌 호출은 느려도 한 노드에서 한 번만 실행되는지 테스트합니다."""
+    pool, fast, slow = make_pool()
+    calls = []
+
+    def broadcast(node):
+        calls.append(node.endpoint_uri)
+        time.sleep(0.1)
+        return node.endpoint_uri
+
+    assert pool.call(broadcast) == "stub://a"
+    assert pool.call(broadcast, timeout=1.0) == "stub://a"
+    assert calls == ["stub://a", "stub://a"]
+
+
+def test_failing_node_is_ejected_and_readmitted():
+    """연속 실패한 노드를 제외했다가 상태 확인에 성공하면 복귀시키고, 뒤처진 노드는 제외하는지 테스트합니다."""
+    pool, fast, slow = make_pool(max_failures=2, eject_seconds=60, max_block_lag=20)
+
+    def fail(node):
+        raise ConnectionError("node down")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            pool.call(fail)
+    assert not fast.is_healthy()
+    assert pool.primary is slow
+
+    pool.check_health()
+    assert fast.is_healthy() and pool.primary is fast
+
+    slow.client.block = 50
+    pool.check_health()
+    assert not slow.is_healthy()
+
+    fast.client.fail = True
+    pool.check_health()
+    pool.check_health()
+    assert not fast.is_healthy() and not slow.is_healthy()
+    # 모든 노드가 제외되면 가장 먼저 복귀할 노드로 계속 호출
+    assert pool.primary is min(pool.nodes, key=lambda node: node.ejected_until)
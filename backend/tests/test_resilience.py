@@ -0,0 +1,101 @@
+"""
+트론 호출 보호 기능(서킷 브레이커, 벌크헤드, 데드라인, 요청 병합)을 위한 테스트 케이스입니다.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.utils.resilience import (
+    Bulkhead,
+    BulkheadFullError,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    deadline,
+    remaining_time,
+)
+from app.utils.singleflight import SingleFlight
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """연속 실패 후 서킷이 열리고 재시도 시간이 지나면 한 번의 프로브를 허용하는지 테스트합니다."""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.05)
+
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # 하프 오픈 프로브
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # 프로브는 한 번만 허용
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_bulkhead_rejects_when_full():
+    """모든 슬롯이 사용 중이면 벌크헤드가 즉시 거부하는지 테스트합니다."""
+    bulkhead = Bulkhead("test", max_concurrent=1, max_wait=0.01)
+
+    with bulkhead.slot():
+        with pytest.raises(BulkheadFullError):
+            with bulkhead.slot():
+                pass
+
+    with bulkhead.slot():
+        assert bulkhead.in_use == 1
+    assert bulkhead.metrics()["rejected_calls"] == 1
+
+
+def test_nested_deadline_never_extends_outer():
+    """중첩된 데드라인이 바깥 데드라인을 늘리지 않는지 테스트합니다."""
+    assert remaining_time() is None
+
+    with deadline(0.05):
+        with deadline(10):
+            assert remaining_time() <= 0.05
+        time.sleep(0.06)
+        with pytest.raises(DeadlineExceededError):
+            remaining_time()
+
+
+def test_single_flight_collapses_concurrent_calls():
+    """동일한 키의 동시 호출이 한 번만 실행되고 결과를 공유하는지 테스트합니다."""
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    executions = []
+    results = []
+
+    def slow_call():
+        executions.append(1)
+        started.set()
+        release.wait(1)
+        return 42
+
+    def worker():
+        results.append(single_flight.do(("balance", "TAddr"), slow_call))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(1)
+
+    assert results == [42] * 5
+    assert len(executions) == 1
+    assert single_flight.metrics()["balance"]["shared"] == 4
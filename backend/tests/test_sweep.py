@@ -0,0 +1,135 @@
+"""
+입금 주소 스윕 계획과 실행을 위한 테스트 케이스입니다.
+"""
+
+import time
+from decimal import Decimal
+
+import base58
+from tronpy.keys import PrivateKey
+
+from app import models
+from app.utils.fees import RECIPIENT_EXISTING, FeeEstimator
+from app.utils.hd_wallet import ExtendedPrivateKey, derive_address, derive_private_key
+from app.utils.sweep import SweepExecutor, SweepPlanner
+
+ACCOUNT_XPRV = base58.b58encode_check(
+    bytes.fromhex("0488ade4") + bytes([3]) + b"\0" * 8 + bytes(range(100, 132)) + b"\0" + bytes(range(1, 33))
+).decode()
+ACCOUNT_XPUB = ExtendedPrivateKey.from_string(ACCOUNT_XPRV).public().to_string()
+HOT_WALLET = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+def fee_estimator():
+    estimator = FeeEstimator(None)
+    estimator.prices_updated_at = time.monotonic()
+    return estimator
+
+
+def add_deposits(db_session, amounts_by_user):
+    """사용자별 HD 주소와 완료된 입금 기록을 만듭니다."""
+    users = []
+    for number, amounts in enumerate(amounts_by_user):
+        user = models.User(email=f"sweep{number}@example.com", password_hash="x")
+        db_session.add(user)
+        db_session.flush()
+        address = derive_address(ACCOUNT_XPUB, int(user.id))
+        db_session.add(models.DepositAddress(user_id=user.id, derivation_index=user.id, address=address))
+        for i, amount in enumerate(amounts):
+            db_session.add(models.Transaction(
+                user_id=user.id, type=models.TransactionType.DEPOSIT, amount=Decimal(amount),
+                status=models.TransactionStatus.COMPLETED, ref_tx_id=f"{number}-{i}", to_address=address
+            ))
+        # 회사 지갑으로 메모와 함께 받은 입금은 HD 주소에 없으므로 제외되어야 함
+        db_session.add(models.Transaction(
+            user_id=user.id, type=models.TransactionType.DEPOSIT, amount=Decimal("1000"),
+            status=models.TransactionStatus.COMPLETED, ref_tx_id=f"{number}-memo", to_address=HOT_WALLET
+        ))
+        users.append(user)
+    db_session.commit()
+    return users
+
+
+class FakeTronService:
+    def __init__(self, balances):
+        self.balances = balances
+        self.fee_estimator = fee_estimator()
+        self.funded = {}
+        self.swept = []
+
+    def fetch_account_balance(self, address):
+        return self.balances[address]
+
+    def send_trx(self, to_address, amount):
+        self.funded[to_address] = amount
+        return f"fund-{to_address}"
+
+    def send_usdt_from(self, private_key, to_address, amount, fee_limit):
+        self.swept.append((private_key.public_key.to_base58check_address(), to_address, amount))
+        return f"sweep-{len(self.swept)}"
+
+
+def test_plan_accumulates_unswept_deposits(db_session):
+    """이전 스윕 이후의 입금만 주소별로 합산하고 임계값 미만은 미루는지 테스트합니다."""
+    users = add_deposits(db_session, [["30", "40", "50"], ["20", "10"], ["80"]])
+    first = db_session.query(models.DepositAddress).filter(models.DepositAddress.user_id == users[0].id).one()
+    through = db_session.query(models.Transaction).filter(models.Transaction.ref_tx_id == "0-1").one().id
+    # 완료된 스윕은 처리한 입금까지만 제외하고, 실패한 스윕은 무시
+    db_session.add_all([
+        models.DepositSweep(deposit_address_id=first.id, address=first.address, amount=Decimal("70"),
+                            through_transaction_id=through, status=models.TransactionStatus.COMPLETED),
+        models.DepositSweep(deposit_address_id=first.id, address=first.address, amount=Decimal("50"),
+                            through_transaction_id=through + 1, status=models.TransactionStatus.FAILED),
+    ])
+    db_session.commit()
+
+    plan = SweepPlanner(fee_estimator(), threshold=Decimal("50"), window_size=1).plan(db_session)
+
+    assert [(c.user_id, c.amount, c.deposits) for c in plan.candidates] == [
+        (users[2].id, Decimal("80"), 1), (users[0].id, Decimal("50"), 1)
+    ]
+    assert len(plan.windows) == 2
+    assert [(c.user_id, c.amount) for c in plan.deferred] == [(users[1].id, Decimal("30"))]
+
+    costs = plan.to_dict()["costs"]
+    assert costs["individual_trx"] == costs["batched_trx"] == 2 * costs["per_sweep_trx"]
+    plan = SweepPlanner(fee_estimator(), threshold=Decimal("10")).plan(db_session)
+    costs = plan.costs
+    assert costs["transactions_saved"] == 2
+    assert costs["savings_trx"] == costs["per_sweep_trx"] > 0
+    assert costs["individual_trx"] > costs["batched_trx"]
+    assert len(costs["prefund_trx_per_window"]) == 1
+
+
+def test_execute_funds_window_then_sweeps_with_derived_keys(db_session):
+    """윈도우 단위로 부족한 TRX만 충전하고 파생 개인키로 온체인 잔액을 스윕하는지 테스트합니다."""
+    users = add_deposits(db_session, [["60"], ["70"], ["90"]])
+    addresses = {int(u.id): derive_address(ACCOUNT_XPUB, int(u.id)) for u in users}
+    for index, address in addresses.items():
+        assert PrivateKey(derive_private_key(ACCOUNT_XPRV, index)).public_key.to_base58check_address() == address
+
+    needed = Decimal(fee_estimator().fee_limit(RECIPIENT_EXISTING)) / 1_000_000
+    service = FakeTronService({
+        addresses[int(users[0].id)]: {"TRX": Decimal("0"), "USDT": Decimal("65")},
+        addresses[int(users[1].id)]: {"TRX": needed, "USDT": Decimal("70")},
+        # 다른 경로로 이미 옮겨진 주소는 건너뜀
+        addresses[int(users[2].id)]: {"TRX": Decimal("0"), "USDT": Decimal("0")},
+    })
+    plan = SweepPlanner(service.fee_estimator, threshold=Decimal("50"), window_size=2).plan(db_session)
+    executor = SweepExecutor(
+        service, signer=lambda index: PrivateKey(derive_private_key(ACCOUNT_XPRV, index)),
+        destination=HOT_WALLET, threshold=Decimal("50"), funding_wait=0
+    )
+
+    report = executor.execute(db_session, plan)
+
+    assert report.to_dict()["swept"] == 2 and report.to_dict()["skipped"] == 1
+    assert service.funded == {addresses[int(users[0].id)]: needed}
+    assert sorted(service.swept) == sorted([
+        (addresses[int(users[0].id)], HOT_WALLET, Decimal("65")),
+        (addresses[int(users[1].id)], HOT_WALLET, Decimal("70")),
+    ])
+    sweeps = db_session.query(models.DepositSweep).all()
+    assert all(s.status == models.TransactionStatus.COMPLETED for s in sweeps) and len(sweeps) == 2
+    remaining = SweepPlanner(service.fee_estimator, threshold=Decimal("50")).plan(db_session)
+    assert [c.user_id for c in remaining.candidates] == [users[2].id]
@@ -0,0 +1,96 @@
+"""
+트론 서비스 초기화와 컨트랙트 ABI 캐시를 위한 테스트 케이스입니다.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils import tron
+from app.utils.contracts import TRC20_ABI, load_contract
+
+USDT_CONTRACT = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+class FakeProvider:
+    """wallet/getcontract 호출 횟수를 기록하는 가짜 프로바이더입니다."""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def make_request(self, method, params=None):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("node unreachable")
+        return {"name": "TetherToken", "bytecode": "60806040", "abi": {"entrys": TRC20_ABI}}
+
+
+class FakeClient:
+    def __init__(self, provider):
+        self.provider = provider
+
+
+def test_contract_abi_is_cached_on_disk(tmp_path):
+    """첫 조회 후에는 네트워크 없이 디스크 캐시에서 컨트랙트를 만드는지 테스트합니다."""
+    provider = FakeProvider()
+    first = load_contract(FakeClient(provider), USDT_CONTRACT, str(tmp_path))
+    assert provider.calls == 1
+    cached = json.loads((tmp_path / f"{USDT_CONTRACT}.json").read_text())
+    assert "bytecode" not in cached
+
+    offline = FakeProvider(fail=True)
+    second = load_contract(FakeClient(offline), USDT_CONTRACT, str(tmp_path))
+    assert offline.calls == 0
+    assert second.name == first.name == "TetherToken"
+    assert second.functions.transfer is not None
+
+
+def test_contract_falls_back_to_bundled_abi(tmp_path):
+    """캐시도 없고 노드에도 연결할 수 없으면 내장 TRC20 ABI를 사용하는지 테스트합니다."""
+    contract = load_contract(FakeClient(FakeProvider(fail=True)), USDT_CONTRACT, str(tmp_path))
+    assert contract.functions.balanceOf is not None
+    assert not list(tmp_path.iterdir())
+
+
+def test_concurrent_callers_share_one_service(monkeypatch):
+    """동시에 도착한 요청이 하나의 서비스 인스턴스 초기화를 기다리는지 테스트합니다."""
+    built = []
+
+    class SlowService:
+        def __init__(self):
+            built.append(threading.get_ident())
+            time.sleep(0.2)
+
+    monkeypatch.setattr(tron, "TronService", SlowService)
+    monkeypatch.setattr(tron, "tron_service", None)
+    monkeypatch.setattr(tron, "_service_future", None)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        services = list(executor.map(lambda _: tron.get_tron_service(), range(8)))
+
+    assert len(built) == 1
+    assert all(service is services[0] for service in services)
+
+
+def test_failed_initialization_can_be_retried(monkeypatch):
+    """초기화가 실패하면 다음 호출에서 다시 시도하는지 테스트합니다."""
+    attempts = []
+
+    class FlakyService:
+        def __init__(self):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("node unreachable")
+
+    monkeypatch.setattr(tron, "TronService", FlakyService)
+    monkeypatch.setattr(tron, "tron_service", None)
+    monkeypatch.setattr(tron, "_service_future", None)
+
+    with pytest.raises(ConnectionError):
+        tron.get_tron_service()
+    assert isinstance(tron.get_tron_service(), FlakyService)
+    assert len(attempts) == 2
@@ -0,0 +1,79 @@
+"""
+확정 트랜잭션 캐시를 거치는 트랜잭션 상태 조회를 위한 테스트 케이스입니다.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app import models
+from app.utils import tx_status
+from app.utils.cache import LRUCache
+from app.utils.tron import MIN_CONFIRMATIONS
+
+TX_HASH = "ab" * 32
+
+
+class FakeTronService:
+    """상태 조회 횟수를 세는 가짜 트론 서비스입니다."""
+
+    def __init__(self):
+        self.calls = 0
+        self.block_height = SimpleNamespace(height=None)
+        self.fee_estimator = SimpleNamespace(observe_finalized=lambda *args, **kwargs: None)
+        self.status = {"exists": True, "confirmed": False, "confirmations": 3, "success": True, "block_number": 100}
+
+    def check_transaction_status(self, tx_hash):
+        self.calls += 1
+        return self.status
+
+
+@pytest.fixture
+def tron(monkeypatch):
+    service = FakeTronService()
+    monkeypatch.setattr(tx_status, "get_tron_service", lambda: service)
+    monkeypatch.setattr(tx_status, "finalized_status_cache", LRUCache(16))
+    return service
+
+
+def test_confirmed_receipt_is_stored_once_and_served_locally(db_session, tron):
+    """확정된 영수증은 한 번만 저장되고 이후 조회는 노드를 호출하지 않는지 테스트합니다."""
+    tron.status = dict(tron.status, confirmed=True, timestamp=1_700_000_000_000, energy_used=64285, net_used=345)
+
+    first = tx_status.get_transaction_status(db_session, TX_HASH)
+    assert first["finalized"] and first["success"]
+    assert tron.calls == 1
+
+    second = tx_status.get_transaction_status(db_session, TX_HASH)
+    assert second["finalized"] and second["energy_used"] == 64285
+    assert tron.calls == 1
+
+    # 프로세스 캐시가 비어도 DB에서 응답
+    tx_status.finalized_status_cache = LRUCache(16)
+    assert tx_status.get_transaction_status(db_session, TX_HASH)["block_number"] == 100
+    assert tron.calls == 1
+    assert db_session.query(models.FinalizedTransaction).count() == 1
+
+
+def test_unconfirmed_status_is_not_cached(db_session, tron):
+    """확정되지 않은 상태는 저장하지 않고 매번 노드에 조회하는지 테스트합니다."""
+    for _ in range(2):
+        status = tx_status.get_transaction_status(db_session, TX_HASH)
+        assert status["finalized"] is False
+
+    assert tron.calls == 2
+    assert len(tx_status.finalized_status_cache) == 0
+    assert db_session.query(models.FinalizedTransaction).count() == 0
+
+
+def test_cached_confirmations_follow_block_height(db_session, tron):
+    """캐시된 영수증의 확인 수가 현재 블록 높이에 따라 계속 늘어나는지 테스트합니다."""
+    tron.status = dict(tron.status, confirmed=True)
+    tx_status.get_transaction_status(db_session, TX_HASH)
+
+    assert tx_status.get_transaction_status(db_session, TX_HASH)["confirmations"] == MIN_CONFIRMATIONS
+    tron.block_height.height = 100 + MIN_CONFIRMATIONS + 5
+    assert tx_status.get_transaction_status(db_session, TX_HASH)["confirmations"] == MIN_CONFIRMATIONS + 5
+    tron.block_height.height += 10
+    assert tx_status.get_transaction_status(db_session, TX_HASH)["confirmations"] == MIN_CONFIRMATIONS + 15
+    assert tron.calls == 1
@@ -0,0 +1,108 @@
+"""
+출금/송금 한도 카운터를 위한 테스트 케이스입니다.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app import models
+from app.crud import crud_transaction, crud_withdrawal_request
+from app.utils.velocity import DAY, HOUR, OP_TRANSFER, OP_WITHDRAWAL, VelocityLimiter, velocity_limiter
+
+DESTINATION = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+def test_windows_sum_recent_buckets(db_session):
+    """버킷 합계로 1시간·24시간 사용량을 계산하고 한도를 확인하는지 테스트합니다."""
+    user = models.User(email="velocity@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+    limiter = VelocityLimiter({OP_WITHDRAWAL: {HOUR: Decimal("100"), DAY: Decimal("200")}}, cache_ttl=60)
+    now = datetime.utcnow()
+    for age, amount in ((timedelta(hours=3), "120"), (timedelta(hours=30), "500")):
+        db_session.add(models.VelocityCounter(
+            user_id=user.id, asset="USDT", operation=OP_WITHDRAWAL,
+            bucket_start=limiter.bucket_start(now - age), amount=Decimal(amount), count=1
+        ))
+    db_session.commit()
+
+    limiter.record(db_session, int(user.id), "USDT", OP_WITHDRAWAL, Decimal("30"))
+    limiter.record(db_session, int(user.id), "USDT", OP_WITHDRAWAL, Decimal("20"))
+    db_session.commit()
+
+    assert limiter.usage(db_session, int(user.id), "USDT", OP_WITHDRAWAL, HOUR) == Decimal("50")
+    assert limiter.usage(db_session, int(user.id), "USDT", OP_WITHDRAWAL, DAY) == Decimal("170")
+    assert limiter.check(db_session, int(user.id), "USDT", OP_WITHDRAWAL, Decimal("30")) is None
+    assert "hourly" in limiter.check(db_session, int(user.id), "USDT", OP_WITHDRAWAL, Decimal("60"))
+    # 같은 버킷은 한 행으로 합산
+    assert db_session.query(models.VelocityCounter).count() == 3
+
+    # 캐시된 버킷은 기록 시 갱신되고, 다른 프로세스의 기록은 TTL 이후 반영
+    limiter.record(db_session, int(user.id), "USDT", OP_WITHDRAWAL, Decimal("40"))
+    db_session.commit()
+    assert limiter.usage(db_session, int(user.id), "USDT", OP_WITHDRAWAL, HOUR) == Decimal("90")
+    VelocityLimiter({}).record(db_session, int(user.id), "USDT", OP_WITHDRAWAL, Decimal("5"))
+    db_session.commit()
+    assert limiter.usage(db_session, int(user.id), "USDT", OP_WITHDRAWAL, HOUR) == Decimal("90")
+    limiter.clear_cache()
+    assert limiter.usage(db_session, int(user.id), "USDT", OP_WITHDRAWAL, HOUR) == Decimal("95")
+    assert "daily" in limiter.check(db_session, int(user.id), "USDT", OP_WITHDRAWAL, Decimal("5"))
+
+    assert limiter.prune(db_session) == 1
+
+
+def test_transfer_and_withdrawal_limits_are_enforced(client: TestClient, auth_headers, db_session, monkeypatch):
+    """송금과 출금 요청이 한도를 넘으면 429로 거절되는지 테스트합니다."""
+    monkeypatch.setattr(velocity_limiter, "limits", {
+        OP_TRANSFER: {HOUR: Decimal("30")},
+        OP_WITHDRAWAL: {DAY: Decimal("25")},
+    })
+    velocity_limiter.clear_cache()
+    user = db_session.query(models.User).filter(models.User.email == "test@example.com").one()
+    db_session.add(models.User(email="friend@example.com", password_hash="x"))
+    db_session.query(models.Balance).filter(models.Balance.user_id == user.id).update({"amount": Decimal("100")})
+    db_session.commit()
+
+    transfer = {"recipient_email": "friend@example.com", "amount": "20"}
+    assert client.post("/api/v1/wallet/transfer", json=transfer, headers=auth_headers).status_code == 200
+    rejected = client.post("/api/v1/wallet/transfer", json=transfer, headers=auth_headers)
+    assert rejected.status_code == 429
+    assert "remaining 10" in rejected.json()["detail"]
+
+    withdrawal = {"amount": "15", "destination_address": DESTINATION}
+    assert client.post("/api/v1/transactions/withdraw", json=withdrawal, headers=auth_headers).status_code == 200
+    assert client.post("/api/v1/transactions/withdraw", json=withdrawal, headers=auth_headers).status_code == 429
+    assert len(crud_withdrawal_request.get_user_requests(db_session, int(user.id)).items) == 1
+    velocity_limiter.clear_cache()
+
+
+def test_counter_failure_leaves_balances_untouched(db_session, monkeypatch):
+    """카운터 기록이 실패하면 잔액 변경도 함께 취소되는지 테스트합니다."""
+    users = [models.User(email=f"atomic{i}@example.com", password_hash="x") for i in range(2)]
+    db_session.add_all(users)
+    db_session.flush()
+    db_session.add_all([
+        models.Balance(user_id=user.id, asset="USDT", amount=Decimal("100"), frozen_amount=Decimal("0"))
+        for user in users
+    ])
+    db_session.commit()
+
+    def failing_record(*args):
+        raise RuntimeError("counter unavailable")
+
+    monkeypatch.setattr(velocity_limiter, "record", failing_record)
+    for operation in (
+        lambda: crud_transaction.create_internal_transfer(db_session, users[0].id, users[1].id, Decimal("40")),
+        lambda: crud_withdrawal_request.create(db_session, users[0].id, Decimal("40"), DESTINATION),
+    ):
+        try:
+            operation()
+        except RuntimeError:
+            pass
+
+    db_session.expire_all()
+    balances = db_session.query(models.Balance).order_by(models.Balance.user_id).all()
+    assert [(b.amount, b.frozen_amount) for b in balances] == [(Decimal("100"), Decimal("0"))] * 2
+    assert db_session.query(models.WithdrawalRequest).count() == 0
@@ -0,0 +1,117 @@
+"""
+오래된 출금 요청 만료 작업을 위한 테스트 케이스입니다.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.crud import crud_withdrawal_request
+from app.utils.withdrawal_expiry import expire_stale_withdrawals
+
+DESTINATION = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+def balances(db_session):
+    db_session.expire_all()
+    return {
+        (balance.user_id, balance.asset): (balance.amount, balance.frozen_amount)
+        for balance in db_session.query(models.Balance).all()
+    }
+
+
+def test_stale_requests_expire_in_batches(db_session):
+    """오래된 대기 요청만 배치 단위로 취소하고 사용자/자산별로 동결 해제하는지 테스트합니다."""
+    users = [models.User(email=f"user{i}@example.com", password_hash="x") for i in range(3)]
+    db_session.add_all(users)
+    db_session.flush()
+    for user in users:
+        db_session.add(models.Balance(user_id=user.id, asset="USDT", amount=Decimal("100"), frozen_amount=Decimal("0")))
+    db_session.commit()
+
+    old = datetime.utcnow() - timedelta(days=5)
+    stale = []
+    for user, count in zip(users[:2], (3, 2)):
+        for _ in range(count):
+            request = crud_withdrawal_request.create(db_session, int(user.id), Decimal("4"), DESTINATION)
+            stale.append(int(request.id))
+    fresh = crud_withdrawal_request.create(db_session, int(users[2].id), Decimal("7"), DESTINATION)
+    db_session.query(models.WithdrawalRequest).filter(models.WithdrawalRequest.id.in_(stale)).update(
+        {"created_at": old}, synchronize_session=False
+    )
+    db_session.commit()
+
+    report = expire_stale_withdrawals(db_session, timedelta(days=3), batch_size=2)
+
+    assert sorted(report.request_ids) == stale
+    assert report.batches == 3
+    assert report.to_dict()["users"] == [
+        {"user_id": users[0].id, "released": {"USDT": 12.0}},
+        {"user_id": users[1].id, "released": {"USDT": 8.0}},
+    ]
+    after = balances(db_session)
+    assert after[(users[0].id, "USDT")] == (Decimal("100"), Decimal("0"))
+    assert after[(users[1].id, "USDT")] == (Decimal("100"), Decimal("0"))
+    assert after[(users[2].id, "USDT")] == (Decimal("100"), Decimal("7"))
+    statuses = {r.id: r.status for r in db_session.query(models.WithdrawalRequest).all()}
+    assert all(statuses[i] == models.TransactionStatus.CANCELLED for i in stale)
+    assert statuses[fresh.id] == models.TransactionStatus.PENDING
+
+    # 다시 실행해도 이미 만료된 요청은 건드리지 않음
+    assert expire_stale_withdrawals(db_session, timedelta(days=3)).request_ids == []
+
+
+def test_expire_endpoint_reports_affected_users(client: TestClient, auth_headers, db_session):
+    """관리자 만료 API가 영향받은 사용자를 보고하는지 테스트합니다."""
+    user = db_session.query(models.User).filter(models.User.email == "test@example.com").one()
+    user.is_admin = True
+    db_session.query(models.Balance).filter(models.Balance.user_id == user.id).update({"amount": Decimal("50")})
+    db_session.commit()
+    request = crud_withdrawal_request.create(db_session, int(user.id), Decimal("5"), DESTINATION)
+    db_session.query(models.WithdrawalRequest).update({"created_at": datetime.utcnow() - timedelta(hours=3)})
+    db_session.commit()
+
+    response = client.post("/api/v1/admin/withdrawals/expire", params={"max_age_hours": 2}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["request_ids"] == [request.id]
+    assert response.json()["users"] == [{"user_id": user.id, "released": {"USDT": 5.0}}]
+
+
+def test_expiry_and_single_approval_do_not_both_apply(db_session, monkeypatch):
+    """승인 도중 만료가 먼저 커밋되면 승인이 충돌로 끝나고 자금이 한 번만 해제되는지 테스트합니다."""
+    admin = models.User(email="admin@example.com", password_hash="x", is_admin=True)
+    user = models.User(email="user@example.com", password_hash="x")
+    db_session.add_all([admin, user])
+    db_session.flush()
+    db_session.add(models.Balance(user_id=user.id, asset="USDT", amount=Decimal("100"), frozen_amount=Decimal("0")))
+    db_session.commit()
+    requests = [crud_withdrawal_request.create(db_session, int(user.id), Decimal("10"), DESTINATION) for _ in range(2)]
+    db_session.query(models.WithdrawalRequest).update({"created_at": datetime.utcnow() - timedelta(days=5)})
+    db_session.commit()
+    other = sessionmaker(bind=db_session.get_bind())()
+
+    # 승인이 요청을 읽은 직후 다른 세션에서 만료 작업이 실행됨
+    def expire_elsewhere(withdrawal_request, admin_user_id):
+        monkeypatch.undo()
+        assert crud_withdrawal_request.expire_stale(other, datetime.utcnow(), limit=1)
+        return False
+
+    monkeypatch.setattr(crud_withdrawal_request, "_claimed_by_other", expire_elsewhere)
+    with pytest.raises(ValueError):
+        crud_withdrawal_request.approve_request(db_session, int(requests[0].id), int(admin.id), True)
+
+    # 승인이 먼저 끝난 요청은 만료 작업이 건드리지 않음
+    crud_withdrawal_request.approve_request(db_session, int(requests[1].id), int(admin.id), True)
+    assert crud_withdrawal_request.expire_stale(other, datetime.utcnow()) == []
+    other.close()
+
+    statuses = {r.id: r.status for r in db_session.query(models.WithdrawalRequest).all()}
+    assert statuses[requests[0].id] == models.TransactionStatus.CANCELLED
+    assert statuses[requests[1].id] == models.TransactionStatus.PROCESSING
+    assert [job.withdrawal_request_id for job in db_session.query(models.WithdrawalJob).all()] == [requests[1].id]
+    assert balances(db_session)[(user.id, "USDT")] == (Decimal("100"), Decimal("10"))
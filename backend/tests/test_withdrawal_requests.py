@@ -0,0 +1,75 @@
+"""
+사용자별 출금 요청 목록 조회를 위한 테스트 케이스입니다.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app import models
+from app.crud import crud_withdrawal_request
+
+DESTINATION = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+def create_user_requests(db_session, count):
+    """잔액이 있는 테스트 사용자의 출금 요청을 생성합니다."""
+    user = db_session.query(models.User).filter(models.User.email == "test@example.com").one()
+    db_session.query(models.Balance).filter(models.Balance.user_id == user.id).update({"amount": Decimal("100")})
+    db_session.commit()
+    requests = [
+        crud_withdrawal_request.create(db_session, int(user.id), Decimal("1"), DESTINATION)
+        for _ in range(count)
+    ]
+    return user, [int(request.id) for request in requests]
+
+
+def test_requests_are_paged_with_cursor(client: TestClient, auth_headers, db_session):
+    """커서로 최신순 페이지를 빠짐없이 순회하고 상태로 거를 수 있는지 테스트합니다."""
+    user, ids = create_user_requests(db_session, 5)
+    # 생성 시각이 다른 요청과 같은 요청이 섞여 있어도 순서가 유지되어야 함
+    db_session.query(models.WithdrawalRequest).filter(models.WithdrawalRequest.id == ids[0]).update(
+        {"created_at": datetime.utcnow() - timedelta(days=1)}
+    )
+    db_session.query(models.WithdrawalRequest).filter(models.WithdrawalRequest.id == ids[1]).update(
+        {"status": models.TransactionStatus.CANCELLED}
+    )
+    db_session.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/transactions/withdraw/requests", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(reversed(ids))
+
+    cancelled = client.get(
+        "/api/v1/transactions/withdraw/requests", params={"status": "cancelled"}, headers=auth_headers
+    )
+    assert [item["id"] for item in cancelled.json()["items"]] == [ids[1]]
+    assert cancelled.json()["items"][0]["status"] == "cancelled"
+
+    invalid = client.get("/api/v1/transactions/withdraw/requests", params={"status": "bogus"}, headers=auth_headers)
+    assert invalid.status_code == 400
+
+
+def test_changed_since_returns_only_updated_requests(auth_headers, db_session):
+    """changed_since 이후 생성되거나 상태가 바뀐 요청만 반환하는지 테스트합니다."""
+    user, ids = create_user_requests(db_session, 3)
+    past = datetime.utcnow() - timedelta(hours=1)
+    db_session.query(models.WithdrawalRequest).update({"created_at": past - timedelta(hours=1), "updated_at": None})
+    db_session.commit()
+    crud_withdrawal_request.bulk_process(db_session, [ids[2]], int(user.id), False)
+
+    page = crud_withdrawal_request.get_user_requests(db_session, int(user.id), changed_since=past)
+    assert [item.id for item in page.items] == [ids[2]]
+    assert page.next_cursor is None
@@ -0,0 +1,92 @@
+"""
+출금 승인 대기열 스케줄러를 위한 테스트 케이스입니다.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app import models
+from app.crud import crud_withdrawal_request
+from app.utils.withdrawal_scheduler import WithdrawalScheduler
+
+DESTINATION = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+def create_pending(db_session, specs):
+    """(사용자 등급, 금액, 대기 시간(분)) 목록으로 대기 중인 출금 요청을 생성합니다."""
+    now = datetime.utcnow()
+    admins = [models.User(email=f"admin{i}@example.com", password_hash="x", is_admin=True) for i in range(2)]
+    users = {}
+    db_session.add_all(admins)
+    for tier in sorted({spec[0] for spec in specs}):
+        users[tier] = models.User(email=f"tier{tier}@example.com", password_hash="x", priority_tier=tier)
+        db_session.add(users[tier])
+    db_session.flush()
+
+    requests = []
+    for tier, amount, waited in specs:
+        request = models.WithdrawalRequest(
+            user_id=users[tier].id, amount=Decimal(str(amount)), destination_address=DESTINATION,
+            status=models.TransactionStatus.PENDING, created_at=now - timedelta(minutes=waited)
+        )
+        db_session.add(request)
+        requests.append(request)
+    db_session.commit()
+    return admins, [int(request.id) for request in requests]
+
+
+def test_pending_requests_follow_policy(db_session):
+    """SLA 초과, 사용자 등급, 금액 구간, 대기 시간 순으로 정렬되는지 테스트합니다."""
+    _, ids = create_pending(db_session, [
+        (0, 5000, 10),   # 큰 금액
+        (0, 50, 5),      # 작은 금액, 최근
+        (0, 50, 20),     # 작은 금액, 오래됨
+        (1, 5000, 1),    # 우선 등급 사용자
+        (0, 5000, 120),  # SLA 초과
+    ])
+    scheduler = WithdrawalScheduler(sla=timedelta(minutes=60), amount_tiers=[100, 1000])
+
+    order = [int(request.id) for request in scheduler.pending(db_session)]
+    assert order == [ids[4], ids[3], ids[2], ids[1], ids[0]]
+
+    fifo = WithdrawalScheduler(policy=[])
+    assert [int(request.id) for request in fifo.pending(db_session)] == [ids[4], ids[2], ids[0], ids[1], ids[3]]
+
+    with pytest.raises(ValueError):
+        WithdrawalScheduler(policy=["largest_user"])
+
+
+def test_claims_do_not_collide_and_expire(db_session):
+    """관리자별 점유가 겹치지 않고 점유 중인 요청은 다른 관리자가 처리할 수 없는지 테스트합니다."""
+    admins, ids = create_pending(db_session, [(0, 10, waited) for waited in (50, 40, 30, 20, 10)])
+    scheduler = WithdrawalScheduler(policy=[], lease=timedelta(minutes=5))
+
+    first = [int(r.id) for r in scheduler.claim(db_session, int(admins[0].id), 3)]
+    second = [int(r.id) for r in scheduler.claim(db_session, int(admins[1].id), 3)]
+    assert first == ids[:3]
+    assert second == ids[3:]
+    # 자신이 점유한 요청은 다시 받을 수 있음
+    assert [int(r.id) for r in scheduler.claim(db_session, int(admins[0].id), 3)] == ids[:3]
+
+    with pytest.raises(ValueError):
+        crud_withdrawal_request.approve_request(db_session, ids[0], int(admins[1].id), False)
+    processed, skipped = crud_withdrawal_request.bulk_process(db_session, ids, int(admins[1].id), False)
+    assert processed == ids[3:]
+    assert skipped == ids[:3]
+
+    metrics = scheduler.metrics(db_session)
+    assert metrics["depth"] == 3
+    assert metrics["claimed"] == 3
+    assert 25 * 60 <= metrics["waiting_seconds"]["p50"] <= 45 * 60
+    assert metrics["processed_wait_seconds"]["max"] >= 10 * 60
+
+    # 점유 기간이 끝나면 다른 관리자가 가져갈 수 있음
+    db_session.query(models.WithdrawalRequest).update(
+        {"claimed_until": datetime.utcnow() - timedelta(seconds=1)}, synchronize_session=False
+    )
+    db_session.commit()
+    assert [int(r.id) for r in scheduler.claim(db_session, int(admins[1].id), 5)] == ids[:3]
+    assert scheduler.release(db_session, ids, int(admins[1].id)) == 3
+    assert scheduler.metrics(db_session)["claimed"] == 0
@@ -0,0 +1,285 @@
+"""
+출금 작업 대기열과 워커를 위한 테스트 케이스입니다.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.crud import crud_withdrawal_job, crud_withdrawal_request
+from app.utils import tx_status
+from app.utils.batch_sender import BatchSendResult, TransferOutcome
+from app.utils.cache import LRUCache
+from app.utils.fees import RECIPIENT_EXISTING, FeeEstimator
+from app.utils.withdrawal_scheduler import withdrawal_scheduler
+from app.utils.withdrawal_worker import WithdrawalWorker
+
+DESTINATION = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+class FakeTronService:
+    """배치 브로드캐스트를 기록하는 가짜 트론 서비스입니다."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.sent = []
+        self.batches = 0
+        self.fee_estimator = FeeEstimator(self)
+        self.receipts = {}
+
+    def check_transaction_status(self, tx_hash):
+        return self.receipts.get(tx_hash, {"exists": False, "confirmed": False, "confirmations": 0, "success": False})
+
+    def send_usdt_batch(self, transfers, concurrency=4):
+        self.batches += 1
+        result = BatchSendResult()
+        for item in transfers:
+            self.sent.append((item.to_address, item.amount))
+            outcome = TransferOutcome(item.key, item.to_address, item.amount)
+            if self.fail:
+                outcome.error = "SIGERROR: validate signature error"
+            else:
+                outcome.txid = f"{len(self.sent):064x}"
+            result.outcomes.append(outcome)
+        return result
+
+
+def create_requests(db_session, count=1, amount=Decimal("10")):
+    """잔액이 있는 사용자와 동결된 출금 요청을 생성합니다."""
+    admin = models.User(email="admin@example.com", password_hash="x", is_admin=True)
+    user = models.User(email="user@example.com", password_hash="x")
+    db_session.add_all([admin, user])
+    db_session.flush()
+    db_session.add(models.Balance(user_id=user.id, asset="USDT", amount=Decimal("100"), frozen_amount=Decimal("0")))
+    db_session.commit()
+
+    requests = [
+        crud_withdrawal_request.create(db_session, int(user.id), amount, DESTINATION)
+        for _ in range(count)
+    ]
+    return admin, user, requests
+
+
+def balance_of(db_session, user):
+    db_session.expire_all()
+    balance = db_session.query(models.Balance).filter(models.Balance.user_id == user.id).one()
+    return Decimal(str(balance.amount)), Decimal(str(balance.frozen_amount))
+
+
+def test_approval_enqueues_job_without_broadcasting(db_session):
+    """승인 시 브로드캐스트 없이 작업만 등록되고 워커가 결과를 기록하는지 테스트합니다."""
+    admin, user, (request,) = create_requests(db_session)
+    approved = crud_withdrawal_request.approve_request(db_session, int(request.id), int(admin.id), True)
+
+    assert approved.status == models.TransactionStatus.PROCESSING
+    job = crud_withdrawal_job.get_by_request(db_session, int(request.id))
+    assert job.status == models.WithdrawalJobStatus.QUEUED
+
+    tron = FakeTronService()
+    worker = WithdrawalWorker(sessionmaker(bind=db_session.get_bind()), tron_service=tron)
+    assert worker.run_once() == 1
+    assert worker.run_once() == 0
+    assert len(tron.sent) == 1
+
+    db_session.expire_all()
+    status = crud_withdrawal_request.get_status(db_session, int(request.id))
+    assert status.status == "completed"
+    assert status.job_status == "succeeded"
+    assert status.ref_tx_id == f"{1:064x}"
+    transaction = db_session.query(models.Transaction).filter(models.Transaction.id == approved.transaction_id).one()
+    assert transaction.status == models.TransactionStatus.COMPLETED
+    assert transaction.ref_tx_id == status.ref_tx_id
+    assert balance_of(db_session, user) == (Decimal("90"), Decimal("0"))
+
+
+def test_failed_broadcast_keeps_funds_frozen(db_session):
+    """브로드캐스트 실패 시 재시도하지 않고 자금을 동결 상태로 두는지 테스트합니다."""
+    admin, user, (request,) = create_requests(db_session)
+    crud_withdrawal_request.approve_request(db_session, int(request.id), int(admin.id), True)
+
+    tron = FakeTronService(fail=True)
+    worker = WithdrawalWorker(sessionmaker(bind=db_session.get_bind()), tron_service=tron)
+    worker.run_once()
+    worker.run_once()
+
+    assert len(tron.sent) == 1
+    db_session.expire_all()
+    status = crud_withdrawal_request.get_status(db_session, int(request.id))
+    assert status.status == "failed"
+    assert status.job_status == "failed"
+    assert status.last_error
+    assert balance_of(db_session, user) == (Decimal("100"), Decimal("10"))
+
+
+def test_jobs_are_sent_in_batches(db_session):
+    """대기 중인 작업을 배치 단위로 보내고 결과를 일괄 기록하는지 테스트합니다."""
+    admin, user, requests = create_requests(db_session, count=5, amount=Decimal("1"))
+    for request in requests:
+        crud_withdrawal_request.approve_request(db_session, int(request.id), int(admin.id), True)
+
+    tron = FakeTronService()
+    worker = WithdrawalWorker(sessionmaker(bind=db_session.get_bind()), tron_service=tron, batch_size=2)
+    while worker.run_once():
+        pass
+
+    assert tron.batches == 3
+    assert len(tron.sent) == 5
+    assert crud_withdrawal_job.count_by_status(db_session)["succeeded"] == 5
+    assert balance_of(db_session, user) == (Decimal("95"), Decimal("0"))
+
+
+def test_approve_endpoint_returns_immediately(client: TestClient, auth_headers, db_session):
+    """승인 API가 즉시 응답하고 상태 API로 진행 상황을 확인할 수 있는지 테스트합니다."""
+    user = db_session.query(models.User).filter(models.User.email == "test@example.com").one()
+    user.is_admin = True
+    db_session.query(models.Balance).filter(models.Balance.user_id == user.id).update({"amount": Decimal("50")})
+    db_session.commit()
+    request = crud_withdrawal_request.create(db_session, int(user.id), Decimal("5"), DESTINATION)
+
+    response = client.post(
+        "/api/v1/admin/withdrawals/approve",
+        json={"request_id": request.id, "approved": True},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["status"] == "processing"
+
+    status = client.get(f"/api/v1/admin/withdrawals/{request.id}/status", headers=auth_headers)
+    assert status.status_code == 200
+    assert status.json()["job_status"] == "queued"
+
+    again = client.post(
+        "/api/v1/admin/withdrawals/approve",
+        json={"request_id": request.id, "approved": True},
+        headers=auth_headers
+    )
+    assert again.status_code == 409
+
+
+def test_bulk_reject_unfreezes_in_one_transaction(db_session):
+    """일괄 거부 시 대기 중인 요청만 취소하고 동결액을 한 번에 해제하는지 테스트합니다."""
+    admin, user, requests = create_requests(db_session, count=4, amount=Decimal("5"))
+    crud_withdrawal_request.approve_request(db_session, int(requests[0].id), int(admin.id), True)
+    ids = [int(request.id) for request in requests]
+
+    processed, skipped = crud_withdrawal_request.bulk_process(db_session, ids + [9999], int(admin.id), False)
+
+    assert processed == ids[1:]
+    assert skipped == [ids[0], 9999]
+    assert balance_of(db_session, user) == (Decimal("100"), Decimal("5"))
+    statuses = {r.id: r.status for r in db_session.query(models.WithdrawalRequest).all()}
+    assert statuses[ids[0]] == models.TransactionStatus.PROCESSING
+    assert all(statuses[i] == models.TransactionStatus.CANCELLED for i in ids[1:])
+
+
+def test_bulk_approve_endpoint_queues_one_batch(client: TestClient, auth_headers, db_session):
+    """일괄 승인 API가 요청들을 한 배치로 대기열에 넣는지 테스트합니다."""
+    user = db_session.query(models.User).filter(models.User.email == "test@example.com").one()
+    user.is_admin = True
+    db_session.query(models.Balance).filter(models.Balance.user_id == user.id).update({"amount": Decimal("50")})
+    db_session.commit()
+    ids = [int(crud_withdrawal_request.create(db_session, int(user.id), Decimal("2"), DESTINATION).id) for _ in range(3)]
+
+    response = client.post(
+        "/api/v1/admin/withdrawals/bulk",
+        json={"request_ids": ids, "approved": True},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["data"] == {"processed": ids, "skipped": []}
+
+    tron = FakeTronService()
+    worker = WithdrawalWorker(sessionmaker(bind=db_session.get_bind()), tron_service=tron)
+    assert worker.run_once() == 3
+    assert tron.batches == 1
+
+
+def test_concurrent_approval_pays_out_once(db_session, monkeypatch):
+    """읽은 뒤 다른 관리자가 먼저 승인하면 두 번째 승인은 충돌로 끝나고 작업이 하나만 남는지 테스트합니다."""
+    admin, user, (request,) = create_requests(db_session)
+    other = sessionmaker(bind=db_session.get_bind())()
+
+    def approve_elsewhere(withdrawal_request, admin_user_id):
+        monkeypatch.undo()
+        crud_withdrawal_request.approve_request(other, int(request.id), int(admin.id), True)
+        return False
+
+    monkeypatch.setattr(crud_withdrawal_request, "_claimed_by_other", approve_elsewhere)
+    with pytest.raises(ValueError):
+        crud_withdrawal_request.approve_request(db_session, int(request.id), int(admin.id), True)
+    other.close()
+
+    db_session.expire_all()
+    assert db_session.query(models.WithdrawalJob).count() == 1
+    assert db_session.query(models.Transaction).filter(
+        models.Transaction.type == models.TransactionType.WITHDRAWAL
+    ).count() == 1
+    assert balance_of(db_session, user) == (Decimal("100"), Decimal("10"))
+
+
+def test_withdrawal_failed_on_chain_is_reopened(db_session, monkeypatch):
+    """브로드캐스트 후 온체인에서 실패한 출금은 실패로 되돌리고 자금을 다시 동결하는지 테스트합니다."""
+    admin, user, requests = create_requests(db_session, count=2)
+    for request in requests:
+        crud_withdrawal_request.approve_request(db_session, int(request.id), int(admin.id), True)
+    tron = FakeTronService()
+    monkeypatch.setattr(tx_status, "get_tron_service", lambda: tron)
+    monkeypatch.setattr(tx_status, "finalized_status_cache", LRUCache(16))
+    worker = WithdrawalWorker(sessionmaker(bind=db_session.get_bind()), tron_service=tron)
+    worker.run_once()
+    assert balance_of(db_session, user) == (Decimal("80"), Decimal("0"))
+    db_session.query(models.WithdrawalJob).update({"recipient_type": RECIPIENT_EXISTING})
+    db_session.commit()
+
+    # 아직 확정되지 않은 영수증은 다음 확인 때 다시 조회
+    assert worker.reconcile_once() == 2
+    receipt = {"exists": True, "confirmed": True, "block_number": 100, "energy_used": 64285, "net_used": 345}
+    tron.receipts[f"{1:064x}"] = dict(receipt, success=False)
+    tron.receipts[f"{2:064x}"] = dict(receipt, success=True)
+    assert worker.reconcile_once() == 2
+    assert worker.reconcile_once() == 0
+
+    db_session.expire_all()
+    failed = crud_withdrawal_request.get_status(db_session, int(requests[0].id))
+    assert (failed.status, failed.job_status) == ("failed", "failed")
+    assert crud_withdrawal_request.get_status(db_session, int(requests[1].id)).status == "completed"
+    transaction = db_session.query(models.Transaction).filter(
+        models.Transaction.ref_tx_id == f"{1:064x}"
+    ).one()
+    assert transaction.status == models.TransactionStatus.FAILED
+    assert balance_of(db_session, user) == (Decimal("90"), Decimal("10"))
+    assert withdrawal_scheduler.metrics(db_session)["reverted"] == 1
+    # 실패한 영수증은 수수료 표본에 포함하지 않음
+    assert tron.fee_estimator.metrics()["recipients"][RECIPIENT_EXISTING]["samples"] == 1
+
+
+def test_stale_running_jobs_are_reported_not_retried(client: TestClient, auth_headers, db_session):
+    """결과를 기록하지 못한 채 오래 실행 중인 작업을 지표에 표시하고 다시 보내지 않는지 테스트합니다."""
+    user = db_session.query(models.User).filter(models.User.email == "test@example.com").one()
+    user.is_admin = True
+    db_session.query(models.Balance).filter(models.Balance.user_id == user.id).update({"amount": Decimal("50")})
+    db_session.commit()
+    for _ in range(2):
+        request = crud_withdrawal_request.create(db_session, int(user.id), Decimal("5"), DESTINATION)
+        crud_withdrawal_request.approve_request(db_session, int(request.id), int(user.id), True)
+
+    # 워커가 작업을 가져간 뒤 결과를 기록하기 전에 종료됨
+    stale_id, recent_id = crud_withdrawal_job.claim(db_session, 10)
+    db_session.query(models.WithdrawalJob).filter(models.WithdrawalJob.id == stale_id).update(
+        {"started_at": datetime.utcnow() - timedelta(hours=1)}
+    )
+    db_session.commit()
+
+    response = client.get("/api/v1/admin/withdrawals/queue-metrics", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["stale_running"] == [stale_id]
+    assert response.json()["jobs"]["running"] == 2
+
+    tron = FakeTronService()
+    worker = WithdrawalWorker(sessionmaker(bind=db_session.get_bind()), tron_service=tron)
+    assert worker.run_once() == 0
+    assert tron.sent == []